@@ -0,0 +1,306 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from minute_rollup import MS_PER_MINUTE, minute_ceil, skip_included, update_edges
+from vectorized_aggregation import _window_sums, fill_columns, summary_frame
+
+# Quantities an address partial sums per coin and minute
+PARTIAL_SUMS = ('fills', 'volume', 'long_size', 'short_size', 'long_value', 'short_value')
+
+# Address partials kept between runs; the least recently used are dropped first
+MAX_CACHED_PARTIALS = 50000
+
+
+def _reduce(coin_codes, minutes, sums):
+    """Sum the rows of `sums` with the same (coin code, minute)
+
+    Returns the distinct (coin codes, minutes) and their summed rows.
+    """
+    keys, inverse = np.unique((coin_codes.astype(np.int64) << 32) | minutes, return_inverse=True)
+    reduced = np.column_stack([
+        np.bincount(inverse, weights=sums[:, column], minlength=len(keys))
+        for column in range(sums.shape[1])
+    ]).reshape(len(keys), sums.shape[1])
+    return (keys >> 32).astype(np.int32), keys & 0xFFFFFFFF, reduced
+
+
+class AddressPartial:
+    """One address's fills reduced to per-coin, per-minute sums
+
+    Partials of any set of addresses merge into the summary table (see
+    `merge_partials`), so a watchlist change only needs partials for the
+    addresses that are new to it. `mark` is the fill cache mark the
+    partial was built up to (see `fill_cache.FillCache.mark`).
+    """
+
+    def __init__(self, address):
+        self.address = address
+        self.mark = None
+        self.coins = []                              # `coin_codes` index into this
+        self.coin_codes = np.zeros(0, dtype=np.int32)
+        self.minutes = np.zeros(0, dtype=np.int64)
+        self.sums = np.zeros((0, len(PARTIAL_SUMS)))  # One column per PARTIAL_SUMS
+        self.edge = None                             # (time of the newest fill included, its tids)
+        self.last_trades = {}                        # Coin -> (time, price)
+
+    @property
+    def fill_count(self):
+        return int(self.sums[:, 0].sum())
+
+    def add_buckets(self, coins, coin_codes, minutes, sums):
+        """Add per-minute sums of this address's fills
+
+        `coin_codes` index into `coins`; each (coin, minute) appears once.
+        """
+        known = {coin: code for code, coin in enumerate(self.coins)}
+        lookup = np.array([known.setdefault(coin, len(known)) for coin in coins], dtype=np.int32)
+        self.coins = list(known)
+        if not len(self.minutes):
+            self.coin_codes, self.minutes, self.sums = lookup[coin_codes], minutes, sums
+            return
+        self.coin_codes, self.minutes, self.sums = _reduce(
+            np.concatenate([self.coin_codes, lookup[coin_codes]]),
+            np.concatenate([self.minutes, minutes]),
+            np.concatenate([self.sums, sums])
+        )
+
+    def expire(self, start_minute):
+        """Drop the minutes before `start_minute`"""
+        keep = self.minutes >= start_minute
+        if not keep.all():
+            self.coin_codes = self.coin_codes[keep]
+            self.minutes = self.minutes[keep]
+            self.sums = self.sums[keep]
+
+
+def merge_partials(partials, cutoff_timestamps, primary_window, current_prices, price_changes,
+                   fallback_prices=None):
+    """Build the summary table (see `vectorized_aggregation.summary_frame`) from address partials
+
+    Each window sums the minutes from the first whole minute at or after
+    its cutoff. An address counts as a trader of a coin in every window
+    holding its latest minute in that coin, so traders are always counted
+    exactly, never with sketches. Coins without a current price
+    are valued at `fallback_prices`, by default the latest trade across
+    the partials.
+    """
+    coin_rows = {}
+    codes, minutes, sums, owners = [], [], [], []
+    last_trades = {}
+    for owner, partial in enumerate(partials):
+        lookup = np.array([coin_rows.setdefault(coin, len(coin_rows)) for coin in partial.coins], dtype=np.int64)
+        codes.append(lookup[partial.coin_codes] if len(lookup) else np.zeros(0, dtype=np.int64))
+        minutes.append(partial.minutes)
+        sums.append(partial.sums)
+        owners.append(np.full(len(partial.minutes), owner, dtype=np.int64))
+        for coin, trade in partial.last_trades.items():
+            if coin not in last_trades or trade[0] >= last_trades[coin][0]:
+                last_trades[coin] = trade
+
+    if fallback_prices is None:
+        fallback_prices = {coin: px for coin, (timestamp, px) in last_trades.items()}
+
+    codes = np.concatenate(codes + [np.zeros(0, dtype=np.int64)])
+    minutes = np.concatenate(minutes + [np.zeros(0, dtype=np.int64)])
+    sums = np.concatenate(sums + [np.zeros((0, len(PARTIAL_SUMS)))])
+    owners = np.concatenate(owners + [np.zeros(0, dtype=np.int64)])
+    coin_count = len(coin_rows)
+    windows = list(cutoff_timestamps)
+    windows_by_cutoff = sorted(windows, key=cutoff_timestamps.get)
+    window_minutes = np.array([minute_ceil(cutoff_timestamps[window]) for window in windows_by_cutoff], dtype=np.int64)
+    member_count = np.searchsorted(window_minutes, minutes, side='right')
+    order = [windows_by_cutoff.index(window) for window in windows]
+
+    totals = {
+        name: _window_sums(codes, member_count, coin_count, len(windows), sums[:, column])[:, order]
+        for column, name in enumerate(PARTIAL_SUMS)
+    }
+
+    # A trader counts for every window holding their latest minute in a coin
+    pairs, inverse = np.unique(owners * max(coin_count, 1) + codes, return_inverse=True)
+    latest = np.zeros(len(pairs), dtype=np.int64)
+    np.maximum.at(latest, inverse, member_count)
+    trader_counts = _window_sums(pairs % max(coin_count, 1), latest, coin_count, len(windows))
+    trader_counts = trader_counts[:, order].astype(int)
+
+    return summary_frame(
+        list(coin_rows),
+        windows,
+        primary_window,
+        totals,
+        trader_counts,
+        current_prices,
+        price_changes,
+        fallback_prices
+    )
+
+
+class PartialAccumulator:
+    """Adds fills to the partial of their address and merges the partials into the summary
+
+    Pass the partials reused from the cache as `partials`; fills added
+    later only change the partials of their own addresses.
+    """
+
+    def __init__(self, cutoff_timestamps, primary_window='24h', partials=()):
+        self.cutoff_timestamps = cutoff_timestamps
+        self.primary_window = primary_window
+        self.start_minute = minute_ceil(min(cutoff_timestamps.values()))
+        self.partials = {}
+        self._edges = {}  # Address -> edge, see `minute_rollup.skip_included`
+        for partial in partials:
+            partial.expire(self.start_minute)
+            self.partials[partial.address] = partial
+            if partial.edge is not None:
+                self._edges[partial.address] = partial.edge
+
+    def _partial(self, address):
+        partial = self.partials.get(address)
+        if partial is None:
+            partial = self.partials[address] = AddressPartial(address)
+        return partial
+
+    @property
+    def fill_count(self):
+        return sum(partial.fill_count for partial in self.partials.values())
+
+    def add(self, fills):
+        """Add a fills DataFrame (see `vectorized_aggregation.WindowAccumulator.add`)"""
+        fills = fills[fills['coin'].notna() & fills['trader_address'].notna()]
+        fills = skip_included(fills, self._edges)
+        if fills.empty:
+            return
+        update_edges(self._edges, fills)
+
+        coin_codes, coins, times, size, value, is_long, is_short = fill_columns(fills)
+        trader_codes, traders = pd.factorize(fills['trader_address'])
+        coins = list(coins)
+        traders = list(traders)
+        coin_count = len(coins)
+
+        # Latest trade of every (address, coin) pair, ordered by address;
+        # lexsort is stable, so the last of several fills in one millisecond wins
+        order = np.lexsort((times, coin_codes, trader_codes))
+        pairs = trader_codes[order].astype(np.int64) * coin_count + coin_codes[order]
+        latest = order[np.append(pairs[1:] != pairs[:-1], True)]
+        latest_bounds = np.searchsorted(trader_codes[latest], np.arange(len(traders) + 1))
+        latest_coins = [coins[code] for code in coin_codes[latest]]
+        latest_trades = list(zip(times[latest].tolist(), fills['px'].to_numpy(dtype=float)[latest].tolist()))
+
+        # One row per (address, coin, minute) in the windows, ordered by address
+        minutes = times // MS_PER_MINUTE
+        recent = minutes >= self.start_minute
+        first_minute = self.start_minute
+        span = max(int(minutes.max()) - first_minute + 1, 1)
+        keys, inverse = np.unique(
+            (trader_codes[recent].astype(np.int64) * coin_count + coin_codes[recent]) * span
+            + minutes[recent] - first_minute,
+            return_inverse=True
+        )
+        sums = np.column_stack([
+            np.bincount(inverse, weights=weight[recent], minlength=len(keys))
+            for weight in (np.ones(len(times)), size, size * is_long, size * is_short, value * is_long, value * is_short)
+        ])
+        key_pairs = keys // span
+        key_minutes = keys % span + first_minute
+        bounds = np.searchsorted(key_pairs // coin_count, np.arange(len(traders) + 1))
+
+        # Number each address's coins from 0, so its rows only refer to its own coins
+        new_pair = np.append(True, key_pairs[1:] != key_pairs[:-1])
+        pair_numbers = np.cumsum(new_pair) - 1
+        first_pairs = np.append(pair_numbers, 0)[bounds]
+        key_coins = pair_numbers - np.repeat(first_pairs[:-1], np.diff(bounds))
+        pair_coins = [coins[code] for code in key_pairs[new_pair] % coin_count]
+        for code, address in enumerate(traders):
+            partial = self._partial(address)
+            trades = slice(latest_bounds[code], latest_bounds[code + 1])
+            if partial.last_trades:
+                for coin, trade in zip(latest_coins[trades], latest_trades[trades]):
+                    if coin not in partial.last_trades or trade[0] >= partial.last_trades[coin][0]:
+                        partial.last_trades[coin] = trade
+            else:
+                partial.last_trades = dict(zip(latest_coins[trades], latest_trades[trades]))
+            if bounds[code] < bounds[code + 1]:
+                rows = slice(bounds[code], bounds[code + 1])
+                address_coins = pair_coins[first_pairs[code]:pair_numbers[bounds[code + 1] - 1] + 1]
+                partial.add_buckets(address_coins, key_coins[rows], key_minutes[rows], sums[rows])
+
+    def address_partials(self, addresses=()):
+        """Every partial, plus an empty one for each of `addresses` without
+        fills, ready to be cached"""
+        for address in addresses:
+            self._partial(address)
+        for address, partial in self.partials.items():
+            partial.edge = self._edges.get(address)
+        return list(self.partials.values())
+
+    def last_trade_prices(self):
+        """Latest traded price per coin across every partial"""
+        last_trades = {}
+        for partial in self.partials.values():
+            for coin, trade in partial.last_trades.items():
+                if coin not in last_trades or trade[0] >= last_trades[coin][0]:
+                    last_trades[coin] = trade
+        return {coin: px for coin, (timestamp, px) in last_trades.items()}
+
+    def summary(self, current_prices, price_changes, fallback_prices=None):
+        """Merge the partials into the summary table (see `merge_partials`)"""
+        return merge_partials(
+            list(self.partials.values()),
+            self.cutoff_timestamps,
+            self.primary_window,
+            current_prices,
+            price_changes,
+            fallback_prices
+        )
+
+
+class PartialCache:
+    """Address partials kept between runs in this process
+
+    A partial is only handed out for the fill cache mark it was built up
+    to, and is taken out of the cache while in use, so a run that fails
+    half way never leaves a partial that is ahead of its mark.
+    """
+
+    def __init__(self, max_partials=MAX_CACHED_PARTIALS):
+        self.max_partials = max_partials
+        self._partials = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, address, mark):
+        """Remove and return the partial of `address` if it was built up to `mark`"""
+        with self._lock:
+            partial = self._partials.pop(address, None)
+        return partial if partial is not None and partial.mark == mark else None
+
+    def put(self, partials):
+        """Cache partials (with their `mark` set), dropping the least recently used beyond the limit"""
+        with self._lock:
+            for partial in partials:
+                self._partials[partial.address] = partial
+                self._partials.move_to_end(partial.address)
+            while len(self._partials) > self.max_partials:
+                self._partials.popitem(last=False)
+
+    def clear(self):
+        """Forget every partial"""
+        with self._lock:
+            self._partials.clear()
+
+
+# Shared cache, created on first use
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_partial_cache():
+    """Return the process-wide PartialCache"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = PartialCache()
+        return _cache
@@ -76,6 +76,64 @@ This app analyzes trading activity for specified wallet addresses on Hyperliquid
 st.sidebar.header("Configuration")
 st.sidebar.info("App is running on Streamlit Cloud!")
 
+# Number of addresses fetched from the API at the same time
+max_concurrent_requests = st.sidebar.slider(
+    "Concurrent API requests",
+    min_value=1,
+    max_value=32,
+    value=8
+)
+
+# Reuse fills stored by earlier runs and only download newer ones
+use_fill_cache = st.sidebar.checkbox("Use local fill cache", value=True)
+
+# How the summary table is computed
+aggregation_engine = st.sidebar.selectbox("Aggregation engine", ["vectorized", "index", "rollup", "partials", "python"])
+
+# Worker processes for large watchlists; above 1 the partials engine is used
+aggregation_workers = st.sidebar.number_input(
+    "Aggregation worker processes",
+    min_value=1,
+    max_value=64,
+    value=1,
+    help=f"Up to one per core ({os.cpu_count()} here)"
+)
+
+# Windows shown in the summary; the longest decides how far back to fetch
+time_windows = st.sidebar.text_input(
+    "Time windows",
+    value="24h, 12h, 6h, 3h, 1h",
+    help="Comma-separated, e.g. 5m, 15m, 4h, 7d (m = minutes, h = hours, d = days, w = weeks), up to 7d"
+)
+
+# Runs with the same addresses and settings within this period reuse one
+# summary, shared between sessions
+result_freshness = st.sidebar.number_input(
+    "Reuse results for (seconds)",
+    min_value=0,
+    max_value=3600,
+    value=60,
+    help="0 always computes a new summary"
+)
+
+# Keep the watchlist's summary fresh from a background worker, instead of
+# computing it when Run Analysis is clicked
+background_refresh = st.sidebar.checkbox("Refresh in the background", value=False)
+refresh_interval = st.sidebar.number_input(
+    "Refresh every (seconds)",
+    min_value=10,
+    max_value=3600,
+    value=60,
+    disabled=not background_refresh
+)
+
+# Stream fills as they happen and keep the summary current from them
+live_mode = st.sidebar.selectbox(
+    "Live mode",
+    ["Off", "Hyperliquid websocket", "Synthetic replay"],
+    help="Synthetic replay streams made-up fills for testing without the API"
+)
+
 # Show current directory files
 with st.sidebar.expander("Debug: Show Files in Directory"):
     files = glob.glob("*.*")
@@ -83,6 +141,136 @@ with st.sidebar.expander("Debug: Show Files in Directory"):
     for file in files:
         st.write(f"- {file}")
 
+# Seconds between checks for a newer background snapshot
+SNAPSHOT_POLL_SECONDS = 5
+
+# Seconds between redraws of a live summary
+LIVE_POLL_SECONDS = 2
+
+
+def show_results(result_df, views):
+    """Tabs with the summary and its downloads; `views` keeps the styled table between reruns"""
+    import hyperliquid_analysis
+    
+    # Format once per result, for the formatted view and the HTML download
+    if 'styled_table' not in views:
+        try:
+            display_df = hyperliquid_analysis.format_for_display(result_df)
+            views['styled_table'] = hyperliquid_analysis.generate_styled_table(display_df)
+            views['format_error'] = None
+        except Exception as format_error:
+            views['styled_table'] = None
+            views['format_error'] = str(format_error)
+    styled_table = views['styled_table']
+    
+    # Create tabs for different views
+    tab1, tab2, tab3 = st.tabs(["Table View", "Formatted View", "Raw Data"])
+    
+    with tab1:
+        # Show dataframe
+        st.dataframe(result_df, use_container_width=True)
+    
+    with tab2:
+        # Formatted HTML table
+        if styled_table is not None:
+            st.markdown(styled_table, unsafe_allow_html=True)
+        else:
+            st.error(f"Error formatting display: {views['format_error']}")
+            st.dataframe(result_df, use_container_width=True)
+    
+    with tab3:
+        # Raw JSON view
+        st.json(result_df.to_dict(orient="records"))
+    
+    # Download options
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        csv = result_df.to_csv(index=False).encode('utf-8')
+        st.download_button(
+            "📥 Download CSV", 
+            csv, 
+            "hyperliquid_analysis.csv", 
+            "text/csv",
+            use_container_width=True
+        )
+    
+    with col2:
+        # JSON download
+        json_str = result_df.to_json(orient="records", indent=2)
+        st.download_button(
+            "📥 Download JSON",
+            json_str,
+            "hyperliquid_analysis.json",
+            "application/json",
+            use_container_width=True
+        )
+    
+    with col3:
+        # HTML download
+        if styled_table is not None:
+            html_full = f"""
+            <!DOCTYPE html>
+            <html>
+            <head>
+                <title>Hyperliquid Analysis</title>
+                <meta charset="UTF-8">
+            </head>
+            <body>
+                <h1>Hyperliquid Top Traders Analysis</h1>
+                {styled_table}
+            </body>
+            </html>
+            """
+            st.download_button(
+                "📥 Download HTML",
+                html_full,
+                "hyperliquid_analysis.html",
+                "text/html",
+                use_container_width=True
+            )
+        else:
+            st.error(f"Error generating HTML: {views['format_error']}")
+
+
+@st.fragment(run_every=LIVE_POLL_SECONDS)
+def show_live_summary(live_name, addresses, windows, source):
+    """The live summary as of now, redrawn in place"""
+    from fill_stream import PollingFillStream
+    from live_summary import get_live_summary
+    live = get_live_summary(live_name, addresses, windows, source)
+    if live.error is not None:
+        st.error(f"❌ The fill stream stopped: {live.error}")
+    elif live.stream.last_error is not None:
+        st.warning(f"⚠️ The fill stream is retrying ({live.stream.reconnects} failures so far): {live.stream.last_error}")
+    if not live.ready:
+        st.info(f"⏳ Loading the last {live.primary_window} of fills...")
+        return
+    
+    result_df = live.summary()
+    st.caption(f"🔴 Live as of {time.strftime('%H:%M:%S')}: {live.received:,} fills streamed, {live.backfilled:,} loaded at start")
+    if isinstance(live.stream, PollingFillStream):
+        st.caption(f"Too many addresses to stream from Hyperliquid's websocket; new fills are polled every {live.stream.interval:.0f} seconds")
+    if live.failed:
+        st.warning(f"⚠️ Could not load the history of {len(live.failed)} addresses; their older fills are missing")
+    if result_df.empty:
+        st.info("No fills in the time windows yet.")
+    else:
+        show_results(result_df, {})
+
+
+@st.fragment(run_every=SNAPSHOT_POLL_SECONDS)
+def show_snapshot_age(watchlist_name, shown_version):
+    """Age of the background snapshot, updated in place; reruns the page once a newer one is published"""
+    from refresh_scheduler import get_refresh_scheduler
+    snapshot = get_refresh_scheduler().snapshot(watchlist_name)
+    if snapshot is not None and snapshot.version != shown_version:
+        st.rerun()
+    
+    if snapshot is None:
+        st.info("⏳ Computing the first snapshot in the background...")
+    else:
+        st.caption(f"🕒 Snapshot computed {snapshot.age:.0f} seconds ago (took {snapshot.duration:.1f} seconds); refreshed every {refresh_interval} seconds")
+
 # Input methods
 input_method = st.radio(
     "Select input method",
@@ -210,123 +398,137 @@ if addresses:
     # Debug - Show content of addresses
     st.sidebar.write(f"Debug: Using {len(addresses_global)} addresses")
 
-    # Run analysis button
-    if st.button("🚀 Run Analysis", type="primary", use_container_width=True):
-        start_time = time.time()
+    # Settings of this watchlist's runs (see hyperliquid_analysis.RUN_SETTINGS)
+    import hyperliquid_analysis
+    try:
+        run_settings = {
+            'MAX_CONCURRENT_REQUESTS': max_concurrent_requests,
+            'USE_FILL_CACHE': use_fill_cache,
+            'AGGREGATION_ENGINE': aggregation_engine,
+            'AGGREGATION_WORKERS': aggregation_workers,
+            'TIME_WINDOWS': hyperliquid_analysis.parse_windows(time_windows),
+            'RESULT_FRESHNESS': result_freshness,
+        }
+    except ValueError as e:
+        st.error(f"❌ {str(e)}")
+        st.stop()
+    
+    if live_mode != "Off":
+        # Fills stream in and every redraw summarises the windows as they
+        # are at that moment
+        from live_summary import get_live_summary
+        from result_cache import result_key
+        source = "synthetic" if live_mode == "Synthetic replay" else "websocket"
+        windows = run_settings['TIME_WINDOWS']
         
-        # Make sure hyperliquid_data directory exists
-        os.makedirs("hyperliquid_data", exist_ok=True)
+        # Sessions watching the same addresses and windows share one stream
+        live_name = result_key(addresses, {'windows': windows, 'source': source}, 0)
+        try:
+            get_live_summary(live_name, addresses, windows, source)
+        except (ImportError, ValueError) as e:
+            st.error(f"❌ Live mode is not available: {str(e)}")
+        else:
+            show_live_summary(live_name, addresses, windows, source)
+    elif background_refresh:
+        # A background worker recomputes the summary every refresh interval
+        # and the page shows its latest snapshot, without waiting for it
+        from refresh_scheduler import get_refresh_scheduler
+        from result_cache import result_key
+        scheduler = get_refresh_scheduler()
         
-        with st.spinner("📊 Analyzing Hyperliquid data..."):
-            try:
-                # Progress indicators
-                progress_container = st.empty()
-                progress_container.info("Importing analysis module...")
-                
-                # Create a context file to pass addresses to the analysis module
-                with open("trader_addresses.txt", "w") as f:
-                    for addr in addresses:
-                        f.write(addr + "\n")
-                
-                progress_container.info(f"Set up {len(addresses)} addresses for analysis...")
-                
-                # Import hyperliquid_analysis here
-                import hyperliquid_analysis
-                
-                # Explicitly set addresses in the module
-                hyperliquid_analysis.TRADER_ADDRESSES = addresses
-                
-                progress_container.info("Fetching price data...")
-                
-                # Run analysis with progress updates
-                result_df = hyperliquid_analysis.analyze_trader_activity()
-                
-                # Check results
-                if result_df is not None and not result_df.empty:
-                    # Show results
-                    progress_container.empty()
-                    
-                    duration = time.time() - start_time
-                    
-                    # Results section
-                    st.success(f"✅ Analysis complete! Found data for {len(result_df)} assets. Time to complete {duration:.1f} seconds")
-                    
-                    # Create tabs for different views
-                    tab1, tab2, tab3 = st.tabs(["Table View", "Formatted View", "Raw Data"])
-                    
-                    with tab1:
-                        # Show dataframe
-                        st.dataframe(result_df, use_container_width=True)
-                    
-                    with tab2:
-                        # Format for display
-                        try:
-                            display_df = hyperliquid_analysis.format_for_display(result_df)
-                            styled_table = hyperliquid_analysis.generate_styled_table(display_df)
-                            st.markdown(styled_table, unsafe_allow_html=True)
-                        except Exception as format_error:
-                            st.error(f"Error formatting display: {str(format_error)}")
-                            st.dataframe(result_df, use_container_width=True)
+        # Sessions watching the same addresses with the same settings share one worker entry
+        watchlist_name = result_key(addresses, run_settings, 0)
+        scheduler.register(watchlist_name, addresses, run_settings, refresh_interval)
+        
+        if st.button("🔄 Refresh now", use_container_width=True, help="Start a new background refresh now"):
+            scheduler.refresh_now(watchlist_name)
+        
+        snapshot = scheduler.snapshot(watchlist_name)
+        show_snapshot_age(watchlist_name, snapshot.version if snapshot is not None else None)
+        
+        if snapshot is not None:
+            if snapshot.error is not None:
+                st.warning(f"⚠️ The last refresh failed ({snapshot.error}); showing the one before")
+            if snapshot.summary is not None and not snapshot.summary.empty:
+                # Formatted views are kept until the next snapshot
+                views = st.session_state.get('snapshot_views')
+                if views is None or views['version'] != snapshot.version:
+                    views = st.session_state['snapshot_views'] = {'version': snapshot.version}
+                show_results(snapshot.summary, views)
+            elif snapshot.error is None:
+                st.warning("⚠️ The last refresh returned no data.")
+    else:
+        # Run analysis buttons; a run reuses a summary computed for the same
+        # addresses and settings within the "Reuse results for" period
+        run_col, refresh_col = st.columns([3, 1])
+        with run_col:
+            run_clicked = st.button("🚀 Run Analysis", type="primary", use_container_width=True)
+        with refresh_col:
+            force_refresh = st.button(
+                "🔄 Force refresh",
+                use_container_width=True,
+                help="Compute a new summary instead of reusing a recent one"
+            )
+        
+        if run_clicked or force_refresh:
+            start_time = time.time()
+            
+            # Make sure hyperliquid_data directory exists
+            os.makedirs("hyperliquid_data", exist_ok=True)
+            
+            with st.spinner("📊 Analyzing Hyperliquid data..."):
+                try:
+                    # Progress indicators
+                    progress_container = st.empty()
                     
-                    with tab3:
-                        # Raw JSON view
-                        st.json(result_df.to_dict(orient="records"))
+                    # Create a context file to pass addresses to the analysis module
+                    with open("trader_addresses.txt", "w") as f:
+                        for addr in addresses:
+                            f.write(addr + "\n")
                     
-                    # Download options
-                    col1, col2, col3 = st.columns(3)
-                    with col1:
-                        csv = result_df.to_csv(index=False).encode('utf-8')
-                        st.download_button(
-                            "📥 Download CSV", 
-                            csv, 
-                            "hyperliquid_analysis.csv", 
-                            "text/csv",
-                            use_container_width=True
-                        )
+                    progress_container.info(f"Set up {len(addresses)} addresses for analysis...")
                     
-                    with col2:
-                        # JSON download
-                        json_str = result_df.to_json(orient="records", indent=2)
-                        st.download_button(
-                            "📥 Download JSON",
-                            json_str,
-                            "hyperliquid_analysis.json",
-                            "application/json",
-                            use_container_width=True
-                        )
+                    # Run analysis with progress updates, unless an identical
+                    # one was computed (or is being computed) recently
+                    result_df, computed_at, reused = hyperliquid_analysis.analyze_watchlist(
+                        addresses,
+                        run_settings,
+                        force_refresh=force_refresh
+                    )
+                    progress_container.empty()
                     
-                    with col3:
-                        # HTML download
-                        try:
-                            display_df = hyperliquid_analysis.format_for_display(result_df)
-                            html = hyperliquid_analysis.generate_styled_table(display_df)
-                            html_full = f"""
-                            <!DOCTYPE html>
-                            <html>
-                            <head>
-                                <title>Hyperliquid Analysis</title>
-                                <meta charset="UTF-8">
-                            </head>
-                            <body>
-                                <h1>Hyperliquid Top Traders Analysis</h1>
-                                {html}
-                            </body>
-                            </html>
-                            """
-                            st.download_button(
-                                "📥 Download HTML",
-                                html_full,
-                                "hyperliquid_analysis.html",
-                                "text/html",
-                                use_container_width=True
-                            )
-                        except Exception as html_error:
-                            st.error(f"Error generating HTML: {str(html_error)}")
+                    # Keep the result for this session, so reruns (downloads,
+                    # widget changes) show it again without recomputing
+                    st.session_state['analysis'] = {
+                        'addresses': list(addresses),
+                        'settings': run_settings,
+                        'result_df': result_df,
+                        'duration': time.time() - start_time,
+                        'computed_at': computed_at,
+                        'reused': reused,
+                    }
+                except Exception as e:
+                    st.session_state.pop('analysis', None)
+                    st.error(f"❌ Error during analysis: {str(e)}")
+                    st.code(traceback.format_exc())
+        
+        # Show the session's latest result while the watchlist and its
+        # settings are unchanged
+        analysis = st.session_state.get('analysis')
+        if analysis is not None and analysis['addresses'] == list(addresses) and analysis['settings'] == run_settings:
+            result_df = analysis['result_df']
+            
+            # Check results
+            if result_df is not None and not result_df.empty:
+                # Results section
+                if analysis['reused']:
+                    age = time.time() - analysis['computed_at']
+                    st.success(f"✅ Showing the analysis of {len(result_df)} assets computed {age:.0f} seconds ago. Use Force refresh to recompute")
                 else:
-                    st.warning("⚠️ Analysis completed but no data was returned.")
-            except Exception as e:
-                st.error(f"❌ Error during analysis: {str(e)}")
-                st.code(traceback.format_exc())
+                    st.success(f"✅ Analysis complete! Found data for {len(result_df)} assets. Time to complete {analysis['duration']:.1f} seconds")
+                show_results(result_df, analysis)
+            else:
+                st.warning("⚠️ Analysis completed but no data was returned.")
 else:
     st.info("Please select addresses using one of the input methods above.")
 
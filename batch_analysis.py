@@ -0,0 +1,120 @@
+"""Run the trader analysis without Streamlit, e.g. from cron
+
+Reads a watchlist, runs the same analysis as the app and writes the summary
+table as CSV, JSON or Parquet (picked from the output's extension unless
+`--format` is given):
+
+    python batch_analysis.py --addresses addresses.csv --output summary.parquet
+
+The watchlist is a CSV with an `address` column, as the app takes, or a
+plain file with one address per line. Progress and diagnostics are logged
+to stderr, with per-address details at `--verbose`. Exits with 1 when
+the analysis produced no data.
+"""
+import argparse
+import logging
+import os
+import sys
+
+import hyperliquid_analysis
+from reporting import LogReporter, logger
+
+OUTPUT_FORMATS = {".csv": "csv", ".json": "json", ".parquet": "parquet"}
+
+
+def read_addresses(path):
+    """Addresses in `path`: the first 0x field of every line, in order, without duplicates"""
+    addresses = []
+    with open(path, "r") as f:
+        for line in f:
+            fields = [field.strip().strip('"') for field in line.split(",")]
+            address = next((field for field in fields if field.lower().startswith("0x")), None)
+            if address is not None:
+                addresses.append(address)
+    return list(dict.fromkeys(addresses))
+
+
+def write_summary(df, path, output_format):
+    """Write the summary table to `path` as csv, json or parquet"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    if output_format == "csv":
+        df.to_csv(path, index=False)
+    elif output_format == "json":
+        df.to_json(path, orient="records", indent=2)
+    else:
+        df.to_parquet(path, index=False)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Analyze Hyperliquid trader activity without the app")
+    parser.add_argument("--addresses", required=True,
+                        help="CSV with an address column, or one address per line")
+    parser.add_argument("--output", default="trading_summary.csv",
+                        help="where to write the summary table")
+    parser.add_argument("--format", choices=sorted(set(OUTPUT_FORMATS.values())),
+                        help="output format (default: from the --output extension)")
+    parser.add_argument("--windows", default=",".join(hyperliquid_analysis.TIME_WINDOWS),
+                        help="comma-separated time windows, e.g. 5m,15m,4h,7d")
+    parser.add_argument("--engine", default=hyperliquid_analysis.AGGREGATION_ENGINE,
+                        choices=["vectorized", "index", "rollup", "partials", "python"],
+                        help="aggregation engine")
+    parser.add_argument("--workers", type=int, default=hyperliquid_analysis.AGGREGATION_WORKERS,
+                        help="worker processes for fetching and aggregating")
+    parser.add_argument("--concurrency", type=int, default=hyperliquid_analysis.MAX_CONCURRENT_REQUESTS,
+                        help="API requests in flight at once")
+    parser.add_argument("--no-fill-cache", action="store_true",
+                        help="fetch every fill from the API instead of reading stored ones")
+    parser.add_argument("--quiet", action="store_true", help="only log warnings and errors")
+    parser.add_argument("--verbose", action="store_true",
+                        help="also log every address fetched and other per-item details")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    logging.basicConfig(
+        level=logging.WARNING if args.quiet else logging.INFO,
+        format="%(asctime)s %(levelname)s %(message)s"
+    )
+    if args.verbose:
+        logger.setLevel(logging.DEBUG)
+
+    output_format = args.format or OUTPUT_FORMATS.get(os.path.splitext(args.output)[1].lower())
+    if output_format is None:
+        print(f"Can't tell the format of {args.output}; pass --format", file=sys.stderr)
+        return 2
+
+    try:
+        windows = hyperliquid_analysis.parse_windows(args.windows)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 2
+
+    addresses = read_addresses(args.addresses)
+    if not addresses:
+        print(f"No addresses found in {args.addresses}", file=sys.stderr)
+        return 2
+
+    hyperliquid_analysis.REPORTER = LogReporter()
+    settings = {
+        'MAX_CONCURRENT_REQUESTS': args.concurrency,
+        'USE_FILL_CACHE': not args.no_fill_cache,
+        'AGGREGATION_ENGINE': args.engine,
+        'AGGREGATION_WORKERS': args.workers,
+        'TIME_WINDOWS': windows,
+    }
+
+    result_df = hyperliquid_analysis.analyze_trader_activity(addresses, settings)
+    if result_df is None or result_df.empty:
+        logger.warning("No data to write")
+        return 1
+
+    write_summary(result_df, args.output, output_format)
+    print(f"Summary of {len(result_df)} coins written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
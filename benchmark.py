@@ -0,0 +1,325 @@
+"""Benchmark the analysis pipeline on synthetic fills
+
+Times each stage separately (fetch with a mocked API, filter, aggregate,
+format, render) for several watchlist sizes and writes a JSON report:
+
+    python benchmark.py --sizes 10,100,1000,10000 --output benchmark_report.json
+
+Pass `--compare old_report.json` to fail (exit code 1) when a stage got
+slower than the old report by more than `--tolerance`.
+"""
+import argparse
+import json
+import platform
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+import hyperliquid_analysis
+from address_partials import PartialAccumulator, merge_partials
+from fill_records import FILL_DTYPE
+from fill_store import records_to_table, table_to_frame
+from hyperliquid_client import HyperliquidInfoClient, set_client
+from minute_rollup import MinuteRollup
+from price_cache import parse_asset_ctxs
+from rate_limiter import RateLimiter
+from sharded_aggregation import default_workers, iter_shards
+from standin_server import StandInState, start_in_background
+from synthetic_fills import SyntheticInfoClient, generate_dataset, generate_meta_and_asset_ctxs
+from time_index import TimeIndexAccumulator
+from vectorized_aggregation import last_trade_prices, summarize_fills
+
+def time_stage(function, repeat):
+    """Run `function` `repeat` times; return (fastest seconds, last result)"""
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def run_size(address_count, args):
+    """Time every stage for one watchlist size"""
+    now = datetime.now()
+    cutoff_timestamps = hyperliquid_analysis.get_cutoff_timestamps(now, args.windows)
+    primary_window = hyperliquid_analysis.get_primary_window(cutoff_timestamps)
+    oldest_cutoff = cutoff_timestamps[primary_window]
+
+    dataset = generate_dataset(
+        addresses=address_count,
+        fills_per_trader=args.fills_per_trader,
+        coin_skew=args.coin_skew,
+        open_ratio=args.open_ratio,
+        long_ratio=args.long_ratio,
+        span_hours=hyperliquid_analysis.parse_window(primary_window).total_seconds() / 3600,
+        seed=args.seed,
+        now_ms=int(now.timestamp() * 1000)
+    )
+    meta = generate_meta_and_asset_ctxs(args.seed)
+    server = None
+    if args.transport == "http":
+        # Real HTTP round trips against a local stand-in server
+        state = StandInState(
+            meta,
+            dataset,
+            latency_ms=args.latency_ms,
+            error_rate=args.error_rate,
+            synthesize_unknown=False,
+            seed=args.seed,
+            weight_per_minute=args.server_weight_per_minute
+        )
+        server, url = start_in_background(state)
+        client = HyperliquidInfoClient(
+            url=url,
+            backoff_base=0.05,
+            rate_limiter=RateLimiter(args.weight_per_minute)
+        )
+    else:
+        client = SyntheticInfoClient(dataset, meta=meta, latency_ms=args.latency_ms)
+    set_client(client)
+    addresses = list(dataset)
+    current_prices, prev_day_prices = parse_asset_ctxs(client.meta_and_asset_ctxs())
+    price_changes = {
+        coin: hyperliquid_analysis.calculate_price_change(price, prev_day_prices[coin])
+        for coin, price in current_prices.items()
+        if coin in prev_day_prices
+    }
+
+    timings = {}
+
+    def fetch():
+        results = hyperliquid_analysis.fetch_fills_concurrently(
+            addresses,
+            start_time=oldest_cutoff,
+            max_workers=args.concurrency
+        )
+        return np.concatenate([fills for address, fills, error in results] or [np.empty(0, FILL_DTYPE)])
+
+    timings["fetch_mock"], all_fills = time_stage(fetch, args.repeat)
+
+    def fetch_aggregate_sharded():
+        # Worker processes get the stand-in client; nothing is stored
+        partials = []
+        for shard in iter_shards(
+            addresses,
+            {address: oldest_cutoff for address in addresses},
+            cutoff_timestamps,
+            primary_window,
+            workers=args.shard_workers,
+            max_requests=args.concurrency,
+            store=False,
+            initializer=set_client,
+            initargs=(client,)
+        ):
+            partials += shard['partials']
+        return merge_partials(partials, cutoff_timestamps, primary_window, current_prices, price_changes)
+
+    if args.shard_workers and args.transport == "inprocess":
+        timings["fetch_aggregate_sharded"], _ = time_stage(fetch_aggregate_sharded, args.repeat)
+    if server is not None:
+        server.shutdown()
+        server.server_close()
+
+    def filter_fills():
+        fills_df = table_to_frame(records_to_table(all_fills))
+        return fills_df[fills_df['time'] >= oldest_cutoff]
+
+    timings["filter"], fills_df = time_stage(filter_fills, args.repeat)
+    fallback_prices = last_trade_prices(fills_df)
+
+    def aggregate_python():
+        time_windows = hyperliquid_analysis.aggregate_fills(
+            fills_df.to_dict('records'), cutoff_timestamps, trader_error=args.trader_error
+        )
+        return pd.DataFrame(hyperliquid_analysis.build_summary(
+            time_windows, current_prices, price_changes, fallback_prices, primary_window
+        ))
+
+    def aggregate_vectorized():
+        return summarize_fills(
+            fills_df, cutoff_timestamps, current_prices, price_changes, fallback_prices, primary_window,
+            args.trader_error
+        )
+
+    def aggregate_index():
+        accumulator = TimeIndexAccumulator(cutoff_timestamps, primary_window)
+        accumulator.add(fills_df)
+        return accumulator, accumulator.summary(current_prices, price_changes, fallback_prices)
+
+    def aggregate_partials():
+        accumulator = PartialAccumulator(cutoff_timestamps, primary_window)
+        accumulator.add(fills_df)
+        return accumulator.summary(current_prices, price_changes, fallback_prices)
+
+    def aggregate_rollup():
+        rollup = MinuteRollup(cutoff_timestamps, primary_window)
+        rollup.add(fills_df)
+        return rollup.summary(current_prices, price_changes, fallback_prices)
+
+    if "python" in args.engines:
+        timings["aggregate_python"], summary = time_stage(aggregate_python, args.repeat)
+    if "vectorized" in args.engines:
+        timings["aggregate_vectorized"], summary = time_stage(aggregate_vectorized, args.repeat)
+    if "index" in args.engines:
+        timings["aggregate_index"], (accumulator, summary) = time_stage(aggregate_index, args.repeat)
+        # Summarising again from the built index, as when the window set changes
+        timings["requery_index"], summary = time_stage(
+            lambda: accumulator.summary(current_prices, price_changes, fallback_prices), args.repeat
+        )
+    if "rollup" in args.engines:
+        timings["aggregate_rollup"], summary = time_stage(aggregate_rollup, args.repeat)
+
+        # A refresh: the last minute of fills added to a rollup of the rest
+        recent = fills_df['time'] >= int(now.timestamp() * 1000) - 60 * 1000
+        rollup = MinuteRollup(cutoff_timestamps, primary_window)
+        rollup.add(fills_df[~recent])
+        rollup.summary(current_prices, price_changes, fallback_prices)
+
+        def refresh_rollup():
+            rollup.add(fills_df[recent])
+            return rollup.summary(current_prices, price_changes, fallback_prices)
+
+        timings["refresh_rollup"], _ = time_stage(refresh_rollup, args.repeat)
+    if "partials" in args.engines:
+        timings["aggregate_partials"], summary = time_stage(aggregate_partials, args.repeat)
+
+        # A watchlist change: 1% of the addresses are new, the partials of
+        # the rest come from the cache
+        added = fills_df['trader_address'].astype(str).isin(addresses[:max(1, len(addresses) // 100)]).to_numpy()
+        cached = PartialAccumulator(cutoff_timestamps, primary_window)
+        cached.add(fills_df[~added])
+        cached = cached.address_partials()
+
+        def rewatch_partials():
+            accumulator = PartialAccumulator(cutoff_timestamps, primary_window, cached)
+            accumulator.add(fills_df[added])
+            return accumulator.summary(current_prices, price_changes, fallback_prices)
+
+        timings["rewatch_partials"], _ = time_stage(rewatch_partials, args.repeat)
+
+    summary = summary.sort_values(f'{primary_window} Volume', ascending=False)
+    timings["format"], display_df = time_stage(
+        lambda: hyperliquid_analysis.format_for_display(summary), args.repeat
+    )
+    timings["render"], _ = time_stage(
+        lambda: hyperliquid_analysis.generate_styled_table(display_df), args.repeat
+    )
+
+    return [
+        {
+            "addresses": address_count,
+            "fills": len(all_fills),
+            "stage": stage,
+            "seconds": seconds,
+            "fills_per_second": len(all_fills) / seconds if seconds > 0 else None,
+        }
+        for stage, seconds in timings.items()
+    ]
+
+
+def compare_reports(report, baseline, tolerance):
+    """Return descriptions of stages slower than in `baseline` by more than `tolerance`"""
+    old = {(r["addresses"], r["stage"]): r["seconds"] for r in baseline["results"]}
+    regressions = []
+    for result in report["results"]:
+        before = old.get((result["addresses"], result["stage"]))
+        if before and result["seconds"] > before * (1 + tolerance):
+            regressions.append(
+                f"{result['stage']} @ {result['addresses']} addresses: "
+                f"{before:.4f}s -> {result['seconds']:.4f}s"
+            )
+    return regressions
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the Hyperliquid analysis pipeline")
+    parser.add_argument("--sizes", default="10,100,1000,10000",
+                        help="comma-separated numbers of addresses")
+    parser.add_argument("--fills-per-trader", type=int, default=50,
+                        help="mean fills per trader over the longest window")
+    parser.add_argument("--coin-skew", type=float, default=1.2,
+                        help="Zipf exponent for coin popularity (0 = uniform)")
+    parser.add_argument("--open-ratio", type=float, default=0.6,
+                        help="share of fills that open a position")
+    parser.add_argument("--long-ratio", type=float, default=0.5,
+                        help="share of fills on the long side")
+    parser.add_argument("--latency-ms", type=float, default=0.0,
+                        help="simulated API latency per request")
+    parser.add_argument("--transport", choices=["inprocess", "http"], default="inprocess",
+                        help="serve the mocked API in process or from a local stand-in HTTP server")
+    parser.add_argument("--error-rate", type=float, default=0.0,
+                        help="share of stand-in requests answered with 429 (http transport)")
+    parser.add_argument("--weight-per-minute", type=float,
+                        help="client rate limit in request weight per minute (http transport; unlimited by default)")
+    parser.add_argument("--server-weight-per-minute", type=float,
+                        help="stand-in answers 429 beyond this request weight per minute (http transport)")
+    parser.add_argument("--concurrency", type=int, default=hyperliquid_analysis.MAX_CONCURRENT_REQUESTS,
+                        help="concurrent fetches")
+    parser.add_argument("--windows", default=",".join(hyperliquid_analysis.TIME_WINDOWS),
+                        help="comma-separated time windows, e.g. 5m,15m,4h,7d")
+    parser.add_argument("--trader-error", type=float,
+                        help="count distinct traders with sketches of this standard error "
+                             "(python and vectorized engines; exact by default)")
+    parser.add_argument("--engines", default="python,vectorized,index,rollup,partials",
+                        help="aggregation engines to time")
+    parser.add_argument("--shard-workers", type=int, default=default_workers(),
+                        help="worker processes for the sharded fetch + aggregate stage (0 skips it)")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="runs per stage; the fastest is reported")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="benchmark_report.json",
+                        help="where to write the JSON report")
+    parser.add_argument("--compare", help="earlier report to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="allowed slowdown against --compare (0.25 = 25%%)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    args.engines = args.engines.split(",")
+    args.windows = hyperliquid_analysis.parse_windows(args.windows)
+    # Every repeat fetches from the API again instead of getting the
+    # previous repeat's response from the shared request cache
+    hyperliquid_analysis.FILL_REQUEST_FRESHNESS = 0
+
+    report = {
+        "generated_at": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "parameters": {
+            key: value for key, value in vars(args).items()
+            if key not in ("output", "compare")
+        },
+        "results": [],
+    }
+
+    for size in [int(size) for size in args.sizes.split(",")]:
+        results = run_size(size, args)
+        report["results"].extend(results)
+        for result in results:
+            print(f"{result['addresses']:>6} addresses {result['fills']:>8} fills "
+                  f"{result['stage']:<22} {result['seconds'] * 1000:10.2f} ms")
+
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Report written to {args.output}")
+
+    if args.compare:
+        with open(args.compare, "r") as f:
+            regressions = compare_reports(report, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,110 @@
+import json
+import os
+import threading
+
+from fill_store import DEFAULT_STORE_DIR, RETENTION_DAYS, retained_from
+
+# Kept inside the fill store so clearing the store also clears the marks
+DEFAULT_MARKS_PATH = os.path.join(DEFAULT_STORE_DIR, "_high_water_marks.json")
+
+
+def advance_mark(mark, fetched_from, newest):
+    """The marks of an address after a fetch from `fetched_from` whose
+    newest fill is at `newest` (None without fills), starting from `mark`"""
+    incremental = mark is not None and mark.get("covered_from", float("inf")) <= fetched_from
+    entry = dict(mark) if incremental else {"covered_from": fetched_from, "high_water_mark": None}
+    if newest is not None:
+        entry["high_water_mark"] = max(entry.get("high_water_mark") or 0, newest)
+    return entry
+
+
+class FillCache:
+    """High-water marks for the fills already held in the fill store
+
+    For each address it records the oldest time the stored fills are
+    complete from (`covered_from`) and the newest fill time seen
+    (`high_water_mark`). A refresh only needs to ask the API for fills at or
+    after the high-water mark; the millisecond itself is requested again
+    because more fills may have landed in it, and the store drops the
+    overlap by hash/tid when reading. Stored days older than
+    `retention_days` are deleted (see `fill_store.FillStore.apply_retention`),
+    so fills are never taken as covered before the oldest day kept.
+    """
+
+    def __init__(self, path=DEFAULT_MARKS_PATH, retention_days=RETENTION_DAYS):
+        self.path = path
+        self.retention_days = retention_days
+        self._marks = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        if self._marks is None:
+            try:
+                with open(self.path, "r") as f:
+                    self._marks = json.load(f)
+            except (OSError, ValueError):
+                self._marks = {}
+        return self._marks
+
+    def _save(self):
+        """Write the marks atomically so readers never see a partial file"""
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = f"{self.path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self._marks, f)
+        os.replace(tmp_path, self.path)
+
+    def since(self, address, start_time):
+        """Return the time to fetch an address's fills from for a window starting at `start_time`"""
+        return self.since_mark(self.mark(address), start_time)
+
+    def since_mark(self, entry, start_time):
+        """`since` for an address whose marks are `entry` (see `mark`)"""
+        if entry is None:
+            return start_time
+        # Retention deleted whatever was stored before the oldest day kept
+        covered_from = max(entry.get("covered_from", float("inf")), retained_from(self.retention_days))
+        if covered_from > start_time:
+            # Stored fills don't cover this window: fetch all of it
+            return start_time
+        return max(start_time, entry.get("high_water_mark") or start_time)
+
+    def mark(self, address):
+        """The marks recorded for an address ({"covered_from", "high_water_mark"}), or None"""
+        with self._lock:
+            entry = self._load().get(address)
+        return dict(entry) if entry is not None else None
+
+    def update(self, results):
+        """Record fetched fills, once they are in the store
+
+        `results` is an iterable of (address, fetched_from, newest) tuples,
+        where `fetched_from` is the value `since` returned for that fetch and
+        `newest` is the latest fill time it returned (None without fills).
+        """
+        with self._lock:
+            marks = self._load()
+            for address, fetched_from, newest in results:
+                marks[address] = advance_mark(marks.get(address), fetched_from, newest)
+            self._save()
+
+    def clear(self):
+        """Forget every high-water mark"""
+        with self._lock:
+            self._marks = {}
+            if os.path.exists(self.path):
+                os.remove(self.path)
+
+
+# Shared cache, created on first use
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_fill_cache():
+    """Return the process-wide FillCache"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = FillCache()
+        return _cache
@@ -0,0 +1,133 @@
+import threading
+
+import numpy as np
+
+
+class Interner:
+    """Gives each distinct string a small integer id
+
+    Ids are shared by every fill in the process and never reused, so a
+    fill only needs to carry the id.
+    """
+
+    def __init__(self, values=()):
+        self.values = []
+        self._ids = {}
+        self._lock = threading.Lock()
+        for value in values:
+            self.id(value)
+
+    def id(self, value):
+        """Return the id of `value`, assigning the next free one if it is new"""
+        ident = self._ids.get(value)
+        if ident is None:
+            with self._lock:
+                ident = self._ids.get(value)
+                if ident is None:
+                    ident = len(self.values)
+                    # Publish the value before the id, so any id a reader
+                    # can see is already in `values`
+                    self.values.append(value)
+                    self._ids[value] = ident
+        return ident
+
+
+COINS = Interner()
+ADDRESSES = Interner()
+
+# Directions the API reports, so the usual ones get small fixed codes;
+# anything else is added on first sight
+DIRECTIONS = Interner([
+    "Open Long",
+    "Open Short",
+    "Close Long",
+    "Close Short",
+    "Buy",
+    "Sell",
+    "Long > Short",
+    "Short > Long",
+])
+
+# One fill as kept in memory: 43 bytes instead of a dict of strings. Fields
+# the analysis never reads (hash, oid, fee, crossed, startPosition, ...)
+# are dropped when fills are parsed. A missing trader or direction is -1.
+FILL_DTYPE = np.dtype([
+    ("time", np.int64),
+    ("coin", np.int32),
+    ("trader", np.int32),
+    ("dir", np.int16),
+    ("side", np.int8),    # Index into SIDE_VALUES, -1 = unknown
+    ("px", np.float64),
+    ("sz", np.float64),
+    ("tid", np.int64),
+])
+
+# "A" is the ask (sell) side, "B" the bid (buy) side
+SIDE_VALUES = ["A", "B"]
+SIDES = {side: code for code, side in enumerate(SIDE_VALUES)}
+
+
+def _number(value, default):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def _numbers(values, default=np.nan):
+    """Parse a list of numbers or numeric strings into a float64 array
+
+    The whole list is converted in one call; only when it holds something
+    unparseable is it redone value by value, with `default` for the bad
+    ones. Missing values (None) are NaN.
+    """
+    try:
+        return np.array(values, dtype=np.float64)
+    except (TypeError, ValueError):
+        return np.array([_number(value, default) for value in values], dtype=np.float64)
+
+
+def _integers(values, default=-1):
+    """Like `_numbers`, for int64 values such as times and trade ids"""
+    try:
+        return np.array(values, dtype=np.int64)
+    except (TypeError, ValueError, OverflowError):
+        parsed = _numbers(values, np.nan)
+        return np.where(np.isnan(parsed), default, parsed).astype(np.int64)
+
+
+def fills_to_records(fills, address=None):
+    """Parse fill dicts (as returned by the API) into a FILL_DTYPE array
+
+    Each field is pulled out of every fill and converted as one column, so
+    string-to-number parsing happens once per fill, in NumPy. With
+    `address` every fill is attributed to that trader; otherwise each
+    fill's `trader_address` is used. Fills without a time or coin are
+    skipped, and unparseable prices or sizes become NaN.
+    """
+    records = np.empty(len(fills), dtype=FILL_DTYPE)
+    if not fills:
+        return records
+
+    times = _integers([fill.get('time') for fill in fills])
+    coins = [fill.get('coin') for fill in fills]
+    directions = [fill.get('dir') for fill in fills]
+
+    records["time"] = times
+    records["coin"] = [COINS.id(coin) if coin else -1 for coin in coins]
+    if address is not None:
+        records["trader"] = ADDRESSES.id(address)
+    else:
+        records["trader"] = [
+            ADDRESSES.id(trader) if isinstance(trader, str) else -1
+            for trader in (fill.get('trader_address') for fill in fills)
+        ]
+    records["dir"] = [DIRECTIONS.id(d) if isinstance(d, str) else -1 for d in directions]
+    records["side"] = [SIDES.get(fill.get('side'), -1) for fill in fills]
+    records["px"] = _numbers([fill.get('px') for fill in fills])
+    records["sz"] = _numbers([fill.get('sz') for fill in fills])
+    records["tid"] = _integers([fill.get('tid') for fill in fills])
+
+    # Fills without a time or coin can't be placed in a window
+    valid = (times >= 0) & (records["coin"] >= 0)
+    return records if valid.all() else records[valid]
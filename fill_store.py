@@ -0,0 +1,281 @@
+import os
+import shutil
+import threading
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from fill_records import ADDRESSES, COINS, DIRECTIONS, SIDE_VALUES, fills_to_records
+
+# Default location, next to the app rather than the current directory
+# (run_analysis changes into hyperliquid_data/ while it runs)
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "hyperliquid_data")
+DEFAULT_STORE_DIR = os.path.join(DATA_DIR, "fills")
+
+# Days of fills kept on disk
+RETENTION_DAYS = 7
+
+# Rewrite a day/coin partition into one file once it has this many files
+COMPACT_THRESHOLD = 16
+
+# Columns stored for each fill (the fields of `fill_records.FILL_DTYPE`).
+# `day` and `coin` are the partition keys and live in the directory names
+# rather than in the files. Files written with more columns by older
+# versions still read fine; the extra columns are ignored.
+FILL_SCHEMA = pa.schema([
+    ("time", pa.int64()),
+    ("trader_address", pa.dictionary(pa.int32(), pa.string())),
+    ("dir", pa.dictionary(pa.int8(), pa.string())),
+    ("side", pa.dictionary(pa.int8(), pa.string())),
+    ("px", pa.float64()),
+    ("sz", pa.float64()),
+    ("tid", pa.int64()),
+])
+
+PARTITIONING = ds.partitioning(
+    pa.schema([("day", pa.string()), ("coin", pa.string())]),
+    flavor="hive"
+)
+
+# Schema of the whole store: file columns plus the partition keys
+DATASET_SCHEMA = FILL_SCHEMA.append(pa.field("day", pa.string())).append(pa.field("coin", pa.string()))
+
+# Identity of a stored fill, used to drop fills written more than once. A
+# trade id only repeats for one trader on a self-trade, where the two sides
+# have different directions.
+DEDUP_COLUMNS = ["trader_address", "tid", "time", "dir"]
+
+MS_PER_DAY = 24 * 3600 * 1000
+
+
+def _day(timestamp_ms):
+    return datetime.fromtimestamp(timestamp_ms / 1000, tz=timezone.utc).strftime("%Y-%m-%d")
+
+
+def retained_from(retention_days=RETENTION_DAYS, now=None):
+    """Start (milliseconds) of the oldest day `FillStore.apply_retention` keeps"""
+    now = now or datetime.now(timezone.utc)
+    oldest_day = (now - timedelta(days=retention_days)).replace(hour=0, minute=0, second=0, microsecond=0)
+    return int(oldest_day.timestamp() * 1000)
+
+
+def _dictionary(codes, values, index_type):
+    """Dictionary array of interned `codes`, holding only the values they use
+
+    Negative codes become nulls.
+    """
+    valid = codes >= 0
+    used, indices = np.unique(codes[valid], return_inverse=True)
+    full = np.zeros(len(codes), dtype=index_type)
+    full[valid] = indices
+    return pa.DictionaryArray.from_arrays(
+        pa.array(full, mask=~valid),
+        pa.array([values[code] for code in used], pa.string())
+    )
+
+
+def records_to_table(records):
+    """Convert a `fill_records.FILL_DTYPE` array to a typed table
+
+    The table has the FILL_SCHEMA columns plus `day` and `coin`. Each
+    column is built with whole-array operations; only distinct coins,
+    traders and days are looked up one by one.
+    """
+    days, day_index = np.unique(records["time"] // MS_PER_DAY, return_inverse=True)
+    day_names = pa.array([_day(int(day) * MS_PER_DAY) for day in days], pa.string())
+    tid = np.ascontiguousarray(records["tid"])
+
+    table = pa.table({
+        "time": np.ascontiguousarray(records["time"]),
+        "trader_address": _dictionary(records["trader"], ADDRESSES.values, np.int32),
+        "dir": _dictionary(records["dir"], DIRECTIONS.values, np.int8),
+        "side": _dictionary(records["side"], SIDE_VALUES, np.int8),
+        "px": np.ascontiguousarray(records["px"]),
+        "sz": np.ascontiguousarray(records["sz"]),
+        "tid": pa.array(tid, mask=tid < 0),
+    }, schema=FILL_SCHEMA)
+    return (
+        table
+        .append_column("day", day_names.take(pa.array(day_index.astype(np.int32))))
+        .append_column("coin", _dictionary(records["coin"], COINS.values, np.int32).dictionary_decode())
+    )
+
+
+def fills_to_table(fills):
+    """Convert fill dicts tagged with `trader_address` to a typed table
+
+    See `fill_records.fills_to_records` and `records_to_table`.
+    """
+    return records_to_table(fills_to_records(fills))
+
+
+def table_to_frame(table):
+    """Convert a fills table to a DataFrame with the same columns as `FillStore.read`"""
+    if "day" in table.column_names:
+        table = table.drop_columns(["day"])
+    df = table.to_pandas()
+    df['coin'] = df['coin'].astype('category')
+    return df
+
+
+def fills_to_frame(fills):
+    """Convert fill dicts to a typed DataFrame with the same columns as `FillStore.read`"""
+    return table_to_frame(fills_to_table(fills))
+
+
+class FillStore:
+    """Parquet fill store partitioned by UTC day and coin
+
+    Fills are appended as new files under `day=YYYY-MM-DD/coin=XXX/`, so a
+    read for a time window only opens the days it covers. Days older than
+    RETENTION_DAYS are deleted and partitions that accumulate many small
+    files are compacted, which keeps disk usage bounded.
+    """
+
+    def __init__(self, directory=DEFAULT_STORE_DIR, retention_days=RETENTION_DAYS):
+        self.directory = directory
+        self.retention_days = retention_days
+        self._lock = threading.RLock()
+
+    def append(self, fills):
+        """Write fills (dicts tagged with `trader_address`) to the store"""
+        return self.append_table(fills_to_table(fills))
+
+    def append_table(self, table):
+        """Write a table built by `records_to_table` to the store"""
+        if table.num_rows == 0:
+            return 0
+
+        # One chunk per write: every chunk would become its own row group
+        table = table.combine_chunks()
+
+        with self._lock:
+            ds.write_dataset(
+                table,
+                self.directory,
+                format="parquet",
+                partitioning=PARTITIONING,
+                basename_template=f"part-{uuid.uuid4().hex}-{{i}}.parquet",
+                existing_data_behavior="overwrite_or_ignore"
+            )
+        return table.num_rows
+
+    def _dataset(self):
+        return ds.dataset(
+            self.directory,
+            schema=DATASET_SCHEMA,
+            format="parquet",
+            partitioning=PARTITIONING
+        )
+
+    def _filter(self, start_time, end_time=None, addresses=None):
+        expression = (ds.field("day") >= _day(start_time)) & (ds.field("time") >= start_time)
+        if end_time is not None:
+            expression &= (ds.field("day") <= _day(end_time)) & (ds.field("time") <= end_time)
+        if addresses is not None:
+            expression &= ds.field("trader_address").isin(list(addresses))
+        return expression
+
+    def read(self, start_time, end_time=None, addresses=None):
+        """Read fills in a time window as a DataFrame, optionally for some addresses
+
+        Only the day partitions overlapping the window are scanned.
+        """
+        columns = FILL_SCHEMA.names + ["coin"]
+        with self._lock:
+            if not os.path.isdir(self.directory):
+                return pd.DataFrame(columns=columns)
+
+            table = self._dataset().to_table(
+                columns=columns,
+                filter=self._filter(start_time, end_time, addresses)
+            )
+
+        return table_to_frame(table).drop_duplicates(subset=DEDUP_COLUMNS).reset_index(drop=True)
+
+    def iter_frames(self, start_time, end_time=None, addresses=None):
+        """Yield the fills `read` would return, one day/coin partition at a time
+
+        A fill and its duplicates always share a partition, so each frame is
+        deduplicated on its own and only one partition is held in memory.
+        The store stays locked until the generator is exhausted or closed.
+        """
+        columns = FILL_SCHEMA.names + ["coin"]
+        with self._lock:
+            if not os.path.isdir(self.directory):
+                return
+
+            expression = self._filter(start_time, end_time, addresses)
+            partitions = {}
+            for fragment in self._dataset().get_fragments(filter=expression):
+                partitions.setdefault(os.path.dirname(fragment.path), []).append(fragment)
+
+            for fragments in partitions.values():
+                partition = ds.FileSystemDataset(fragments, DATASET_SCHEMA, ds.ParquetFileFormat())
+                table = partition.to_table(columns=columns, filter=expression)
+                if table.num_rows == 0:
+                    continue
+                yield table_to_frame(table).drop_duplicates(subset=DEDUP_COLUMNS).reset_index(drop=True)
+
+    def apply_retention(self, now=None):
+        """Delete expired days and compact partitions with many small files"""
+        oldest_day = _day(retained_from(self.retention_days, now))
+
+        with self._lock:
+            if not os.path.isdir(self.directory):
+                return
+
+            for day_dir in os.listdir(self.directory):
+                if not day_dir.startswith("day="):
+                    continue
+                day_path = os.path.join(self.directory, day_dir)
+                if day_dir[len("day="):] < oldest_day:
+                    shutil.rmtree(day_path, ignore_errors=True)
+                    continue
+
+                for coin_dir in os.listdir(day_path):
+                    self._compact(os.path.join(day_path, coin_dir))
+
+    def _compact(self, partition_path):
+        """Rewrite a partition's files as one deduplicated file"""
+        files = [
+            os.path.join(partition_path, name)
+            for name in os.listdir(partition_path)
+            if name.endswith(".parquet")
+        ]
+        if len(files) < COMPACT_THRESHOLD:
+            return
+
+        table = pa.concat_tables([pq.read_table(path, schema=FILL_SCHEMA) for path in files])
+        df = table.to_pandas().drop_duplicates(subset=DEDUP_COLUMNS)
+        compacted = pa.Table.from_pandas(df, schema=FILL_SCHEMA, preserve_index=False)
+
+        tmp_path = os.path.join(partition_path, f".compact-{uuid.uuid4().hex}.tmp")
+        pq.write_table(compacted, tmp_path)
+        os.replace(tmp_path, os.path.join(partition_path, f"part-{uuid.uuid4().hex}-0.parquet"))
+        for path in files:
+            os.remove(path)
+
+    def clear(self):
+        """Remove every stored fill"""
+        with self._lock:
+            shutil.rmtree(self.directory, ignore_errors=True)
+
+
+# Shared store, created on first use
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_fill_store():
+    """Return the process-wide FillStore"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = FillStore()
+        return _store
@@ -0,0 +1,229 @@
+import json
+import os
+import threading
+import time
+
+try:
+    # Only the websocket stream needs it
+    from websockets.sync.client import connect
+except ImportError:
+    connect = None
+
+import numpy as np
+
+from fill_records import fills_to_records
+from hyperliquid_analysis import MAX_CONCURRENT_REQUESTS, iter_fills_concurrently
+
+# Hyperliquid websocket endpoint; point HYPERLIQUID_WS_URL at a stand-in
+# to test against it
+WS_URL = os.environ.get("HYPERLIQUID_WS_URL", "wss://api.hyperliquid.xyz/ws")
+
+# Distinct users Hyperliquid allows across user-specific websocket
+# subscriptions per IP; larger watchlists are polled (see PollingFillStream)
+MAX_USERS = 10
+
+# The server drops connections that are quiet for a minute: ping after this
+# many quiet seconds
+PING_INTERVAL = 30.0
+
+# Seconds before reconnecting after the connection drops, doubling on every
+# failed attempt up to RECONNECT_MAX
+RECONNECT_MIN = 1.0
+RECONNECT_MAX = 60.0
+
+# Seconds between the starts of two polls of a watchlist's new fills; the
+# rate limiter may space them further apart
+POLL_INTERVAL = 10.0
+
+
+class WebsocketFillStream:
+    """New fills of a watchlist, from Hyperliquid's websocket `userFills` feed
+
+    Iterating subscribes to every address over one connection and yields
+    each message's fills as they arrive, as a `fill_records.FILL_DTYPE`
+    array attributed to its address. Fills come aggregated by time, as
+    the API's `userFillsByTime` returns them by default, so they match
+    fills loaded from there. A dropped connection is reopened with backoff
+    and the addresses subscribed again; every subscription starts with a
+    snapshot of recent fills, so fills missed meanwhile come through too,
+    along with some already seen (which `sliding_windows.SlidingWindows`
+    skips). `close()`, from any thread, ends the iteration. At most
+    MAX_USERS addresses can be streamed from one IP.
+    """
+
+    def __init__(self, addresses, url=WS_URL):
+        if connect is None:
+            raise ImportError("The websocket fill stream needs the websockets package")
+        if len(set(address.lower() for address in addresses)) > MAX_USERS:
+            raise ValueError(f"Hyperliquid streams the fills of at most {MAX_USERS} addresses per IP, not {len(addresses)}")
+        self.addresses = list(addresses)
+        self.url = url
+        self.reconnects = 0     # Times the connection dropped or failed to open
+        self.last_error = None  # Why, until the next successful connection
+        # The feed reports addresses in lower case
+        self._addresses = {address.lower(): address for address in self.addresses}
+        self._closed = threading.Event()
+        self._connection = None
+
+    def _subscribe(self, connection):
+        for address in self.addresses:
+            connection.send(json.dumps({
+                "method": "subscribe",
+                "subscription": {"type": "userFills", "user": address, "aggregateByTime": True},
+            }))
+
+    def _parse(self, message):
+        """Fills in a userFills message, or None for other messages"""
+        data = json.loads(message)
+        if data.get("channel") != "userFills":
+            return None
+        payload = data.get("data") or {}
+        user = payload.get("user") or ""
+        address = self._addresses.get(user.lower(), user)
+        return fills_to_records(payload.get("fills") or [], address)
+
+    def __iter__(self):
+        delay = RECONNECT_MIN
+        while not self._closed.is_set():
+            try:
+                with connect(self.url) as connection:
+                    self._connection = connection
+                    self._subscribe(connection)
+                    self.last_error = None
+                    delay = RECONNECT_MIN
+                    while not self._closed.is_set():
+                        try:
+                            message = connection.recv(timeout=PING_INTERVAL)
+                        except TimeoutError:
+                            connection.send(json.dumps({"method": "ping"}))
+                            continue
+                        fills = self._parse(message)
+                        if fills is not None and len(fills):
+                            yield fills
+            except Exception as e:
+                if self._closed.is_set():
+                    break
+                self.last_error = e
+                self.reconnects += 1
+                self._closed.wait(delay)
+                delay = min(delay * 2, RECONNECT_MAX)
+            finally:
+                self._connection = None
+
+    def close(self):
+        """Stop the stream and close its connection"""
+        self._closed.set()
+        connection = self._connection
+        if connection is not None:
+            connection.close()
+
+
+class PollingFillStream:
+    """New fills of a watchlist, polled from the API for watchlists too large to stream
+
+    Every POLL_INTERVAL seconds (or `interval`) each address's fills since
+    its newest one so far are fetched through the rate-limited client
+    (see `hyperliquid_analysis.iter_fills_concurrently`), starting from
+    when the stream was made. Iterating yields each poll's new fills as
+    one time-ordered array, like `WebsocketFillStream`; the newest
+    millisecond is fetched again, and `sliding_windows.SlidingWindows`
+    skips the fills already seen. Failed addresses are retried at the
+    next poll. `close()`, from any thread, ends the iteration.
+    """
+
+    def __init__(self, addresses, interval=POLL_INTERVAL, max_requests=MAX_CONCURRENT_REQUESTS):
+        self.addresses = list(addresses)
+        self.interval = interval
+        self.max_requests = max_requests
+        self.reconnects = 0     # Polls with failed addresses
+        self.last_error = None  # Why, until a poll succeeds for every address
+        started = int(time.time() * 1000)
+        self._since = {address: started for address in self.addresses}
+        self._closed = threading.Event()
+
+    def _poll(self):
+        batches = []
+        error = None
+        for address, fills, fetch_error in iter_fills_concurrently(self.addresses, dict(self._since), self.max_requests):
+            if fetch_error is not None:
+                error = fetch_error
+                continue
+            if len(fills):
+                self._since[address] = max(self._since[address], int(fills['time'].max()))
+                batches.append(fills)
+        if error is not None:
+            self.reconnects += 1
+        self.last_error = error
+        if not batches:
+            return None
+        records = np.concatenate(batches)
+        return records[np.argsort(records['time'], kind='stable')]
+
+    def __iter__(self):
+        while not self._closed.is_set():
+            started = time.monotonic()
+            fills = self._poll()
+            if fills is not None and not self._closed.is_set():
+                yield fills
+            self._closed.wait(max(0.0, self.interval - (time.monotonic() - started)))
+
+    def close(self):
+        """Stop polling after the poll in progress"""
+        self._closed.set()
+
+
+class ReplayFillStream:
+    """Local stand-in for the websocket feed: plays recorded or synthetic fills as if live
+
+    `fills_by_address` maps addresses to fill dicts, e.g. from
+    `synthetic_fills.generate_dataset` (with `now_ms` in the future) or
+    recorded fixtures (see `standin_server.load_fixtures`). Iterating
+    yields fill arrays like `WebsocketFillStream`, in time order:
+    fills from before the iteration started all go out at once, later ones
+    when they are due, with the clock running `speed` times faster (their
+    times are moved to when they are sent). Fills due together are sent
+    together.
+    """
+
+    def __init__(self, fills_by_address, speed=1.0):
+        self.speed = speed
+        self.reconnects = 0     # Never reconnects; kept for the same interface
+        self.last_error = None
+        self._events = sorted([
+            (int(fill['time']), address, fill)
+            for address, fills in fills_by_address.items()
+            for fill in fills
+            if fill.get('time') is not None
+        ], key=lambda event: event[0])
+        self._closed = threading.Event()
+
+    def __len__(self):
+        return len(self._events)
+
+    def _due(self, timestamp, started):
+        """When a fill happening at `timestamp` is sent, on the sped-up clock"""
+        return timestamp if timestamp <= started else started + (timestamp - started) / self.speed
+
+    def __iter__(self):
+        started = time.time() * 1000
+        position = 0
+        while position < len(self._events) and not self._closed.is_set():
+            now = time.time() * 1000
+            due = self._due(self._events[position][0], started)
+            if due > now:
+                self._closed.wait((due - now) / 1000)
+                continue
+
+            batch = []
+            while position < len(self._events):
+                timestamp, address, fill = self._events[position]
+                due = self._due(timestamp, started)
+                if due > now:
+                    break
+                batch.append(dict(fill, time=int(due), trader_address=address))
+                position += 1
+            yield fills_to_records(batch)
+
+    def close(self):
+        """Stop the replay"""
+        self._closed.set()
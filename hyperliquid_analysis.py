@@ -1,11 +1,28 @@
 import pandas as pd
 import numpy as np
-import requests
 import json
 import time
 import os
+import re
+import threading
+from bisect import bisect_right
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from datetime import datetime, timedelta
-import streamlit as st
+
+from address_partials import PartialAccumulator, get_partial_cache
+from fill_cache import advance_mark, get_fill_cache
+from fill_records import FILL_DTYPE, fills_to_records
+from fill_store import DATA_DIR, get_fill_store, records_to_table, table_to_frame
+from hyperliquid_client import CircuitOpenError, get_client, set_client
+from minute_rollup import MinuteRollup, mark_covers
+from price_cache import get_price_cache
+from reporting import default_reporter, logger
+from result_cache import get_result_cache, result_key
+from sharded_aggregation import iter_shards
+from single_flight import SingleFlight
+from time_index import TimeIndexAccumulator
+from trader_sketch import TraderSketch
+from vectorized_aggregation import WindowAccumulator, update_last_trades
 
 # Define class for compatibility with IPython.display
 class HTML:
@@ -14,11 +31,25 @@ class HTML:
 
 # Define display function for compatibility with IPython.display
 def display(content):
+    # Imported here so the analysis itself never needs Streamlit
+    import streamlit as st
     if isinstance(content, HTML):
         st.markdown(content.content, unsafe_allow_html=True)
     else:
         st.write(content)
 
+# Where progress and diagnostics go (see reporting.Reporter); None picks
+# the Streamlit page inside the app and the logging module anywhere else
+REPORTER = None
+
+# The reporter of the run in progress on each thread, so that helpers
+# called during a run add to its counters and log
+_run = threading.local()
+
+def get_reporter():
+    """The reporter for this run"""
+    return REPORTER or getattr(_run, 'reporter', None) or default_reporter()
+
 # Define trader addresses - will be updated from app.py
 TRADER_ADDRESSES = ["0xac50a255e330c388f44b9d01259d6b153a9f0ed9"]  # Default address
 
@@ -26,7 +57,7 @@ TRADER_ADDRESSES = ["0xac50a255e330c388f44b9d01259d6b153a9f0ed9"]  # Default add
 def get_trader_addresses():
     # First try to use the global TRADER_ADDRESSES
     if TRADER_ADDRESSES and len(TRADER_ADDRESSES) > 0:
-        st.write(f"Using {len(TRADER_ADDRESSES)} trader addresses from module variable")
+        get_reporter().info(f"Using {len(TRADER_ADDRESSES)} trader addresses from module variable")
         return TRADER_ADDRESSES
     
     # Then try to read from a file
@@ -34,165 +65,263 @@ def get_trader_addresses():
         if os.path.exists("trader_addresses.txt"):
             with open("trader_addresses.txt", "r") as f:
                 addresses = [line.strip() for line in f if line.strip()]
-            st.write(f"Loaded {len(addresses)} trader addresses from file")
+            get_reporter().info(f"Loaded {len(addresses)} trader addresses from file")
             return addresses
         elif os.path.exists("addresses.txt"):
             with open("addresses.txt", "r") as f:
                 addresses = [line.strip() for line in f if line.strip()]
-            st.write(f"Loaded {len(addresses)} trader addresses from addresses.txt")
+            get_reporter().info(f"Loaded {len(addresses)} trader addresses from addresses.txt")
             return addresses
     except Exception as e:
-        st.error(f"Error reading addresses from file: {e}")
+        get_reporter().error(f"Error reading addresses from file: {e}")
     
     # Fallback to default address
-    st.write(f"Using default test address: {TRADER_ADDRESSES[0]}")
+    get_reporter().info(f"Using default test address: {TRADER_ADDRESSES[0]}")
     return TRADER_ADDRESSES
 
-# Fallback prices if needed
-DEFAULT_PRICES = {
-    "BTC": 83100.00,
-    "ETH": 4450.00,
-    "SOL": 267.60,
-    "AVAX": 114.85,
-    "HYPE": 11.39,
-    "XRP": 0.52,
-    "HBAR": 0.09,
-    "FARTCOIN": 1.20,
-    "MELANIA": 0.39,
-    "@107": 0.09
-}
-
-def save_to_file(data, filename):
-    """Save data to a JSON file"""
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    filename = f"{filename}_{timestamp}.json"
+# Maximum number of addresses fetched from the API at the same time
+MAX_CONCURRENT_REQUESTS = 8
+
+# Sessions asking for the same address's fills from the same time share one
+# API call, and its result for this many seconds after it arrives
+FILL_REQUEST_FRESHNESS = 5.0
+
+# Start times are rounded down to this many milliseconds for the request, so
+# sessions whose windows start within the same minute make the same one
+FILL_REQUEST_BUCKET_MS = 60 * 1000
+
+# Fill requests in flight or just finished, shared by every session
+fill_requests = SingleFlight()
+
+# Read fills back from the local fill store and only request fills newer
+# than the last run
+USE_FILL_CACHE = True
+
+# How the summary table is computed: "vectorized" (grouped NumPy reductions),
+# "index" (per-coin time index with cumulative sums), "rollup" (per-minute
+# buckets kept between runs), "partials" (per-address per-minute sums kept
+# between runs, so watchlist changes only aggregate the new addresses) or
+# "python" (one pass over fill dicts). With "rollup" and "partials" windows
+# start on a whole minute.
+AGGREGATION_ENGINE = "vectorized"
+
+# Time windows shown in the summary, each ending now. The longest one is the
+# primary window: it decides how far back fills are fetched and is used for
+# the headline volume, open positions and entry prices.
+TIME_WINDOWS = ["24h", "12h", "6h", "3h", "1h"]
+
+# Window lengths: a number followed by m (minutes), h (hours), d (days) or w (weeks)
+WINDOW_UNITS = {"m": "minutes", "h": "hours", "d": "days", "w": "weeks"}
+
+# Worker processes that fetch and aggregate shards of the watchlist. Above 1,
+# each worker reduces its addresses to per-address partials (as the
+# "partials" engine does) and only those are sent back and merged, so
+# aggregation uses every core; 1 keeps everything in this process.
+AGGREGATION_WORKERS = 1
+
+# Distinct traders are counted exactly for watchlists of up to this many
+# addresses. Larger ones are counted with HyperLogLog sketches (fixed memory
+# per coin and window) with this standard error; None always counts exactly.
+# Only the python and vectorized engines use sketches: the partials engine
+# (and so sharded runs), the index and the rollup always count exactly.
+# Their state already holds one entry per trader and coin, so a sketch
+# would not bound their memory.
+EXACT_TRADER_LIMIT = 2000
+TRADER_COUNT_ERROR = 0.02
+
+# Fetched fills are added to the summary and written to the fill store in
+# batches of about this many: memory stays bounded however many addresses
+# are analysed, without paying the per-chunk overhead for every address
+FILL_BATCH_SIZE = 50000
+
+# Identical analyses (same addresses and settings) started within the same
+# period of this many seconds share one summary (see cached_analysis);
+# 0 always computes a new one
+RESULT_FRESHNESS = 60
+
+# Settings a run can be given instead of the module defaults above (see RunSettings)
+RUN_SETTINGS = (
+    'MAX_CONCURRENT_REQUESTS',
+    'USE_FILL_CACHE',
+    'AGGREGATION_ENGINE',
+    'AGGREGATION_WORKERS',
+    'TIME_WINDOWS',
+    'RESULT_FRESHNESS',
+    'EXACT_TRADER_LIMIT',
+    'TRADER_COUNT_ERROR',
+)
+
+class RunSettings:
+    """The settings of one analysis run
+    
+    Each of RUN_SETTINGS, as a lower-case attribute, comes from `settings`
+    (setting name -> value) or else from this module's variable of that
+    name when the RunSettings is made. A run only reads its own, so runs
+    on other threads (sessions, the refresh scheduler) with other settings
+    can go on at the same time.
+    """
     
-    with open(filename, 'w') as f:
-        json.dump(data, f, indent=2)
+    def __init__(self, settings=None):
+        settings = settings or {}
+        unknown = set(settings) - set(RUN_SETTINGS)
+        if unknown:
+            raise ValueError(f"Unknown settings: {', '.join(sorted(unknown))}")
+        for name in RUN_SETTINGS:
+            setattr(self, name.lower(), settings[name] if name in settings else globals()[name])
     
-    st.write(f"Data saved to {filename}")
-    return filename
+    def sharded(self, addresses):
+        """Whether a run of `addresses` fetches and aggregates in worker processes"""
+        return self.aggregation_workers > 1 and len(addresses) > 1
+    
+    def engine(self, addresses):
+        """The aggregation engine a run of `addresses` uses (sharded runs use partials)"""
+        return "partials" if self.sharded(addresses) else self.aggregation_engine
 
-def get_price_data():
-    """Fetch current prices from Hyperliquid API"""
-    url = "https://api.hyperliquid.xyz/info"
-    payload = {"type": "metaAndAssetCtxs"}
+# Latest summary table, overwritten on every run
+SUMMARY_FILE = os.path.join(DATA_DIR, "trading_summary.parquet")
+
+# Notional traded per address, halved every run before the new fills are
+# added: addresses that traded the most recently are fetched first
+ADDRESS_VOLUMES_FILE = os.path.join(DATA_DIR, "address_volumes.json")
+VOLUME_DECAY = 0.5
+
+def load_address_volumes(path=ADDRESS_VOLUMES_FILE):
+    """Decayed notional volume per address from earlier runs"""
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_address_volumes(volumes, path=ADDRESS_VOLUMES_FILE):
+    """Save the volumes that order the next run's fetches"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(volumes, f)
+    os.replace(tmp_path, path)
+
+def fills_notional(fills):
+    """Notional value (size x price) of a fill records array"""
+    return float(np.sum(np.abs(fills['sz']) * fills['px'])) if len(fills) else 0.0
+
+def save_summary(df, path=SUMMARY_FILE):
+    """Save the summary table, replacing the previous one"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # Runs on other threads may be saving theirs at the same time
+    tmp_path = f"{path}.{threading.get_ident()}.tmp"
+    df.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, path)
     
+    get_reporter().info(f"Summary saved to {path}")
+    return path
+
+def get_price_data():
+    """Get current prices from the shared price snapshot cache"""
     try:
-        response = requests.post(url, json=payload)
-        if response.status_code == 200:
-            data = response.json()
-            
-            # Check if the response has the expected structure
-            if not isinstance(data, list) or len(data) < 2:
-                st.warning("Unexpected response structure from metaAndAssetCtxs")
-                return {}, {}
-            
-            # Extract universe (metadata) and asset contexts (prices)
-            meta = data[0]
-            asset_ctxs = data[1]
-            
-            # Create price mappings
-            current_prices = {}
-            prev_day_prices = {}
-            
-            # Get list of coin names from universe
-            coin_names = [coin['name'] for coin in meta['universe']]
-            
-            # Extract prices from asset contexts
-            for i, ctx in enumerate(asset_ctxs):
-                if i < len(coin_names):
-                    coin_name = coin_names[i]
-                    
-                    # Get current price in priority order: midPx, markPx, oraclePx
-                    current_price = None
-                    if 'midPx' in ctx and ctx['midPx'] is not None:
-                        try:
-                            current_price = float(ctx['midPx'])
-                        except (ValueError, TypeError):
-                            pass
-                    
-                    if current_price is None and 'markPx' in ctx and ctx['markPx'] is not None:
-                        try:
-                            current_price = float(ctx['markPx'])
-                        except (ValueError, TypeError):
-                            pass
-                    
-                    if current_price is None and 'oraclePx' in ctx and ctx['oraclePx'] is not None:
-                        try:
-                            current_price = float(ctx['oraclePx'])
-                        except (ValueError, TypeError):
-                            pass
-                    
-                    # Store current price if valid
-                    if current_price is not None:
-                        current_prices[coin_name] = current_price
-                    
-                    # Get previous day price
-                    prev_price = None
-                    if 'prevDayPx' in ctx and ctx['prevDayPx'] is not None:
-                        try:
-                            prev_price = float(ctx['prevDayPx'])
-                        except (ValueError, TypeError):
-                            pass
-                    
-                    # Store previous day price if valid
-                    if prev_price is not None:
-                        prev_day_prices[coin_name] = prev_price
-            
-            st.write(f"Fetched current prices for {len(current_prices)} coins")
-            return current_prices, prev_day_prices
-        else:
-            st.error(f"Error fetching market data: Status code {response.status_code}")
-            return {}, {}
+        snapshot = get_price_cache().get()
     except Exception as e:
-        st.error(f"Exception when fetching market data: {e}")
+        get_reporter().error(f"Error fetching market data: {e}")
         return {}, {}
+    
+    get_reporter().info(f"Fetched current prices for {len(snapshot.current_prices)} coins ({snapshot.age:.0f}s old)")
+    return snapshot.current_prices, snapshot.prev_day_prices
 
-def get_user_fills(address):
-    """Fetch fills data for a specific address"""
-    url = "https://api.hyperliquid.xyz/info"
+def fetch_user_fills(address, start_time=None, priority=0):
+    """Fetch fills data for a specific address, raising on failure
     
-    payload = {
-        "type": "userFills",
-        "user": address,
-        "aggregateByTime": True
-    }
-    headers = {"Content-Type": "application/json"}
+    With `start_time` (milliseconds) only fills from that time onwards are
+    requested; otherwise the API's most recent fills are returned. The
+    response is parsed straight into a compact `fill_records.FILL_DTYPE`
+    array attributed to `address`. Requests with a higher `priority` go
+    first when the rate limiter makes them wait. Requests from other
+    sessions for the same address and FILL_REQUEST_BUCKET_MS bucket of
+    `start_time` share one call (see `fill_requests`), and each keeps the
+    fills from its own `start_time` on; treat the array as read-only.
+    """
+    request_start = None if start_time is None else start_time - start_time % FILL_REQUEST_BUCKET_MS
     
-    try:
-        response = requests.post(url, headers=headers, json=payload)
-        if response.status_code == 200:
-            data = response.json()
-            st.write(f"Fetched {len(data)} fills for {address}")
-            return data
+    def fetch():
+        client = get_client()
+        if request_start is None:
+            fills = client.user_fills(address, priority=priority)
         else:
-            st.error(f"Error fetching fills for {address}: Status code {response.status_code}")
-            return []
+            fills = client.user_fills_by_time(address, request_start, priority=priority)
+        return fills_to_records(fills, address)
+    
+    records = fill_requests.do((address, request_start), fetch, FILL_REQUEST_FRESHNESS)
+    if start_time is not None:
+        keep = records['time'] >= start_time
+        if not keep.all():
+            records = records[keep]
+    return records
+
+def get_user_fills(address, start_time=None):
+    """Fetch fills data for a specific address"""
+    try:
+        data = fetch_user_fills(address, start_time)
+        get_reporter().detail(f"Fetched {len(data)} fills for {address}", "Addresses fetched")
+        return data
     except Exception as e:
-        st.error(f"Exception when fetching fills for {address}: {e}")
+        get_reporter().detail(f"Error fetching fills for {address}: {e}", "Fetch errors")
         return []
 
-def save_fills_to_csv(fills, filename):
-    """Save fills data to CSV"""
-    if not fills:
-        st.warning("No fills data to save")
-        return None
+def iter_fills_concurrently(addresses, start_time=None, max_workers=MAX_CONCURRENT_REQUESTS,
+                            priorities=None):
+    """Fetch fills for many addresses in parallel, yielding each as it arrives
     
-    # Convert to DataFrame
-    df = pd.DataFrame(fills)
+    `start_time` is either one timestamp for every address or a dict of
+    per-address timestamps. Yields (address, fills, error) tuples in
+    completion order. A failed address gets no fills and its exception,
+    so one bad request never affects the others. Only `max_workers`
+    addresses are in flight at a time and the next one starts when a
+    result is handed over, so fills are never buffered for more than a few
+    addresses. `priorities` maps addresses to a number: higher ones
+    are fetched first and go first in the rate limiter.
+    """
+    workers = max(1, min(max_workers, len(addresses)))
+    priorities = priorities or {}
+    queued = iter(sorted(addresses, key=lambda address: -priorities.get(address, 0)))
     
-    # Add human-readable timestamp column
-    if 'time' in df.columns:
-        df['datetime'] = pd.to_datetime(df['time'], unit='ms')
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        running = {}
+        
+        def submit_next():
+            for address in queued:
+                since = start_time.get(address) if isinstance(start_time, dict) else start_time
+                running[executor.submit(fetch_user_fills, address, since, priorities.get(address, 0))] = address
+                return
+        
+        for _ in range(workers):
+            submit_next()
+        
+        while running:
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                address = running.pop(future)
+                submit_next()
+                try:
+                    result = (address, future.result(), None)
+                except Exception as e:
+                    result = (address, np.empty(0, dtype=FILL_DTYPE), e)
+                yield result
+
+def fetch_fills_concurrently(addresses, start_time=None, max_workers=MAX_CONCURRENT_REQUESTS,
+                             on_complete=None, priorities=None):
+    """Fetch fills for many addresses in parallel
     
-    # Save to CSV
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    csv_filename = f"{filename}_{timestamp}.csv"
-    df.to_csv(csv_filename, index=False)
+    Returns a list of (address, fills, error) tuples in the same order as
+    `addresses` (see `iter_fills_concurrently`). `on_complete` is called
+    from the calling thread as each address finishes, with the number
+    completed so far and that address's result tuple.
+    """
+    results = {}
+    for completed, result in enumerate(iter_fills_concurrently(addresses, start_time, max_workers, priorities), start=1):
+        results[result[0]] = result
+        if on_complete is not None:
+            on_complete(completed, result)
     
-    st.write(f"Saved {len(df)} fills to CSV: {csv_filename}")
-    return csv_filename
+    return [results[address] for address in addresses]
 
 def calculate_price_change(current, previous):
     """Calculate percentage change between current and previous values"""
@@ -201,147 +330,178 @@ def calculate_price_change(current, previous):
     
     return ((current - previous) / previous) * 100
 
-def analyze_trader_activity():
-    """Main function to analyze trader activity based on fills data"""
-    # Get trader addresses - first priority use TRADER_ADDRESSES already set
-    # if not available, try to get from other sources
-    trader_addresses = get_trader_addresses()
-    st.write(f"Analyzing activity for {len(trader_addresses)} traders")
-    
-    # Calculate cutoff time for 24h window
-    now = datetime.now()
-    cutoff_times = {
-        '24h': now - timedelta(hours=24),
-        '12h': now - timedelta(hours=12),
-        '6h': now - timedelta(hours=6),
-        '3h': now - timedelta(hours=3),
-        '1h': now - timedelta(hours=1)
-    }
+def parse_window(window):
+    """Length of a window such as '15m', '4h' or '7d' as a timedelta"""
+    match = re.fullmatch(r"\s*(\d+)\s*([mhdw])\s*", window)
+    if not match or int(match.group(1)) == 0:
+        raise ValueError(f"Invalid time window '{window}': use a number followed by m, h, d or w")
+    return timedelta(**{WINDOW_UNITS[match.group(2)]: int(match.group(1))})
+
+def parse_windows(text):
+    """Parse a comma-separated list of windows, longest first, without duplicates
+    
+    Windows longer than the fill store keeps fills for are refused: the
+    store would delete part of them between runs.
+    """
+    windows = [window.strip() for window in text.split(",") if window.strip()]
+    if not windows:
+        raise ValueError("No time windows given")
+    lengths = {window: parse_window(window) for window in windows}
+    retention_days = get_fill_store().retention_days
+    for window, length in lengths.items():
+        if length > timedelta(days=retention_days):
+            raise ValueError(f"Time window '{window}' is longer than the {retention_days} days of fills the fill store keeps")
+    return sorted(lengths, key=lengths.get, reverse=True)
+
+def get_cutoff_timestamps(now=None, windows=None):
+    """Start time of each analysis window, in milliseconds"""
+    now = now or datetime.now()
+    windows = windows or TIME_WINDOWS
+    cutoff_times = {window: now - parse_window(window) for window in windows}
     
     # Convert to timestamps (milliseconds)
-    cutoff_timestamps = {
-        window: int(dt.timestamp() * 1000) 
+    return {
+        window: int(dt.timestamp() * 1000)
         for window, dt in cutoff_times.items()
     }
+
+def get_primary_window(cutoff_timestamps):
+    """The longest window, i.e. the one with the earliest cutoff"""
+    return min(cutoff_timestamps, key=cutoff_timestamps.get)
+
+def new_window_data():
+    """Empty accumulators for one time window"""
+    return {
+        'open_positions': {},  # Coin -> {long, short}
+        'volumes': {},         # Coin -> total volume
+        'unique_traders': {},  # Coin -> set (or TraderSketch) of traders
+        'entry_prices': {}     # Coin -> {long_value, long_size, short_value, short_size}
+    }
+
+def aggregate_fills(fills, cutoff_timestamps, time_windows=None, trader_error=None):
+    """Aggregate fills into every time window in a single pass
     
-    st.write(f"Using cutoff timestamp for 24h: {cutoff_timestamps['24h']} ({cutoff_times['24h'].strftime('%Y-%m-%d %H:%M:%S')})")
-    
-    # Step 1: Fetch current prices
-    st.write("Fetching current prices...")
-    current_prices, prev_day_prices = get_price_data()
+    `cutoff_timestamps` maps window names to their start time in
+    milliseconds. Each fill is parsed once and added to the accumulators of
+    every window it falls in. Returns window name -> accumulators (see
+    `new_window_data`); pass the result back in as `time_windows` to keep
+    adding fills to it. With `trader_error`, unique traders are kept in
+    `TraderSketch`es instead of sets.
+    """
+    if trader_error is None:
+        new_traders = set
+    else:
+        new_traders = lambda: TraderSketch.for_error(trader_error)
     
-    # Calculate price changes
-    price_changes = {}
-    for coin in current_prices:
-        if coin in prev_day_prices:
-            change = calculate_price_change(current_prices[coin], prev_day_prices[coin])
-            if change is not None:
-                price_changes[coin] = change
+    if time_windows is None:
+        time_windows = {window: new_window_data() for window in cutoff_timestamps}
     
-    # Step 2: Fetch and process fills for each address
-    all_fills = []
+    # Sort windows by cutoff, oldest first: a fill falls in a prefix of this list
+    windows_by_cutoff = sorted(cutoff_timestamps, key=cutoff_timestamps.get)
+    cutoffs = [cutoff_timestamps[window] for window in windows_by_cutoff]
+    window_data = [time_windows[window] for window in windows_by_cutoff]
     
-    progress_bar = st.progress(0)
-    for i, address in enumerate(trader_addresses):
-        # Update progress
-        progress = (i + 1) / len(trader_addresses)
-        progress_bar.progress(progress)
-        
-        # Fetch all fills for this address
-        fills = get_user_fills(address)
-        
-        # Add trader address to each fill
-        for fill in fills:
-            fill['trader_address'] = address
+    for fill in fills:
+        # Get basic fill data
+        coin = fill.get('coin')
+        if not coin:
+            continue
         
-        # Add to all fills
-        all_fills.extend(fills)
-    
-    # Reset progress bar
-    progress_bar.empty()
-    
-    # Step 3: Filter only fills from the last 24 hours
-    last_24h_cutoff = cutoff_timestamps['24h']
-    fills_24h = [f for f in all_fills if int(f.get('time', 0)) >= last_24h_cutoff]
-    
-    st.write(f"Total fills: {len(all_fills)}")
-    st.write(f"Fills from last 24 hours: {len(fills_24h)}")
-    
-    # Save all 24h fills to CSV file for investigation
-    fills_csv = save_fills_to_csv(fills_24h, "fills_last_24h")
-    
-    # Step 4: Initialize data structures for each time window
-    time_windows = {}
-    for window, cutoff in cutoff_timestamps.items():
-        fills_window = [f for f in all_fills if int(f.get('time', 0)) >= cutoff]
-        time_windows[window] = {
-            'fills': fills_window,
-            'open_positions': {},  # Coin -> {long, short}
-            'volumes': {},         # Coin -> total volume
-            'unique_traders': {},  # Coin -> set of traders
-            'entry_prices': {}     # Coin -> {long_value, long_size, short_value, short_size}
-        }
-    
-    # Step 5: Process fills for each time window
-    for window, data in time_windows.items():
-        fills = data['fills']
+        # Find the windows this fill belongs to
+        member_count = bisect_right(cutoffs, int(fill.get('time', 0)))
+        if member_count == 0:
+            continue
         
-        # Initialize entry price tracking
-        data['entry_prices'] = {}  # Coin -> {long_value, long_size, short_value, short_size}
+        # Get trader, size, price and direction once per fill
+        # (missing values read back from the fill store are NaN, not None)
+        trader = fill.get('trader_address')
+        if not isinstance(trader, str):
+            trader = None
+        size = abs(float(fill.get('sz', 0.0)))
+        price = float(fill.get('px', 0.0))
+        direction = fill.get('dir')
+        if not isinstance(direction, str):
+            direction = ''
+        is_open = 'Open' in direction
+        is_long = is_open and 'Long' in direction
+        is_short = is_open and not is_long and 'Short' in direction
+        value = size * price
         
-        # Process each fill
-        for fill in fills:
-            # Get basic fill data
-            coin = fill.get('coin')
-            if not coin:
-                continue
-                
-            # Get trader address
-            trader = fill.get('trader_address')
-            
+        for data in window_data[:member_count]:
             # Track unique traders for this coin
-            if coin not in data['unique_traders']:
-                data['unique_traders'][coin] = set()
+            traders = data['unique_traders'].get(coin)
+            if traders is None:
+                traders = data['unique_traders'][coin] = new_traders()
             if trader:
-                data['unique_traders'][coin].add(trader)
-            
-            # Get size, price and direction
-            size = abs(float(fill.get('sz', 0.0)))
-            price = float(fill.get('px', 0.0))
-            direction = fill.get('dir', '')
+                traders.add(trader)
             
             # Track trading volume for this coin
-            if coin not in data['volumes']:
-                data['volumes'][coin] = 0.0
-            data['volumes'][coin] += size
+            data['volumes'][coin] = data['volumes'].get(coin, 0.0) + size
             
             # Track open positions and weighted entry prices
-            if 'Open' in direction:
-                # Initialize entry price tracking for this coin
-                if coin not in data['entry_prices']:
-                    data['entry_prices'][coin] = {
+            if is_open:
+                entry = data['entry_prices'].get(coin)
+                if entry is None:
+                    entry = data['entry_prices'][coin] = {
                         'long_value': 0.0,
                         'long_size': 0.0,
                         'short_value': 0.0,
                         'short_size': 0.0
                     }
                 
-                # Initialize open positions for this coin
-                if coin not in data['open_positions']:
-                    data['open_positions'][coin] = {'long': 0.0, 'short': 0.0}
+                position = data['open_positions'].get(coin)
+                if position is None:
+                    position = data['open_positions'][coin] = {'long': 0.0, 'short': 0.0}
                 
-                if 'Long' in direction:
-                    data['open_positions'][coin]['long'] += size
-                    # Add to weighted entry price calculation
-                    data['entry_prices'][coin]['long_value'] += size * price
-                    data['entry_prices'][coin]['long_size'] += size
-                elif 'Short' in direction:
-                    data['open_positions'][coin]['short'] += size
-                    # Add to weighted entry price calculation
-                    data['entry_prices'][coin]['short_value'] += size * price
-                    data['entry_prices'][coin]['short_size'] += size
-    
-    # Step 6: Calculate metrics for the summary table
+                if is_long:
+                    position['long'] += size
+                    entry['long_value'] += value
+                    entry['long_size'] += size
+                elif is_short:
+                    position['short'] += size
+                    entry['short_value'] += value
+                    entry['short_size'] += size
+    
+    return time_windows
+
+class PythonAccumulator:
+    """Pure-Python counterpart of `vectorized_aggregation.WindowAccumulator`
+    
+    Fills are added one DataFrame chunk at a time with `aggregate_fills`.
+    """
+    
+    def __init__(self, cutoff_timestamps, primary_window='24h', trader_error=None):
+        self.cutoff_timestamps = cutoff_timestamps
+        self.primary_window = primary_window
+        self.trader_error = trader_error
+        self.time_windows = {window: new_window_data() for window in cutoff_timestamps}
+        self.fill_count = 0
+        self._oldest_cutoff = min(cutoff_timestamps.values())
+        self._last_trades = {}  # Coin -> (time, price)
+    
+    def add(self, fills):
+        fills = fills[fills['time'] >= self._oldest_cutoff]
+        if fills.empty:
+            return
+        self.fill_count += len(fills)
+        update_last_trades(self._last_trades, fills)
+        aggregate_fills(fills.to_dict('records'), self.cutoff_timestamps, self.time_windows, self.trader_error)
+    
+    def last_trade_prices(self):
+        return {coin: px for coin, (timestamp, px) in self._last_trades.items()}
+    
+    def summary(self, current_prices, price_changes):
+        return pd.DataFrame(build_summary(
+            self.time_windows, current_prices, price_changes, self.last_trade_prices(), self.primary_window
+        ))
+
+def build_summary(time_windows, current_prices, price_changes, fallback_prices, primary_window='24h'):
+    """Turn per-window accumulators (see `aggregate_fills`) into summary rows
+    
+    Headline volume, open positions and entry prices come from
+    `primary_window`; every window gets its own volume, L/S and trader
+    columns.
+    """
     summary_data = []
     
     # Process each coin with activity
@@ -351,18 +511,14 @@ def analyze_trader_activity():
     
     for coin in all_coins:
         # Skip coins with no data
-        if coin not in time_windows['24h']['volumes']:
+        if coin not in time_windows[primary_window]['volumes']:
             continue
         
-        # Get current price for this coin
+        # Get current price for this coin, falling back to the last price it traded at
         if coin in current_prices:
             current_price = current_prices[coin]
-        elif coin in DEFAULT_PRICES:
-            current_price = DEFAULT_PRICES[coin]
         else:
-            # Use $1 as fallback price
-            current_price = 1.0
-            st.warning(f"No price found for {coin}, using $1.00")
+            current_price = fallback_prices[coin]
         
         # Calculate total volume in USD
         volume_usd = {}
@@ -399,10 +555,10 @@ def analyze_trader_activity():
         # Get price change
         price_change = price_changes.get(coin, 0)
         
-        # Calculate weighted average entry prices (24h window only)
+        # Calculate weighted average entry prices (primary window only)
         entry_prices = {}
-        if coin in time_windows['24h']['entry_prices']:
-            entry_data = time_windows['24h']['entry_prices'][coin]
+        if coin in time_windows[primary_window]['entry_prices']:
+            entry_data = time_windows[primary_window]['entry_prices'][coin]
             
             # Calculate long entry price
             if entry_data['long_size'] > 0:
@@ -430,65 +586,332 @@ def analyze_trader_activity():
             }
             
             # Debug print entry prices for this coin
-            st.write(f"Entry prices for {coin}: Total=${entry_prices['total']}, Long=${entry_prices['long']}, Short=${entry_prices['short']}")
+            get_reporter().detail(f"Entry prices for {coin}: Total=${entry_prices['total']}, Long=${entry_prices['long']}, Short=${entry_prices['short']}")
         else:
             entry_prices = {'total': None, 'long': None, 'short': None}
         
         # Add to summary data
-        summary_data.append({
+        row = {
             'Asset': coin,
             'Current Price': current_price,
             'Price Change': price_change,
-            'Total Notional Value': volume_usd['24h'],  # Use 24h volume
+            'Total Notional Value': volume_usd[primary_window],
             
-            # Open position percentages (24h)
-            'Open Pct Long': ls_ratios['24h']['long'],
-            'Open Pct Short': ls_ratios['24h']['short'],
+            # Open position percentages (primary window)
+            'Open Pct Long': ls_ratios[primary_window]['long'],
+            'Open Pct Short': ls_ratios[primary_window]['short'],
             
             # Entry prices
             'Open Total Avg Entry': entry_prices['total'],
             'Open Long Avg Entry': entry_prices['long'],
             'Open Short Avg Entry': entry_prices['short'],
+        }
+        
+        # Time window data
+        for window in time_windows:
+            row[f'{window} Volume'] = volume_usd[window]
+            row[f'{window} Pct Long'] = ls_ratios[window]['long']
+            row[f'{window} Pct Short'] = ls_ratios[window]['short']
+            row[f'{window} Traders'] = trader_counts[window]
+        
+        summary_data.append(row)
+    
+    return summary_data
+
+def analyze_trader_activity(addresses=None, settings=None, reporter=None):
+    """Main function to analyze trader activity based on fills data
+    
+    Analyses `addresses` (by default get_trader_addresses()) with
+    `settings`, a RunSettings or a dict for one. Progress goes to
+    `reporter`, by default the one from get_reporter().
+    """
+    addresses = list(addresses or get_trader_addresses())
+    settings = settings if isinstance(settings, RunSettings) else RunSettings(settings)
+    _run.reporter = reporter or get_reporter()
+    try:
+        return _analyze_trader_activity(addresses, settings, _run.reporter)
+    finally:
+        _run.reporter.flush()
+        _run.reporter = None
+
+def cached_analysis(addresses=None, settings=None, force_refresh=False, reporter=None):
+    """analyze_trader_activity(addresses, settings), shared between identical requests
+    
+    Requests for the same addresses with the same settings in the same
+    RESULT_FRESHNESS period get one summary, computed once per process
+    even when several sessions ask at the same time; `force_refresh`
+    computes a new one, reporting to `reporter`. Returns (summary,
+    computed at, reused), `reused` telling whether the summary was
+    computed for another request. Treat the summary as read-only.
+    """
+    addresses = list(addresses or get_trader_addresses())
+    settings = settings if isinstance(settings, RunSettings) else RunSettings(settings)
+    # The settings that change the summary
+    result_settings = {
+        'windows': settings.time_windows,
+        'engine': settings.engine(addresses),
+        'exact_trader_limit': settings.exact_trader_limit,
+        'trader_count_error': settings.trader_count_error,
+    }
+    key = result_key(addresses, result_settings, settings.result_freshness)
+    return get_result_cache().get_or_compute(
+        key,
+        lambda: analyze_trader_activity(addresses, settings, reporter),
+        force=force_refresh or settings.result_freshness <= 0,
+        store=settings.result_freshness > 0
+    )
+
+def analyze_watchlist(addresses, settings=None, force_refresh=False, reporter=None):
+    """cached_analysis() of `addresses` with `settings` (setting name ->
+    value, see RUN_SETTINGS); settings not given keep this module's values
+    
+    Runs from different threads (sessions, the refresh scheduler) go on
+    at the same time, each with its own settings.
+    """
+    return cached_analysis(addresses, RunSettings(settings), force_refresh, reporter)
+
+def _analyze_trader_activity(trader_addresses, settings, reporter):
+    reporter.info(f"Analyzing activity for {len(trader_addresses)} traders")
+    
+    # Calculate cutoff times for each window
+    cutoff_timestamps = get_cutoff_timestamps(windows=settings.time_windows)
+    primary_window = get_primary_window(cutoff_timestamps)
+    oldest_cutoff = cutoff_timestamps[primary_window]
+    
+    reporter.info(f"Using cutoff timestamp for {primary_window}: {oldest_cutoff} ({datetime.fromtimestamp(oldest_cutoff / 1000).strftime('%Y-%m-%d %H:%M:%S')})")
+    
+    # Step 1: Fetch current prices
+    reporter.info("Fetching current prices...")
+    current_prices, prev_day_prices = get_price_data()
+    
+    # Calculate price changes
+    price_changes = {}
+    for coin in current_prices:
+        if coin in prev_day_prices:
+            change = calculate_price_change(current_prices[coin], prev_day_prices[coin])
+            if change is not None:
+                price_changes[coin] = change
+    
+    # Step 2: Fetch fills for each address and fold them into the summary
+    # accumulators as they arrive, so only a few addresses' fills are ever
+    # held in memory
+    trader_error = settings.trader_count_error if len(trader_addresses) > settings.exact_trader_limit else None
+    sharded = settings.sharded(trader_addresses)
+    engine = settings.engine(trader_addresses)
+    if engine == "vectorized":
+        # Grouped reductions over typed columns
+        accumulator = WindowAccumulator(cutoff_timestamps, primary_window, trader_error)
+    elif engine == "index":
+        # Binary searches over per-coin cumulative sums
+        accumulator = TimeIndexAccumulator(cutoff_timestamps, primary_window)
+    elif engine == "rollup":
+        # Per-minute buckets, carried over from the last run when possible
+        accumulator = MinuteRollup(cutoff_timestamps, primary_window)
+    elif engine == "partials":
+        # Per-address partials, merged at the end
+        accumulator = PartialAccumulator(cutoff_timestamps, primary_window)
+    else:
+        # One pass over fill dicts
+        accumulator = PythonAccumulator(cutoff_timestamps, primary_window, trader_error)
+    
+    # Work out where each address's fetch starts: the oldest cutoff, or just
+    # the fills newer than what the fill store already holds. The marks are
+    # read once: other runs may move them on while this one goes.
+    fill_store = get_fill_store()
+    fill_cache = get_fill_cache()
+    marks = {address: fill_cache.mark(address) for address in trader_addresses}
+    if settings.use_fill_cache:
+        fetch_from = {address: fill_cache.since_mark(marks[address], oldest_cutoff) for address in trader_addresses}
+    else:
+        fetch_from = {address: oldest_cutoff for address in trader_addresses}
+    
+    # Fetch the addresses that traded the most in earlier runs first
+    volumes = load_address_volumes()
+    priorities = {address: volumes.get(address, 0.0) for address in trader_addresses}
+    
+    # Addresses whose stored fills are already in the saved rollup or a
+    # cached partial: only their new fills are added
+    rolled_up = set()
+    if engine == "rollup" and settings.use_fill_cache:
+        saved = MinuteRollup.load(cutoff_timestamps, primary_window)
+        if saved is not None and saved.reusable(trader_addresses, marks, oldest_cutoff):
+            accumulator = saved
+            rolled_up = set(saved.marks)
+            reporter.info(f"Reusing the minute rollup of {len(rolled_up)} addresses")
+    elif engine == "partials" and settings.use_fill_cache:
+        partial_cache = get_partial_cache()
+        cached = []
+        for address in trader_addresses:
+            mark = marks[address]
+            partial = partial_cache.take(address, mark) if mark_covers(mark, oldest_cutoff) else None
+            if partial is not None:
+                cached.append(partial)
+        accumulator = PartialAccumulator(cutoff_timestamps, primary_window, cached)
+        rolled_up = {partial.address for partial in cached}
+        reporter.info(f"Reusing cached partials of {len(rolled_up)} of {len(trader_addresses)} addresses")
+    
+    fetched = 0
+    stored = 0
+    batch = []       # Fetched records not yet added to the summary
+    newest = []      # (address, fetched_from, newest fill time) per fetched address
+    failed = []
+    circuit_open = False
+    
+    def add_batch():
+        # Add the batched fills to the summary, store them and let them go
+        nonlocal stored
+        if batch:
+            table = records_to_table(np.concatenate(batch))
+            batch.clear()
+            accumulator.add(table_to_frame(table))
+            stored += fill_store.append_table(table)
+    
+    if sharded:
+        # Worker processes fetch, store and aggregate shards of addresses,
+        # adding the stored fills first; only their partials come back
+        from_store = None
+        if settings.use_fill_cache:
+            from_store = [
+                address for address in trader_addresses
+                if fetch_from[address] > oldest_cutoff and address not in rolled_up
+            ]
+        partials = dict(accumulator.partials)
+        shards = iter_shards(
+            trader_addresses,
+            fetch_from,
+            cutoff_timestamps,
+            primary_window,
+            from_store=from_store,
+            partials=partials.values(),
+            workers=settings.aggregation_workers,
+            max_requests=settings.max_concurrent_requests,
+            batch_size=FILL_BATCH_SIZE,
+            priorities=priorities,
+            initializer=set_client,
+            initargs=(get_client(),)
+        )
+        completed = 0
+        for shard in shards:
+            completed += len(shard['addresses'])
+            reporter.progress(completed / len(trader_addresses))
+            if shard['addresses']:
+                reporter.detail(
+                    f"Fetched {shard['fetched']} fills for {len(shard['addresses'])} addresses",
+                    "Addresses fetched",
+                    len(shard['addresses']) - len(shard['failed'])
+                )
+            for address, message, shard_circuit_open in shard['failed']:
+                reporter.detail(f"Error fetching fills for {address}: {message}", "Fetch errors")
+                failed.append(address)
+                circuit_open = circuit_open or shard_circuit_open
+            fetched += shard['fetched']
+            stored += shard['stored']
+            newest += shard['newest']
+            for address, notional in shard['notional'].items():
+                volumes[address] = VOLUME_DECAY * volumes.get(address, 0.0) + notional
+            partials.update((partial.address, partial) for partial in shard['partials'])
+        accumulator = PartialAccumulator(cutoff_timestamps, primary_window, partials.values())
+        
+        # Stored fills are already added
+        rolled_up = set(trader_addresses)
+    else:
+        # Fetch fills for every address, several at a time
+        fetches = iter_fills_concurrently(
+            trader_addresses,
+            start_time=fetch_from,
+            max_workers=settings.max_concurrent_requests,
+            priorities=priorities
+        )
+        for completed, (address, fills, error) in enumerate(fetches, start=1):
+            reporter.progress(completed / len(trader_addresses))
+            if error is not None:
+                reporter.detail(f"Error fetching fills for {address}: {error}", "Fetch errors")
+                failed.append(address)
+                circuit_open = circuit_open or isinstance(error, CircuitOpenError)
+                continue
+            reporter.detail(f"Fetched {len(fills)} fills for {address}", "Addresses fetched")
             
-            # Time window data
-            '24h Volume': volume_usd['24h'],
-            '24h Pct Long': ls_ratios['24h']['long'],
-            '24h Pct Short': ls_ratios['24h']['short'],
-            '24h Traders': trader_counts['24h'],
-            
-            '12h Volume': volume_usd['12h'],
-            '12h Pct Long': ls_ratios['12h']['long'],
-            '12h Pct Short': ls_ratios['12h']['short'],
-            '12h Traders': trader_counts['12h'],
-            
-            '6h Volume': volume_usd['6h'],
-            '6h Pct Long': ls_ratios['6h']['long'],
-            '6h Pct Short': ls_ratios['6h']['short'],
-            '6h Traders': trader_counts['6h'],
-            
-            '3h Volume': volume_usd['3h'],
-            '3h Pct Long': ls_ratios['3h']['long'],
-            '3h Pct Short': ls_ratios['3h']['short'],
-            '3h Traders': trader_counts['3h'],
+            fetched += len(fills)
+            volumes[address] = VOLUME_DECAY * volumes.get(address, 0.0) + fills_notional(fills)
+            newest.append((address, fetch_from[address], int(fills['time'].max()) if len(fills) else None))
             
-            '1h Volume': volume_usd['1h'],
-            '1h Pct Long': ls_ratios['1h']['long'],
-            '1h Pct Short': ls_ratios['1h']['short'],
-            '1h Traders': trader_counts['1h'],
-        })
+            batch.append(fills)
+            if sum(len(records) for records in batch) >= FILL_BATCH_SIZE:
+                add_batch()
+        
+        add_batch()
     
-    # Create DataFrame
-    df = pd.DataFrame(summary_data)
+    # Reset progress bar
+    reporter.progress_done()
+    save_address_volumes(volumes)
+    
+    # Make failures visible instead of silently summarising fewer traders
+    if failed:
+        reporter.warning(
+            f"Could not fetch fills for {len(failed)} of {len(trader_addresses)} addresses; "
+            f"their recent activity may be missing from the summary: {', '.join(failed[:10])}"
+            + (" ..." if len(failed) > 10 else "")
+        )
+        if circuit_open:
+            reporter.error("The Hyperliquid API looks degraded; stopped sending requests for a short while")
+    
+    reporter.info(f"Fetched {fetched} new fills, stored {stored}")
+    
+    # Step 3: Add the stored fills from before each fetch, one partition at
+    # a time. Failed addresses fall back to everything stored for them.
+    # Addresses in a reused rollup already have their stored fills added.
+    if settings.use_fill_cache:
+        fill_cache.update(newest)
+        # The marks of the fills this run holds: as they were when it
+        # started, moved on by its own fetches only
+        run_marks = dict(marks)
+        for address, since, newest_time in newest:
+            run_marks[address] = advance_mark(marks[address], since, newest_time)
+        stored_until = {address: since for address, since, _ in newest}
+        from_store = failed + [address for address, since in stored_until.items() if since > oldest_cutoff]
+        from_store = [address for address in from_store if address not in rolled_up]
+        if from_store:
+            for frame in fill_store.iter_frames(oldest_cutoff, addresses=from_store):
+                until = frame['trader_address'].astype(str).map(stored_until).fillna(np.inf)
+                accumulator.add(frame[frame['time'].to_numpy() < until.to_numpy()])
+        
+        if engine == "rollup" and not failed:
+            # Keep the rollup for the next run, with the marks it matches.
+            # Failed addresses hold every stored fill, which no mark
+            # describes, so a run with failures keeps none.
+            accumulator.marks = run_marks
+            accumulator.save()
+        elif engine == "partials":
+            # Keep each address's partial for the next run, with the mark
+            # its fills match; failed addresses hold every stored fill,
+            # which no mark describes
+            partials = accumulator.address_partials([address for address in trader_addresses if address not in failed])
+            for partial in partials:
+                partial.mark = run_marks[partial.address]
+            get_partial_cache().put(partials)
+    
+    fill_store.apply_retention()
+    
+    reporter.info(f"Fills from last {primary_window}: {accumulator.fill_count}")
+    
+    # Steps 4 to 6: Calculate metrics for the summary table. Coins without a
+    # market price (e.g. spot pairs, which metaAndAssetCtxs does not list)
+    # are valued at their latest traded price.
+    df = accumulator.summary(current_prices, price_changes)
+    
+    missing_prices = [coin for coin in df.get('Asset', []) if coin not in current_prices]
+    if missing_prices:
+        reporter.warning(f"No market price for {', '.join(missing_prices)}; using their last traded prices")
     
     # Debug column names
-    st.write("Summary data columns:", df.columns.tolist())
+    reporter.detail(f"Summary data columns: {df.columns.tolist()}")
     
-    # Sort by 24h volume (descending)
-    if '24h Volume' in df.columns and not df.empty:
-        df = df.sort_values('24h Volume', ascending=False)
+    # Sort by primary window volume (descending)
+    if f'{primary_window} Volume' in df.columns and not df.empty:
+        df = df.sort_values(f'{primary_window} Volume', ascending=False)
     
     # Save the summary data to file
-    save_to_file(summary_data, "trading_summary")
+    save_summary(df)
     
     return df
 
@@ -552,7 +975,7 @@ def format_for_display(df):
     
     # Only attempt to format entry prices if the columns exist
     if all(col in df.columns for col in ['Open Total Avg Entry', 'Open Long Avg Entry', 'Open Short Avg Entry']):
-        st.write("Entry price columns found, formatting...")
+        logger.debug("Entry price columns found, formatting...")
         
         # Safe getter function to handle missing values
         def safe_get(row, key):
@@ -567,11 +990,15 @@ def format_for_display(df):
             axis=1
         )
     else:
-        st.write("Entry price columns not found, using placeholder")
+        logger.debug("Entry price columns not found, using placeholder")
         formatted_df['Open Trades Entry'] = "N/A"
     
-    # Format time windows
-    for window in ['24h', '12h', '6h', '3h', '1h']:
+    # Format time windows, in the order the summary has them
+    windows = [
+        column[:-len(' Pct Long')] for column in df.columns
+        if column.endswith(' Pct Long') and column != 'Open Pct Long'
+    ]
+    for window in windows:
         # Format L/S ratio
         formatted_df[f'{window} L/S'] = formatted_df.apply(
             lambda row: format_ls_ratio(row[f'{window} Pct Long'], row[f'{window} Pct Short']), 
@@ -588,15 +1015,10 @@ def format_for_display(df):
     formatted_df['Action'] = "LongShort"
     
     # Prepare column list
-    columns = [
-        'Asset', 'Current Price', 'Volume', 'Open Positions', 
-        '24h L/S', '24h Volume',
-        '12h L/S', '12h Volume',
-        '6h L/S', '6h Volume',
-        '3h L/S', '3h Volume',
-        '1h L/S', '1h Volume',
-        'Open Trades Entry', 'Action'
-    ]
+    columns = ['Asset', 'Current Price', 'Volume', 'Open Positions']
+    for window in windows:
+        columns += [f'{window} L/S', f'{window} Volume']
+    columns += ['Open Trades Entry', 'Action']
     
     # Return the formatted DataFrame
     return formatted_df[columns]
@@ -663,7 +1085,7 @@ def generate_styled_table(df):
 def save_formatted_table(df, filename="hyperliquid_analysis"):
     """Save the formatted table as HTML"""
     if df is None or df.empty:
-        st.warning("No data to save")
+        get_reporter().warning("No data to save")
         return None
     
     # Generate HTML table
@@ -692,21 +1114,21 @@ def save_formatted_table(df, filename="hyperliquid_analysis"):
     with open(html_filename, 'w', encoding='utf-8') as f:
         f.write(html_content)
     
-    st.write(f"HTML table saved to {html_filename}")
+    get_reporter().info(f"HTML table saved to {html_filename}")
     return html_filename
 
 def run_analysis():
     """Main function to run the analysis"""
-    st.write("Analyzing Hyperliquid trader activity...")
+    get_reporter().info("Analyzing Hyperliquid trader activity...")
     
     try:
         # Try to create data directory, but continue if it fails
         data_dir = "hyperliquid_data"
         os.makedirs(data_dir, exist_ok=True)
         os.chdir(data_dir)
-        st.write(f"Saving data to {os.path.abspath(data_dir)}")
+        get_reporter().info(f"Saving data to {os.path.abspath(data_dir)}")
     except:
-        st.write("Working in current directory")
+        get_reporter().info("Working in current directory")
     
     # Analyze trader activity
     result_df = analyze_trader_activity()
@@ -715,8 +1137,8 @@ def run_analysis():
         # Format for display
         display_df = format_for_display(result_df)
         
-        st.write("\nHyperliquid Top Traders Analysis")
-        st.write("===============================")
+        get_reporter().info("\nHyperliquid Top Traders Analysis")
+        get_reporter().info("===============================")
         
         # Generate and display styled table
         styled_table = generate_styled_table(display_df)
@@ -727,7 +1149,7 @@ def run_analysis():
         
         return display_df
     else:
-        st.warning("No data available to display")
+        get_reporter().warning("No data available to display")
         return None
 
 # Execute the analysis
@@ -0,0 +1,289 @@
+import json
+import os
+import random
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from rate_limiter import get_rate_limiter, request_weight, response_weight
+
+try:
+    # Several times faster than the json module on large fill payloads
+    import orjson
+except ImportError:
+    orjson = None
+
+# Hyperliquid public info endpoint; point HYPERLIQUID_INFO_URL at a
+# stand-in (see standin_server.py) for offline runs and load tests
+INFO_URL = os.environ.get("HYPERLIQUID_INFO_URL", "https://api.hyperliquid.xyz/info")
+
+# Status codes worth retrying: rate limiting and server-side failures
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+# Maximum number of fills returned by a single userFillsByTime response
+FILLS_PAGE_LIMIT = 2000
+
+
+def decode_json(content):
+    """Decode a JSON response body (bytes), with orjson when it is installed"""
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
+
+
+def fill_key(fill):
+    """Identity of a fill, used to drop duplicates between pages and runs"""
+    return (fill.get('hash'), fill.get('tid'), fill.get('time'))
+
+
+class HyperliquidAPIError(Exception):
+    """Raised when a request to the /info endpoint fails"""
+
+    def __init__(self, message, status_code=None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class CircuitOpenError(HyperliquidAPIError):
+    """Raised without contacting the API while the circuit breaker is open"""
+
+
+class CircuitBreaker:
+    """Stop calling the API after repeated failures
+
+    After `failure_threshold` consecutive failed requests the breaker opens
+    and every request fails immediately for `reset_timeout` seconds. After
+    that a single trial request is let through: success closes the breaker
+    again, failure re-opens it for another `reset_timeout`.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow_request(self):
+        """Return True if a request may be sent now"""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+
+            if self.state == self.OPEN:
+                if time.monotonic() - self.opened_at < self.reset_timeout:
+                    return False
+                self.state = self.HALF_OPEN
+                self._trial_in_flight = False
+
+            # Half-open: only one trial request at a time
+            if self._trial_in_flight:
+                return False
+            self._trial_in_flight = True
+            return True
+
+    def release_trial(self):
+        """Give up the half-open trial without an outcome, letting another request try"""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._trial_in_flight = False
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+    @property
+    def is_open(self):
+        with self._lock:
+            return self.state != self.CLOSED
+
+
+class HyperliquidInfoClient:
+    """Pooled, retrying client for the Hyperliquid /info endpoint
+
+    A single `requests.Session` keeps connections alive across requests, so
+    fetching many addresses pays for one TCP+TLS handshake per pooled
+    connection instead of one per address. Requests wait for their weight
+    in the rate limiter (by default the process-wide one, see
+    `rate_limiter.RateLimiter`), higher `priority` first. Rate-limited
+    (429) and 5xx responses, timeouts and other request errors are
+    retried with jittered exponential backoff; a 429 also slows the
+    limiter down, and repeated failures open the circuit breaker.
+
+    Pickling a client (e.g. to hand it to worker processes) keeps its
+    settings; the copy gets its own connections and circuit breaker and
+    the receiving process's rate limiter.
+    """
+
+    def __init__(self, url=INFO_URL, timeout=10.0, max_retries=3,
+                 backoff_base=0.5, backoff_max=8.0, pool_size=32, breaker=None, rate_limiter=None):
+        self.url = url
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.pool_size = pool_size
+        self.breaker = breaker or CircuitBreaker()
+        self.rate_limiter = rate_limiter or get_rate_limiter()
+
+        self.session = requests.Session()
+        self.session.headers.update({
+            "Content-Type": "application/json",
+            "Accept-Encoding": "gzip, deflate",
+        })
+        # Retries are handled here so the circuit breaker sees every failure
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def __reduce__(self):
+        return (type(self), (
+            self.url, self.timeout, self.max_retries, self.backoff_base, self.backoff_max, self.pool_size
+        ))
+
+    def _backoff(self, attempt, retry_after=None):
+        """Seconds to wait before retry number `attempt` (full jitter)"""
+        if retry_after is not None:
+            return min(retry_after, self.backoff_max)
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def post(self, payload, priority=0):
+        """POST a payload to /info and return the decoded JSON response"""
+        last_error = None
+        weight = request_weight(payload)
+
+        for attempt in range(self.max_retries + 1):
+            if not self.breaker.allow_request():
+                raise CircuitOpenError("Hyperliquid API circuit breaker is open")
+
+            retry_after = None
+            recorded = False
+            try:
+                self.rate_limiter.acquire(weight, priority)
+                try:
+                    response = self.session.post(self.url, json=payload, timeout=self.timeout)
+                except requests.RequestException as e:
+                    # Connection errors, timeouts, connections dropped mid-body...
+                    last_error = HyperliquidAPIError(f"Request failed: {e}")
+                else:
+                    if response.status_code == 200:
+                        self.breaker.record_success()
+                        recorded = True
+                        self.rate_limiter.succeeded()
+                        data = decode_json(response.content)
+                        self.rate_limiter.charge(response_weight(payload, data))
+                        return data
+
+                    last_error = HyperliquidAPIError(
+                        f"Status code {response.status_code}",
+                        status_code=response.status_code
+                    )
+                    if response.status_code not in RETRYABLE_STATUS_CODES:
+                        # The API answered, so it is not degraded: don't trip the breaker
+                        self.breaker.record_success()
+                        recorded = True
+                        raise last_error
+                    try:
+                        retry_after = float(response.headers.get("Retry-After"))
+                    except (TypeError, ValueError):
+                        retry_after = None
+                    if response.status_code == 429:
+                        self.rate_limiter.throttled(retry_after)
+
+                self.breaker.record_failure()
+                recorded = True
+            finally:
+                if not recorded:
+                    # Stopped by something else before an outcome was recorded:
+                    # a half-open breaker would otherwise wait for this trial forever
+                    self.breaker.release_trial()
+
+            if attempt < self.max_retries:
+                time.sleep(self._backoff(attempt, retry_after))
+
+        raise last_error
+
+    def meta_and_asset_ctxs(self):
+        """Fetch perpetuals metadata and asset contexts (prices)"""
+        return self.post({"type": "metaAndAssetCtxs"})
+
+    def user_fills(self, address, aggregate_by_time=True, priority=0):
+        """Fetch the most recent fills for an address"""
+        return self.post({
+            "type": "userFills",
+            "user": address,
+            "aggregateByTime": aggregate_by_time
+        }, priority)
+
+    def user_fills_by_time(self, address, start_time, end_time=None, aggregate_by_time=True, priority=0):
+        """Fetch all fills for an address between two millisecond timestamps
+
+        The API returns at most FILLS_PAGE_LIMIT fills per response, oldest
+        first, so full pages are followed by another request starting at the
+        newest fill received. Fills repeated across page boundaries (same
+        millisecond) are dropped.
+        """
+        fills = []
+        seen = set()
+
+        while True:
+            payload = {
+                "type": "userFillsByTime",
+                "user": address,
+                "startTime": int(start_time),
+                "aggregateByTime": aggregate_by_time
+            }
+            if end_time is not None:
+                payload["endTime"] = int(end_time)
+
+            page = self.post(payload, priority)
+            new_fills = [fill for fill in page if fill_key(fill) not in seen]
+            for fill in new_fills:
+                seen.add(fill_key(fill))
+            fills.extend(new_fills)
+
+            # A short page is the last one; a page with nothing new means the
+            # remaining fills all share one timestamp and we cannot advance
+            if len(page) < FILLS_PAGE_LIMIT or not new_fills:
+                break
+            start_time = max(int(fill['time']) for fill in page)
+
+        return fills
+
+
+# Shared client, created on first use
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """Return the process-wide HyperliquidInfoClient"""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = HyperliquidInfoClient()
+        return _client
+
+
+def set_client(client):
+    """Replace the process-wide client, e.g. with a stand-in for benchmarks"""
+    global _client
+    with _client_lock:
+        _client = client
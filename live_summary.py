@@ -0,0 +1,163 @@
+import random
+import threading
+import time
+
+import numpy as np
+
+from fill_stream import MAX_USERS, PollingFillStream, ReplayFillStream, WebsocketFillStream
+from hyperliquid_analysis import (
+    MAX_CONCURRENT_REQUESTS,
+    calculate_price_change,
+    iter_fills_concurrently,
+    load_address_volumes,
+    parse_window,
+)
+from price_cache import get_price_cache
+from sliding_windows import SlidingWindows
+from synthetic_fills import generate_fills
+
+# Live summaries nobody read for this many seconds are stopped
+IDLE_TIMEOUT = 600
+
+
+def synthetic_stream(addresses, history_ms, ahead_ms=3600 * 1000, fills_per_trader=50, speed=1.0, seed=0):
+    """A ReplayFillStream of synthetic fills for `addresses`: `history_ms`
+    of them up to now, sent at once, then `ahead_ms` more as they happen"""
+    rng = random.Random(seed)
+    now_ms = int(time.time() * 1000)
+    fills_by_address = {}
+    for address in addresses:
+        count = int(rng.expovariate(1.0 / fills_per_trader)) if fills_per_trader else 0
+        fills_by_address[address] = generate_fills(address, count, now_ms + ahead_ms, rng, span_ms=history_ms + ahead_ms)
+    return ReplayFillStream(fills_by_address, speed)
+
+
+class LiveSummary:
+    """A watchlist's summary for windows ending now, kept current from a fill stream
+
+    `start()` loads the fills of the longest window from the API, unless
+    `backfill` is False (e.g. for a replay that sends its own history),
+    and then adds every fill `stream` yields (see `fill_stream`) on a
+    background thread. Fills go into `sliding_windows.SlidingWindows`, so
+    `summary()` only evicts what aged out and builds the table from the
+    per-coin totals: its cost grows with the number of coins, not fills.
+    """
+
+    def __init__(self, addresses, windows, stream, backfill=True, max_requests=MAX_CONCURRENT_REQUESTS):
+        lengths = {window: int(parse_window(window).total_seconds() * 1000) for window in windows}
+        self.primary_window = max(lengths, key=lengths.get)
+        self.addresses = list(addresses)
+        self.stream = stream
+        self.backfill = backfill
+        self.max_requests = max_requests
+        self.ready = False     # Backfill done; the summary covers every window
+        self.backfilled = 0    # Fills loaded from the API
+        self.received = 0      # Fills received from the stream
+        self.failed = []       # Addresses whose backfill failed
+        self.error = None      # Why the stream stopped, if it failed
+        self.read_at = time.monotonic()
+        self._windows = SlidingWindows(lengths, self.primary_window)
+        self._lock = threading.Lock()
+        self._thread = None
+
+    @staticmethod
+    def _now():
+        return int(time.time() * 1000)
+
+    def start(self):
+        """Start backfilling and streaming on a background thread"""
+        self._thread = threading.Thread(target=self._run, name="live-summary", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop the stream; the summary stays readable"""
+        self.stream.close()
+
+    def _load_history(self):
+        """Add the fills of the longest window, oldest first, so they age out in order"""
+        since = self._now() - max(self._windows.lengths)
+        batches = []
+        fetches = iter_fills_concurrently(self.addresses, since, self.max_requests, load_address_volumes())
+        for address, fills, error in fetches:
+            if error is not None:
+                self.failed.append(address)
+                continue
+            batches.append(fills)
+        if batches:
+            records = np.concatenate(batches)
+            records = records[np.argsort(records['time'], kind='stable')]
+            with self._lock:
+                self._windows.advance(self._now())
+                self._windows.add(records)
+            self.backfilled = len(records)
+
+    def _run(self):
+        try:
+            if self.backfill:
+                self._load_history()
+            self.ready = True
+            for fills in self.stream:
+                with self._lock:
+                    self._windows.advance(self._now())
+                    self._windows.add(fills)
+                    self.received += len(fills)
+        except Exception as e:
+            self.error = e
+
+    def summary(self):
+        """The summary table as of now, sorted by primary window volume"""
+        self.read_at = time.monotonic()
+        snapshot = get_price_cache().get()
+        price_changes = {}
+        for coin, price in snapshot.current_prices.items():
+            change = calculate_price_change(price, snapshot.prev_day_prices.get(coin))
+            if change is not None:
+                price_changes[coin] = change
+
+        with self._lock:
+            self._windows.advance(self._now())
+            df = self._windows.summary(snapshot.current_prices, price_changes)
+        return df.sort_values(f'{self.primary_window} Volume', ascending=False).reset_index(drop=True)
+
+
+# Live summaries by name, shared by every session watching the same stream
+_live = {}
+_live_lock = threading.Lock()
+
+
+def get_live_summary(name, addresses, windows, source="websocket"):
+    """Return the running LiveSummary called `name`, starting it if needed
+
+    `source` is "websocket" (Hyperliquid's feed, after a backfill from the
+    API) or "synthetic" (a local replay of synthetic fills). Hyperliquid
+    streams at most MAX_USERS distinct addresses per IP, counting every
+    running websocket stream: beyond that the new fills are polled from
+    the API instead (see `fill_stream.PollingFillStream`). Live summaries
+    nobody read for IDLE_TIMEOUT seconds are stopped.
+    """
+    with _live_lock:
+        now = time.monotonic()
+        for other, live in list(_live.items()):
+            if now - live.read_at >= IDLE_TIMEOUT:
+                live.stop()
+                del _live[other]
+
+        live = _live.get(name)
+        if live is None:
+            if source == "synthetic":
+                lengths = [parse_window(window).total_seconds() * 1000 for window in windows]
+                stream, backfill = synthetic_stream(addresses, int(max(lengths))), False
+            else:
+                streamed = {
+                    address.lower() for other in _live.values()
+                    if isinstance(other.stream, WebsocketFillStream)
+                    for address in other.addresses
+                }
+                if len(streamed | {address.lower() for address in addresses}) <= MAX_USERS:
+                    stream = WebsocketFillStream(addresses)
+                else:
+                    stream = PollingFillStream(addresses)
+                backfill = True
+            live = _live[name] = LiveSummary(addresses, windows, stream, backfill).start()
+        return live
@@ -0,0 +1,272 @@
+import json
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from fill_store import DATA_DIR
+from vectorized_aggregation import fill_columns, latest_per_trader, summary_frame, update_last_trades
+
+MS_PER_MINUTE = 60 * 1000
+
+# Quantities summed per coin and minute. `traders` counts the traders whose
+# latest fill in the coin falls in the minute.
+BUCKET_SUMS = ('fills', 'volume', 'long_size', 'short_size', 'long_value', 'short_value', 'traders')
+
+# Saved rollup, replaced after every run
+DEFAULT_ROLLUP_PATH = os.path.join(DATA_DIR, "minute_rollup.parquet")
+
+# Schema metadata key holding everything that is not a bucket
+METADATA_KEY = b"minute_rollup"
+
+
+def minute_ceil(timestamp):
+    """First whole minute starting at or after `timestamp` (milliseconds)"""
+    return -(-int(timestamp) // MS_PER_MINUTE)
+
+
+def mark_covers(mark, oldest_cutoff):
+    """Whether an address with fill cache `mark` has its stored fills from
+    `oldest_cutoff` on (or none stored), so its next fetch is incremental"""
+    return mark is None or mark.get("covered_from", float("inf")) <= oldest_cutoff
+
+
+def skip_included(fills, edges):
+    """Drop fills already included, going by `edges`
+
+    `edges` maps each trader to (time of their newest included fill, tids
+    included at that time). A refresh fetches an address again from that
+    millisecond, so its fills there may already be included.
+    """
+    if not edges or fills.empty:
+        return fills
+    traders = fills['trader_address'].astype(object)
+    edge_times = traders.map({trader: edge[0] for trader, edge in edges.items()})
+    edge_times = edge_times.fillna(-1).to_numpy(dtype=np.int64)
+    times = fills['time'].to_numpy(dtype=np.int64)
+    keep = times != edge_times
+    tids = fills['tid'].to_numpy()
+    for row in np.flatnonzero(times == edge_times):
+        keep[row] = int(tids[row]) not in edges[traders.iat[row]][1]
+    return fills if keep.all() else fills[keep]
+
+
+def update_edges(edges, fills):
+    """Move `edges` (see `skip_included`) forward to the newest of `fills`"""
+    codes, traders = pd.factorize(fills['trader_address'])
+    times = fills['time'].to_numpy(dtype=np.int64)
+    has_trader = codes >= 0
+    newest = np.full(len(traders), -1, dtype=np.int64)
+    np.maximum.at(newest, codes[has_trader], times[has_trader])
+    traders = list(traders)
+    tids = fills['tid'].to_numpy()
+    for row in np.flatnonzero(has_trader & (times == newest[codes])):
+        trader = traders[codes[row]]
+        edge_time, included = edges.get(trader, (-1, set()))
+        if times[row] > edge_time:
+            edge_time, included = int(times[row]), set()
+            edges[trader] = (edge_time, included)
+        if times[row] == edge_time:
+            included.add(int(tids[row]))
+
+
+class MinuteRollup:
+    """Per-coin, per-minute totals that are kept and updated between runs
+
+    Fills are reduced to one bucket per coin and minute, and each window
+    is the sum of the buckets it covers, so windows start on a whole
+    minute (at most a minute later than their exact cutoff). New fills only
+    touch the newest buckets and buckets older than the longest window are
+    dropped, so refreshing costs time in proportion to the new fills, not
+    the window. Each trader is counted in the bucket of their latest fill
+    in a coin, so distinct traders add up like the other totals.
+
+    `marks` holds the fill cache marks of every address included (see
+    `fill_cache.FillCache.mark`); `reusable` tells whether a saved rollup
+    still matches them. Fills fetched again from the millisecond of an
+    address's newest stored fill are skipped (see `skip_included`).
+    """
+
+    def __init__(self, cutoff_timestamps, primary_window='24h'):
+        self.cutoff_timestamps = cutoff_timestamps
+        self.primary_window = primary_window
+        self.start_minute = minute_ceil(min(cutoff_timestamps.values()))
+        self.marks = {}
+        self._buckets = pd.DataFrame(
+            {name: np.zeros(0) for name in BUCKET_SUMS},
+            index=pd.MultiIndex.from_arrays([[], np.zeros(0, dtype=np.int64)], names=['coin', 'minute'])
+        )
+        self._pending = []      # Bucket frames added since the last compaction
+        self._latest = {}       # (coin, trader) -> minute of their latest fill
+        self._edges = {}        # Trader -> (time of their newest fill, tids at that time)
+        self._last_trades = {}  # Coin -> (time, price)
+
+    def reusable(self, addresses, marks, oldest_cutoff):
+        """Whether this rollup can be carried forward for a watchlist
+
+        Every address it includes must still be watched and have the same
+        fill cache marks, with stored fills covering `oldest_cutoff`, so
+        that the fetches of this run start where the rollup stops.
+        """
+        addresses = set(addresses)
+        for address, mark in self.marks.items():
+            if address not in addresses or marks.get(address) != mark or not mark_covers(mark, oldest_cutoff):
+                return False
+        return minute_ceil(oldest_cutoff) >= self.start_minute
+
+    def add(self, fills):
+        """Add a fills DataFrame (see `vectorized_aggregation.WindowAccumulator.add`)"""
+        fills = skip_included(fills[fills['coin'].notna()], self._edges)
+        if fills.empty:
+            return
+        update_edges(self._edges, fills)
+        update_last_trades(self._last_trades, fills)
+
+        fills = fills[fills['time'].to_numpy(dtype=np.int64) // MS_PER_MINUTE >= self.start_minute]
+        if fills.empty:
+            return
+
+        coin_codes, coins, times, size, value, is_long, is_short = fill_columns(fills)
+        minutes = times // MS_PER_MINUTE
+
+        # A trader whose latest fill moves to a newer minute leaves the
+        # bucket they were counted in
+        moves = []
+        for (coin_code, trader), minute in latest_per_trader(coin_codes, fills['trader_address'], minutes).items():
+            key = (coins[coin_code], trader)
+            previous = self._latest.get(key)
+            if previous is None or minute > previous:
+                self._latest[key] = int(minute)
+                moves.append((coin_code, minute, 1))
+                if previous is not None:
+                    moves.append((coin_code, previous, -1))
+        moves = pd.DataFrame(np.array(moves, dtype=np.int64).reshape(-1, 3), columns=['coin', 'minute', 'traders'])
+
+        buckets = pd.concat([
+            pd.DataFrame({
+                'coin': coin_codes,
+                'minute': minutes,
+                'fills': np.ones(len(fills)),
+                'volume': size,
+                'long_size': size * is_long,
+                'short_size': size * is_short,
+                'long_value': value * is_long,
+                'short_value': value * is_short,
+            }),
+            moves,
+        ]).groupby(['coin', 'minute'], sort=False).sum()
+        buckets.index = buckets.index.set_levels(np.asarray(coins, dtype=object), level=0)
+        self._pending.append(buckets[list(BUCKET_SUMS)])
+
+    def _compact(self):
+        """Merge pending buckets into the totals and drop expired ones"""
+        buckets = self._buckets
+        if self._pending:
+            buckets = pd.concat([buckets] + self._pending).groupby(level=['coin', 'minute']).sum()
+            self._pending = []
+        self._buckets = buckets[buckets.index.get_level_values('minute') >= self.start_minute]
+
+    @property
+    def fill_count(self):
+        """Fills in the buckets of the longest window"""
+        self._compact()
+        return int(self._buckets['fills'].sum())
+
+    def last_trade_prices(self):
+        """Latest traded price per coin across everything added"""
+        return {coin: px for coin, (timestamp, px) in self._last_trades.items()}
+
+    def summary(self, current_prices, price_changes, fallback_prices=None):
+        """Build the summary table (see `vectorized_aggregation.summary_frame`)
+        by summing the buckets of each window"""
+        if fallback_prices is None:
+            fallback_prices = self.last_trade_prices()
+        self._compact()
+        windows = list(self.cutoff_timestamps)
+        window_minutes = [minute_ceil(self.cutoff_timestamps[window]) for window in windows]
+
+        coin_codes, coins = pd.factorize(self._buckets.index.get_level_values('coin'))
+        minutes = self._buckets.index.get_level_values('minute').to_numpy()
+        totals = {
+            name: np.column_stack([
+                np.bincount(coin_codes, weights=self._buckets[name].to_numpy() * (minutes >= start), minlength=len(coins))
+                for start in window_minutes
+            ]).reshape(len(coins), len(windows))
+            for name in BUCKET_SUMS
+        }
+        trader_counts = np.rint(totals.pop('traders')).astype(int)
+
+        return summary_frame(
+            list(coins),
+            windows,
+            self.primary_window,
+            totals,
+            trader_counts,
+            current_prices,
+            price_changes,
+            fallback_prices
+        )
+
+    def save(self, path=DEFAULT_ROLLUP_PATH):
+        """Write the rollup to one Parquet file, replacing the previous one
+
+        Bucket rows have no trader; each (coin, trader) latest minute is a
+        row with a trader and zero sums. Everything else is kept as JSON in
+        the schema metadata.
+        """
+        self._compact()
+        self._latest = {key: minute for key, minute in self._latest.items() if minute >= self.start_minute}
+        buckets = self._buckets.reset_index()
+        buckets['trader'] = None
+        traders = pd.DataFrame(
+            [(coin, minute, trader) for (coin, trader), minute in self._latest.items()],
+            columns=['coin', 'minute', 'trader']
+        )
+        for name in BUCKET_SUMS:
+            traders[name] = 0.0
+        frame = pd.concat([buckets, traders[buckets.columns]], ignore_index=True)
+
+        table = pa.Table.from_pandas(frame.astype({'coin': str, 'minute': np.int64}), preserve_index=False)
+        state = {
+            "start_minute": self.start_minute,
+            "marks": self.marks,
+            "edges": {trader: [edge_time, sorted(tids)] for trader, (edge_time, tids) in self._edges.items()},
+            "last_trades": self._last_trades,
+        }
+        table = table.replace_schema_metadata({METADATA_KEY: json.dumps(state).encode()})
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        pq.write_table(table, tmp_path)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, cutoff_timestamps, primary_window='24h', path=DEFAULT_ROLLUP_PATH):
+        """Load a saved rollup for new windows, or None when there is none
+        usable (missing, unreadable, or starting after the new windows)"""
+        try:
+            table = pq.read_table(path)
+            state = json.loads(table.schema.metadata[METADATA_KEY])
+        except (OSError, KeyError, TypeError, ValueError):
+            return None
+
+        rollup = cls(cutoff_timestamps, primary_window)
+        if rollup.start_minute < state["start_minute"]:
+            return None
+
+        frame = table.to_pandas()
+        is_bucket = frame['trader'].isna().to_numpy()
+        rollup._buckets = frame[is_bucket].set_index(['coin', 'minute'])[list(BUCKET_SUMS)]
+        traders = frame[~is_bucket]
+        rollup._latest = {
+            (coin, trader): int(minute)
+            for coin, trader, minute in zip(traders['coin'], traders['trader'], traders['minute'])
+        }
+        rollup.marks = state["marks"]
+        rollup._edges = {trader: (edge_time, set(tids)) for trader, (edge_time, tids) in state["edges"].items()}
+        rollup._last_trades = {coin: tuple(trade) for coin, trade in state["last_trades"].items()}
+        rollup._compact()
+        return rollup
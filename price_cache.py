@@ -0,0 +1,154 @@
+import json
+import os
+import threading
+import time
+
+import pandas as pd
+
+from fill_store import DATA_DIR
+from hyperliquid_client import get_client
+from single_flight import SingleFlight
+
+# Seconds a price snapshot is served before a refresh is started
+PRICE_TTL_SECONDS = 15
+
+# Last known good snapshot, so restarts don't start without prices
+DEFAULT_SNAPSHOT_PATH = os.path.join(DATA_DIR, "price_snapshot.json")
+
+
+# Asset context fields holding the current price, in priority order
+CURRENT_PRICE_KEYS = ['midPx', 'markPx', 'oraclePx']
+
+
+def parse_asset_ctxs(data):
+    """Extract (current_prices, prev_day_prices) from a metaAndAssetCtxs response"""
+    # Check if the response has the expected structure
+    if not isinstance(data, list) or len(data) < 2:
+        raise ValueError("Unexpected response structure from metaAndAssetCtxs")
+
+    # Universe (metadata) and asset contexts (prices) line up by index
+    coin_names = [coin['name'] for coin in data[0]['universe']]
+    count = min(len(coin_names), len(data[1]))
+
+    # Parse every price field as one numeric column; missing or unparseable
+    # values become NaN
+    ctxs = pd.DataFrame(data[1][:count], columns=CURRENT_PRICE_KEYS + ['prevDayPx'], index=coin_names[:count])
+    prices = ctxs.apply(pd.to_numeric, errors='coerce')
+
+    # Current price: the first of midPx, markPx, oraclePx that parsed
+    current = prices[CURRENT_PRICE_KEYS].bfill(axis=1).iloc[:, 0].dropna()
+    prev_day = prices['prevDayPx'].dropna()
+
+    return current.astype(float).to_dict(), prev_day.astype(float).to_dict()
+
+
+def fetch_prices():
+    """Fetch current and previous-day prices from the API"""
+    return parse_asset_ctxs(get_client().meta_and_asset_ctxs())
+
+
+class PriceSnapshot:
+    """Prices fetched together at one point in time"""
+
+    def __init__(self, current_prices, prev_day_prices, fetched_at):
+        self.current_prices = current_prices
+        self.prev_day_prices = prev_day_prices
+        self.fetched_at = fetched_at
+
+    @property
+    def age(self):
+        """Seconds since the snapshot was fetched"""
+        return time.time() - self.fetched_at
+
+
+class PriceCache:
+    """Process-wide price snapshot with stale-while-revalidate
+
+    A snapshot younger than `ttl` seconds is served as is. An older one is
+    still served immediately while a single background thread fetches a
+    new one, so callers only wait on the API when there is no snapshot at
+    all, and then share one fetch. Every successful fetch is written to
+    disk and loaded again on restart; a failed fetch keeps the last good
+    snapshot.
+    """
+
+    def __init__(self, fetch=fetch_prices, ttl=PRICE_TTL_SECONDS, path=DEFAULT_SNAPSHOT_PATH):
+        self.fetch = fetch
+        self.ttl = ttl
+        self.path = path
+        self.last_error = None
+        self._snapshot = self._load()
+        self._refreshing = False
+        self._first_fetch = SingleFlight()
+        self._lock = threading.Lock()
+
+    def _load(self):
+        try:
+            with open(self.path, "r") as f:
+                data = json.load(f)
+            return PriceSnapshot(data["current_prices"], data["prev_day_prices"], data["fetched_at"])
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def _save(self, snapshot):
+        """Write the snapshot atomically so readers never see a partial file"""
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = f"{self.path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({
+                "current_prices": snapshot.current_prices,
+                "prev_day_prices": snapshot.prev_day_prices,
+                "fetched_at": snapshot.fetched_at,
+            }, f)
+        os.replace(tmp_path, self.path)
+
+    def refresh(self):
+        """Fetch a new snapshot now; on failure keep the current one and re-raise"""
+        try:
+            current_prices, prev_day_prices = self.fetch()
+            snapshot = PriceSnapshot(current_prices, prev_day_prices, time.time())
+            with self._lock:
+                self._snapshot = snapshot
+                self.last_error = None
+            self._save(snapshot)
+            return snapshot
+        except Exception as e:
+            with self._lock:
+                self.last_error = e
+            raise
+
+    def _refresh_in_background(self):
+        try:
+            self.refresh()
+        except Exception:
+            pass
+        finally:
+            with self._lock:
+                self._refreshing = False
+
+    def get(self):
+        """Return the current snapshot, refreshing it as needed"""
+        with self._lock:
+            snapshot = self._snapshot
+            if snapshot is not None:
+                if snapshot.age >= self.ttl and not self._refreshing:
+                    self._refreshing = True
+                    threading.Thread(target=self._refresh_in_background, daemon=True).start()
+                return snapshot
+
+        # No snapshot yet: callers wait for the first one, fetched once
+        return self._first_fetch.do("refresh", self.refresh)
+
+
+# Shared cache, created on first use
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_price_cache():
+    """Return the process-wide PriceCache"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = PriceCache()
+        return _cache
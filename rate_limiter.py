@@ -0,0 +1,175 @@
+import heapq
+import itertools
+import os
+import threading
+import time
+
+# Hyperliquid's /info budget: request weight per minute per IP
+WEIGHT_PER_MINUTE = 1200
+
+
+def weight_per_minute_from_env(default=WEIGHT_PER_MINUTE):
+    """Budget from HYPERLIQUID_WEIGHT_PER_MINUTE, e.g. for a stand-in server
+
+    "off" (or 0) never limits; unset uses `default`.
+    """
+    value = os.environ.get("HYPERLIQUID_WEIGHT_PER_MINUTE", "").strip().lower()
+    if not value:
+        return default
+    if value in ("off", "none", "0"):
+        return None
+    try:
+        weight = float(value)
+    except ValueError:
+        raise ValueError(f"HYPERLIQUID_WEIGHT_PER_MINUTE must be a number or 'off', not {value!r}") from None
+    if weight < 0:
+        raise ValueError("HYPERLIQUID_WEIGHT_PER_MINUTE must not be negative")
+    return weight or None
+
+# 429s within this many seconds of the last slowdown are answers to requests
+# sent before it and don't slow down again
+THROTTLE_COOLDOWN = 1.0
+
+# Weight of an info request, by type; types not listed weigh DEFAULT_WEIGHT
+DEFAULT_WEIGHT = 20
+REQUEST_WEIGHTS = {
+    "l2Book": 2,
+    "allMids": 2,
+    "clearinghouseState": 2,
+    "orderStatus": 2,
+    "spotClearinghouseState": 2,
+    "exchangeStatus": 2,
+    "userRole": 60,
+}
+
+# Responses of these types weigh one more per this many items returned
+ITEMS_PER_EXTRA_WEIGHT = {
+    "userFills": 20,
+    "userFillsByTime": 20,
+    "historicalOrders": 20,
+    "recentTrades": 20,
+    "userFunding": 20,
+    "fundingHistory": 20,
+    "candleSnapshot": 60,
+}
+
+
+def request_weight(payload):
+    """Weight charged for sending a request"""
+    return REQUEST_WEIGHTS.get(payload.get("type"), DEFAULT_WEIGHT)
+
+
+def response_weight(payload, response):
+    """Extra weight charged for the items a response returned"""
+    items = ITEMS_PER_EXTRA_WEIGHT.get(payload.get("type"))
+    if items is None or not isinstance(response, list):
+        return 0
+    return len(response) // items
+
+
+class RateLimiter:
+    """Token bucket for request weight, handing out tokens in priority order
+
+    Tokens refill at `weight_per_minute` and the bucket holds `burst` of
+    them, so requests are paced to the budget instead of being sent until
+    the API answers 429. Waiting requests are served highest `priority`
+    first (first come, first served among equals).
+
+    The rate adapts: a 429 (`throttled`) halves it, down to
+    `min_fraction` of the budget, and drains the bucket; every success
+    (`succeeded`) gives back `recovery` of the budget. `share` scales the
+    whole budget, for processes that split one IP's budget between them.
+    `weight_per_minute=None` never limits (for stand-in servers).
+    """
+
+    def __init__(self, weight_per_minute=WEIGHT_PER_MINUTE, burst=None, min_fraction=0.1, recovery=0.02):
+        self.weight_per_minute = weight_per_minute
+        self.burst = burst if burst is not None else (weight_per_minute or 0) / 10
+        self.min_fraction = min_fraction
+        self.recovery = recovery
+        self.share = 1.0
+        self.throttle_count = 0
+        self._fraction = 1.0
+        self._throttled_at = None
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._waiting = []  # Heap of (-priority, arrival) of waiting requests
+        self._arrivals = itertools.count()
+        self._condition = threading.Condition()
+
+    @property
+    def rate(self):
+        """Current refill rate in weight per second"""
+        return self.weight_per_minute * self.share * self._fraction / 60
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.burst * self.share, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, weight, priority=0):
+        """Block until `weight` tokens are available to this request, then take them"""
+        if self.weight_per_minute is None:
+            return
+        with self._condition:
+            entry = (-priority, next(self._arrivals))
+            heapq.heappush(self._waiting, entry)
+            try:
+                while True:
+                    self._refill()
+                    # A request heavier than the bucket goes once it is full
+                    needed = min(weight, self.burst * self.share)
+                    if self._waiting[0] == entry and self._tokens >= needed:
+                        self._tokens -= weight
+                        return
+                    timeout = (needed - self._tokens) / self.rate if self._waiting[0] == entry else None
+                    self._condition.wait(timeout)
+            finally:
+                self._waiting.remove(entry)
+                heapq.heapify(self._waiting)
+                self._condition.notify_all()
+
+    def charge(self, weight):
+        """Take `weight` more tokens, e.g. for a large response; may go into debt"""
+        if self.weight_per_minute is None:
+            return
+        with self._condition:
+            self._refill()
+            self._tokens -= weight
+
+    def throttled(self, retry_after=None):
+        """Slow down after a 429, pausing for `retry_after` seconds if given"""
+        with self._condition:
+            self.throttle_count += 1
+            if self.weight_per_minute is None:
+                return
+            self._refill()
+            if self._throttled_at is None or self._updated - self._throttled_at >= THROTTLE_COOLDOWN:
+                self._throttled_at = self._updated
+                self._fraction = max(self.min_fraction, self._fraction / 2)
+            self._tokens = min(self._tokens, 0.0)
+            if retry_after:
+                self._tokens = min(self._tokens, -retry_after * self.rate)
+
+    def succeeded(self):
+        """Speed back up towards the full budget after a successful request"""
+        with self._condition:
+            if self.weight_per_minute is not None and self._fraction < 1.0:
+                self._refill()
+                self._fraction = min(1.0, self._fraction + self.recovery)
+
+
+# Shared limiter, created on first use: the budget is per IP, so every
+# client in the process draws from it. Its budget comes from
+# HYPERLIQUID_WEIGHT_PER_MINUTE when set, which spawned workers inherit
+_limiter = None
+_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter():
+    """Return the process-wide RateLimiter"""
+    global _limiter
+    with _limiter_lock:
+        if _limiter is None:
+            _limiter = RateLimiter(weight_per_minute_from_env())
+        return _limiter
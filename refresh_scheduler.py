@@ -0,0 +1,190 @@
+import threading
+import time
+
+from hyperliquid_analysis import analyze_watchlist
+from reporting import LogReporter
+
+# Seconds between refreshes of a watchlist, unless registered with its own
+REFRESH_INTERVAL = 60
+
+# Watchlists whose snapshot nobody read for this many seconds stop being refreshed
+IDLE_TIMEOUT = 3600
+
+
+def analyze_in_background(addresses, settings):
+    """Compute a new summary of `addresses`, logging its progress"""
+    summary, computed_at, reused = analyze_watchlist(addresses, settings, force_refresh=True, reporter=LogReporter())
+    return summary
+
+
+class SummarySnapshot:
+    """A watchlist's summary as published by one refresh
+
+    Snapshots are replaced, never changed: a reader holding one sees a
+    consistent summary however many refreshes happen meanwhile. Treat the
+    summary as read-only. After a failed refresh `error` says why and the
+    summary is the last good one (None if there never was one).
+    """
+
+    def __init__(self, version, summary, computed_at, duration, error=None):
+        self.version = version
+        self.summary = summary
+        self.computed_at = computed_at
+        self.duration = duration
+        self.error = error
+
+    @property
+    def age(self):
+        """Seconds since the summary was computed"""
+        return time.time() - self.computed_at
+
+
+class _Watchlist:
+    """A registered watchlist and when it is next due"""
+
+    def __init__(self, addresses, settings, interval):
+        self.addresses = list(addresses)
+        self.settings = dict(settings)
+        self.interval = interval
+        self.due = time.monotonic()
+        self.read_at = time.monotonic()
+
+
+class RefreshScheduler:
+    """Keeps the summaries of registered watchlists fresh from a background thread
+
+    Every registered watchlist is recomputed with `analyze(addresses,
+    settings)` every `interval` seconds (or its own) by one daemon thread,
+    one watchlist at a time, and each result is published as a new
+    SummarySnapshot. Readers get the latest snapshot immediately and never
+    wait for a refresh. Watchlists whose snapshot nobody read for
+    `idle_timeout` seconds, e.g. after their sessions closed, are dropped.
+    """
+
+    def __init__(self, analyze=analyze_in_background, interval=REFRESH_INTERVAL, idle_timeout=IDLE_TIMEOUT):
+        self.analyze = analyze
+        self.interval = interval
+        self.idle_timeout = idle_timeout
+        self._watchlists = {}
+        self._snapshots = {}
+        self._versions = 0
+        self._thread = None
+        self._stopped = False
+        self._condition = threading.Condition()
+
+    def register(self, name, addresses, settings=None, interval=None):
+        """Refresh `addresses` with `settings` every `interval` seconds as `name`
+
+        Registering a name again with other addresses or settings replaces
+        them and refreshes right away; the snapshot so far stays readable.
+        """
+        settings = settings or {}
+        interval = interval or self.interval
+        with self._condition:
+            watchlist = self._watchlists.get(name)
+            if watchlist is None or watchlist.addresses != list(addresses) or watchlist.settings != settings:
+                self._watchlists[name] = _Watchlist(addresses, settings, interval)
+            else:
+                watchlist.due += interval - watchlist.interval
+                watchlist.interval = interval
+                watchlist.read_at = time.monotonic()
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="refresh-scheduler", daemon=True)
+                self._thread.start()
+            self._condition.notify_all()
+
+    def unregister(self, name):
+        """Stop refreshing `name` and forget its snapshot"""
+        with self._condition:
+            self._watchlists.pop(name, None)
+            self._snapshots.pop(name, None)
+
+    def refresh_now(self, name):
+        """Refresh `name` as soon as the thread is free"""
+        with self._condition:
+            watchlist = self._watchlists.get(name)
+            if watchlist is not None:
+                watchlist.due = time.monotonic()
+                self._condition.notify_all()
+
+    def snapshot(self, name):
+        """The latest snapshot of `name`, or None before its first refresh"""
+        with self._condition:
+            watchlist = self._watchlists.get(name)
+            if watchlist is not None:
+                watchlist.read_at = time.monotonic()
+            return self._snapshots.get(name)
+
+    def stop(self):
+        """Stop the thread after the refresh in progress, if any"""
+        with self._condition:
+            self._stopped = True
+            self._condition.notify_all()
+
+    def _next_due(self):
+        """Wait for the next watchlist that is due; None once stopped"""
+        with self._condition:
+            while not self._stopped:
+                now = time.monotonic()
+                for name, watchlist in list(self._watchlists.items()):
+                    if now - watchlist.read_at >= self.idle_timeout:
+                        del self._watchlists[name]
+                        self._snapshots.pop(name, None)
+                if self._watchlists:
+                    name, watchlist = min(self._watchlists.items(), key=lambda item: item[1].due)
+                    if watchlist.due <= now:
+                        return name, watchlist
+                    self._condition.wait(watchlist.due - now)
+                else:
+                    self._condition.wait()
+            return None
+
+    def _run(self):
+        while True:
+            due = self._next_due()
+            if due is None:
+                return
+            name, watchlist = due
+
+            started = time.monotonic()
+            try:
+                summary, error = self.analyze(watchlist.addresses, watchlist.settings), None
+            except Exception as e:
+                summary, error = None, str(e)
+            finished = time.monotonic()
+
+            with self._condition:
+                # Re-registered with other addresses or settings meanwhile
+                if self._watchlists.get(name) is not watchlist:
+                    continue
+                self._versions += 1
+                previous = self._snapshots.get(name)
+                if error is None:
+                    snapshot = SummarySnapshot(self._versions, summary, time.time(), finished - started)
+                else:
+                    snapshot = SummarySnapshot(
+                        self._versions,
+                        previous.summary if previous is not None else None,
+                        previous.computed_at if previous is not None else time.time(),
+                        finished - started,
+                        error
+                    )
+                self._snapshots[name] = snapshot
+                # The next refresh is an interval after this one started,
+                # unless refresh_now moved it meanwhile
+                if watchlist.due <= started:
+                    watchlist.due = max(started + watchlist.interval, finished)
+
+
+# Shared scheduler, created on first use
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_refresh_scheduler():
+    """Return the process-wide RefreshScheduler"""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = RefreshScheduler()
+        return _scheduler
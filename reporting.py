@@ -0,0 +1,190 @@
+import logging
+import sys
+import threading
+import time
+from collections import deque
+
+logger = logging.getLogger("hyperliquid_analysis")
+
+# The Streamlit page is redrawn at most this often (seconds) during a run
+REFRESH_INTERVAL = 0.5
+
+# Per-item messages kept in the page's run log, newest last
+LOG_LINES = 500
+
+
+class Reporter:
+    """Receives the progress and diagnostics of an analysis run
+
+    The base class drops everything; subclasses send it somewhere. Progress
+    is a fraction from 0 to 1, followed by `progress_done` when finished.
+    `detail` is for per-item messages (one per address or coin), which can
+    be many: they are counted under `counter`, if given, rather than shown
+    one by one.
+    """
+
+    def info(self, message):
+        pass
+
+    def warning(self, message):
+        pass
+
+    def error(self, message):
+        pass
+
+    def detail(self, message, counter=None, count=1):
+        pass
+
+    def progress(self, fraction):
+        pass
+
+    def progress_done(self):
+        pass
+
+    def flush(self):
+        """Show everything buffered so far, e.g. at the end of a run"""
+        pass
+
+
+def format_counters(counters):
+    """One line with every counter, e.g. "Addresses fetched: 480 · Fetch errors: 2\""""
+    return " · ".join(f"{name}: {count:,}" for name, count in counters.items())
+
+
+class LogReporter(Reporter):
+    """Sends messages to the `hyperliquid_analysis` logger, with progress
+    logged every `progress_step` (e.g. every 10%)
+
+    Details go to the debug level; their counters are logged when the
+    progress is done.
+    """
+
+    def __init__(self, progress_step=0.1):
+        self.progress_step = progress_step
+        self.counters = {}
+        self._next_progress = progress_step
+        self._lock = threading.Lock()
+
+    def info(self, message):
+        logger.info(message)
+
+    def warning(self, message):
+        logger.warning(message)
+
+    def error(self, message):
+        logger.error(message)
+
+    def detail(self, message, counter=None, count=1):
+        logger.debug(message)
+        if counter is not None:
+            with self._lock:
+                self.counters[counter] = self.counters.get(counter, 0) + count
+
+    def progress(self, fraction):
+        if fraction >= self._next_progress:
+            logger.info(f"Progress: {fraction:.0%}")
+            while self._next_progress <= fraction:
+                self._next_progress += self.progress_step
+
+    def progress_done(self):
+        self._next_progress = self.progress_step
+        with self._lock:
+            counters, self.counters = self.counters, {}
+        if counters:
+            logger.info(format_counters(counters))
+
+
+class StreamlitReporter(Reporter):
+    """Writes messages to the running Streamlit page, with a progress bar
+
+    Details and progress are buffered and the page is redrawn at most
+    every `refresh_interval` seconds: a status line with the counters, the
+    progress bar and an expandable log of the last `log_lines` details. So
+    a run sends about the same number of updates to the browser however
+    many addresses it has. Only the thread that created the reporter (the
+    script's) draws; other threads just buffer.
+    """
+
+    def __init__(self, refresh_interval=REFRESH_INTERVAL, log_lines=LOG_LINES):
+        # Imported here so the analysis itself never needs Streamlit
+        import streamlit
+        self.st = streamlit
+        self.refresh_interval = refresh_interval
+        self.counters = {}
+        self._log = deque(maxlen=log_lines)
+        self._fraction = None
+        self._changed = False
+        self._refreshed_at = 0.0
+        self._thread = threading.get_ident()
+        self._lock = threading.Lock()
+        self._status = None
+        self._progress_bar = None
+        self._log_area = None
+
+    def info(self, message):
+        self.st.write(message)
+
+    def warning(self, message):
+        self.st.warning(message)
+
+    def error(self, message):
+        self.st.error(message)
+
+    def detail(self, message, counter=None, count=1):
+        with self._lock:
+            self._log.append(message)
+            if counter is not None:
+                self.counters[counter] = self.counters.get(counter, 0) + count
+            self._changed = True
+        self._refresh()
+
+    def progress(self, fraction):
+        with self._lock:
+            self._fraction = min(max(fraction, 0.0), 1.0)
+            self._changed = True
+        self._refresh()
+
+    def progress_done(self):
+        self.flush()
+        if self._progress_bar is not None:
+            self._progress_bar.empty()
+            self._progress_bar = None
+        self._fraction = None
+
+    def flush(self):
+        self._refresh(force=True)
+
+    def _refresh(self, force=False):
+        """Redraw whatever changed, unless the last redraw was too recent"""
+        if threading.get_ident() != self._thread:
+            return
+        now = time.monotonic()
+        with self._lock:
+            if not self._changed or (not force and now - self._refreshed_at < self.refresh_interval):
+                return
+            self._changed = False
+            self._refreshed_at = now
+            counters = format_counters(self.counters)
+            fraction = self._fraction
+            log = "\n".join(self._log)
+
+        # Placeholders are laid out in this order the first time they're needed
+        if counters:
+            if self._status is None:
+                self._status = self.st.empty()
+            self._status.caption(counters)
+        if fraction is not None:
+            if self._progress_bar is None:
+                self._progress_bar = self.st.progress(0)
+            self._progress_bar.progress(fraction)
+        if log:
+            if self._log_area is None:
+                self._log_area = self.st.expander("Run log").empty()
+            self._log_area.code(log, language=None)
+
+
+def default_reporter():
+    """A StreamlitReporter inside the Streamlit app, a LogReporter anywhere else"""
+    if "streamlit" in sys.modules:
+        return StreamlitReporter()
+    return LogReporter()
@@ -0,0 +1,108 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+
+from single_flight import SingleFlight
+
+# Summaries kept in the process, at most; the least recently used go first
+MAX_CACHED_RESULTS = 32
+
+
+def result_key(addresses, settings, freshness, now=None):
+    """Cache key of an analysis: a hash of the watchlist and `settings`,
+    plus the freshness period (of `freshness` seconds) that `now` falls in
+
+    Order and duplicates in `addresses` don't change the key. With
+    `freshness` of 0 or less the key has no period.
+    """
+    content = json.dumps([sorted(set(addresses)), settings], sort_keys=True, default=str)
+    digest = hashlib.sha256(content.encode()).hexdigest()
+    if freshness <= 0:
+        return digest
+    now = time.time() if now is None else now
+    return f"{digest}:{int(now // freshness)}"
+
+
+class ResultCache:
+    """Analysis summaries kept in this process, shared between sessions
+
+    A summary is computed once per key: callers asking for a key that is
+    being computed wait for it instead of computing it again, and later
+    callers get it from the cache. Empty or missing summaries are not
+    kept, so a failed run is retried. Treat cached DataFrames as read-only.
+    """
+
+    def __init__(self, max_results=MAX_CACHED_RESULTS):
+        self.max_results = max_results
+        self.hits = 0
+        self.misses = 0
+        self._results = OrderedDict()  # Key -> (computed at, summary)
+        self._computing = SingleFlight()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Return (summary, computed at) cached for `key`, or None"""
+        with self._lock:
+            result = self._results.get(key)
+            if result is not None:
+                self._results.move_to_end(key)
+        return result
+
+    def put(self, key, summary, computed_at=None):
+        """Cache `summary` for `key`, dropping the least recently used beyond the limit"""
+        if summary is None or summary.empty:
+            return
+        with self._lock:
+            self._results[key] = (time.time() if computed_at is None else computed_at, summary)
+            self._results.move_to_end(key)
+            while len(self._results) > self.max_results:
+                self._results.popitem(last=False)
+
+    def get_or_compute(self, key, compute, force=False, store=True):
+        """Return (summary, computed at, reused) for `key`
+
+        The summary is the cached one, unless `force` or there is none, in
+        which case it is `compute()`, shared with identical calls in
+        flight. `reused` tells whether this call got a summary computed
+        for another one. `store=False` doesn't keep the new summary.
+        """
+        if not force:
+            result = self.get(key)
+            if result is not None:
+                self.hits += 1
+                return result[1], result[0], True
+        self.misses += 1
+
+        computed = []
+
+        def run():
+            computed.append(True)
+            summary = compute()
+            computed_at = time.time()
+            if store:
+                self.put(key, summary, computed_at)
+            return summary, computed_at
+
+        summary, computed_at = self._computing.do(key, run)
+        return summary, computed_at, not computed
+
+    def clear(self):
+        """Forget every summary"""
+        with self._lock:
+            self._results.clear()
+
+
+# Shared cache, created on first use
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_result_cache():
+    """Return the process-wide ResultCache"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ResultCache()
+        return _cache
@@ -0,0 +1,199 @@
+import math
+import multiprocessing
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import numpy as np
+
+from address_partials import PartialAccumulator
+from fill_store import get_fill_store, records_to_table, table_to_frame
+from hyperliquid_client import CircuitOpenError
+from rate_limiter import get_rate_limiter
+
+# Shards per worker process: more, smaller shards balance uneven addresses
+# and report progress more often
+SHARDS_PER_WORKER = 4
+
+
+def default_workers():
+    """One worker process per core"""
+    return os.cpu_count() or 1
+
+
+def shard_addresses(addresses, shard_count):
+    """Split `addresses` into at most `shard_count` contiguous shards of about equal size"""
+    addresses = list(addresses)
+    if not addresses:
+        return []
+    size = math.ceil(len(addresses) / max(1, shard_count))
+    return [addresses[start:start + size] for start in range(0, len(addresses), size)]
+
+
+def read_shard(addresses, cutoff_timestamps, primary_window, until=None):
+    """Partials of the fills stored for `addresses` (worker process)
+
+    With `until` (address -> time) only fills before an address's time are
+    read: those from then on are fetched again.
+    """
+    if not addresses:
+        return []
+    accumulator = PartialAccumulator(cutoff_timestamps, primary_window)
+    for frame in get_fill_store().iter_frames(min(cutoff_timestamps.values()), addresses=addresses):
+        if until is not None:
+            before = frame['trader_address'].astype(str).map(until).fillna(np.inf)
+            frame = frame[frame['time'].to_numpy() < before.to_numpy()]
+        accumulator.add(frame)
+    return accumulator.address_partials()
+
+
+def fetch_shard(addresses, fetch_from, partials, cutoff_timestamps, primary_window,
+                max_requests, batch_size, store, priorities, rate_share):
+    """Fetch the fills of `addresses`, store them and add them to their partials (worker process)
+
+    `partials` are the partials the shard starts from; fills fetched again
+    from the millisecond they end at are skipped (see
+    `minute_rollup.skip_included`). This process gets `rate_share` of the
+    API weight budget. Returns a dict with the shard's `partials`,
+    `newest` as (address, fetched_from, newest fill time) tuples for
+    `fill_cache.FillCache.update`, `failed` as (address, message,
+    circuit_open) tuples, the `notional` fetched per address, and the
+    `fetched` and `stored` counts.
+    """
+    # Imported here: hyperliquid_analysis runs the pool
+    from hyperliquid_analysis import fills_notional, iter_fills_concurrently
+
+    get_rate_limiter().share = rate_share
+    accumulator = PartialAccumulator(cutoff_timestamps, primary_window, partials)
+    fill_store = get_fill_store()
+    result = {'newest': [], 'failed': [], 'notional': {}, 'fetched': 0, 'stored': 0}
+    batch = []
+
+    def add_batch():
+        if batch:
+            table = records_to_table(np.concatenate(batch))
+            batch.clear()
+            accumulator.add(table_to_frame(table))
+            if store:
+                result['stored'] += fill_store.append_table(table)
+
+    for address, fills, error in iter_fills_concurrently(addresses, fetch_from, max_requests, priorities):
+        if error is not None:
+            # Exceptions may not pickle: only their message goes back
+            result['failed'].append((address, str(error), isinstance(error, CircuitOpenError)))
+            continue
+        result['fetched'] += len(fills)
+        result['notional'][address] = fills_notional(fills)
+        result['newest'].append((address, fetch_from[address], int(fills['time'].max()) if len(fills) else None))
+        batch.append(fills)
+        if sum(len(records) for records in batch) >= batch_size:
+            add_batch()
+    add_batch()
+
+    result['partials'] = accumulator.address_partials(addresses)
+    return result
+
+
+def iter_shards(addresses, fetch_from, cutoff_timestamps, primary_window, from_store=None, partials=(),
+                workers=None, max_requests=8, batch_size=50000, store=True, priorities=None,
+                initializer=None, initargs=()):
+    """Fetch and aggregate shards of addresses in a process pool, yielding each shard's result as it completes
+
+    Each worker builds `address_partials.AddressPartial`s for its shard,
+    so only partials, never fills, come back to this process; merge them
+    with `address_partials.merge_partials`. Yields the dicts returned by
+    `fetch_shard` plus the shard's `addresses`, later partials replacing
+    earlier ones of the same address.
+
+    1. The workers add the fills stored for `from_store`, addresses
+       without one of the cached `partials`, from before their
+       `fetch_from`.
+    2. They fetch every address from `fetch_from` (address -> start time),
+       append the fills to the fill store unless `store` is False, and add
+       them. `max_requests` API requests are in flight across all workers,
+       which split the rate limiter's budget; addresses with higher
+       `priorities` go first.
+    3. Failed addresses fall back to everything stored for them, unless
+       cached. `from_store=None` never reads the store.
+
+    Reads and writes are separate steps, so no worker reads the store
+    while another writes it. Workers are started fresh ("spawn") rather
+    than forked: a fork of the multi-threaded app could inherit locks held
+    by other threads and wait on them forever. So they only have what
+    `initializer(*initargs)` installs, e.g. an API client with
+    `hyperliquid_client.set_client`.
+    """
+    workers = max(1, min(workers or default_workers(), len(addresses)))
+    priorities = priorities or {}
+    # Shards start in order, so the top addresses go in the first ones
+    ordered = sorted(addresses, key=lambda address: -priorities.get(address, 0))
+    shards = shard_addresses(ordered, workers * SHARDS_PER_WORKER)
+    shard_requests = max(1, max_requests // workers)
+    partials = {partial.address: partial for partial in partials}
+    cached = set(partials)
+    from_store = set(from_store) if from_store is not None else None
+
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=initializer,
+        initargs=initargs
+    ) as executor:
+        # Step 1: stored fills
+        reads = []
+        for shard in shards if from_store else []:
+            stored = [address for address in shard if address in from_store]
+            reads.append(executor.submit(
+                read_shard,
+                stored,
+                cutoff_timestamps,
+                primary_window,
+                {address: fetch_from[address] for address in stored}
+            ))
+        for read in reads:
+            for partial in read.result():
+                partials[partial.address] = partial
+
+        # Step 2: new fills
+        failed = []
+        running = {
+            executor.submit(
+                fetch_shard,
+                shard,
+                {address: fetch_from[address] for address in shard},
+                [partials[address] for address in shard if address in partials],
+                cutoff_timestamps,
+                primary_window,
+                shard_requests,
+                batch_size,
+                store,
+                {address: priorities[address] for address in shard if address in priorities},
+                1 / workers
+            ): shard
+            for shard in shards
+        }
+        while running:
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                result = future.result()
+                result['addresses'] = running.pop(future)
+                failed += [address for address, message, circuit_open in result['failed']]
+                yield result
+
+        # Step 3: everything stored for failed addresses
+        if from_store is not None:
+            # Replaces the partials of stored fills read up to `fetch_from`
+            fallback = [address for address in failed if address not in cached]
+            reads = [
+                executor.submit(read_shard, shard, cutoff_timestamps, primary_window)
+                for shard in shard_addresses(fallback, workers)
+            ]
+            for read in reads:
+                yield {
+                    'addresses': [],
+                    'partials': read.result(),
+                    'newest': [],
+                    'failed': [],
+                    'notional': {},
+                    'fetched': 0,
+                    'stored': 0,
+                }
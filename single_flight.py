@@ -0,0 +1,87 @@
+import threading
+import time
+from collections import OrderedDict
+
+# Finished results kept for late callers, at most
+MAX_SHARED_RESULTS = 10000
+
+
+class _Call:
+    """One call in flight, waited on by every caller with its key"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class SingleFlight:
+    """Runs identical calls once and shares the result between callers
+
+    Callers pass a key identifying the request. While a call with that key
+    is in flight, other callers wait for it and get its result (or its
+    exception) instead of calling again. A result also stays shared for
+    `fresh_for` seconds after the call returns, so callers arriving just
+    after it don't repeat it either. Results are kept for at most
+    `max_age` seconds, and no more than `max_results` of them.
+    """
+
+    def __init__(self, max_age=60.0, max_results=MAX_SHARED_RESULTS):
+        self.max_age = max_age
+        self.max_results = max_results
+        self.calls = 0   # Calls that ran
+        self.shared = 0  # Calls answered with another caller's result
+        self._in_flight = {}
+        self._results = OrderedDict()  # Key -> (finished at, value), oldest first
+        self._lock = threading.Lock()
+
+    def _prune(self, now):
+        while self._results:
+            key, (finished_at, value) = next(iter(self._results.items()))
+            if now - finished_at < self.max_age and len(self._results) <= self.max_results:
+                break
+            self._results.popitem(last=False)
+
+    def do(self, key, function, fresh_for=0.0):
+        """Return `function()`, or the result of an identical call in
+        flight or finished less than `fresh_for` seconds ago"""
+        with self._lock:
+            now = time.monotonic()
+            self._prune(now)
+            result = self._results.get(key)
+            if result is not None and now - result[0] < min(fresh_for, self.max_age):
+                self.shared += 1
+                return result[1]
+
+            call = self._in_flight.get(key)
+            leader = call is None
+            if leader:
+                call = self._in_flight[key] = _Call()
+                self.calls += 1
+            else:
+                self.shared += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.value
+
+        try:
+            call.value = function()
+            return call.value
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+                if call.error is None and fresh_for > 0:
+                    self._results.pop(key, None)
+                    self._results[key] = (time.monotonic(), call.value)
+            call.done.set()
+
+    def clear(self):
+        """Forget every finished result"""
+        with self._lock:
+            self._results.clear()
@@ -0,0 +1,199 @@
+import numpy as np
+
+from fill_records import COINS, DIRECTIONS
+from vectorized_aggregation import summary_frame
+
+# Totals kept per coin and window (see `vectorized_aggregation.summary_frame`)
+TOTAL_NAMES = ('fills', 'volume', 'long_size', 'short_size', 'long_value', 'short_value')
+
+# Compact the log once this many entries at its front are evicted from every window
+COMPACT_AFTER = 4096
+
+
+def _direction_flags(direction):
+    """(opens a long, opens a short) for a direction string, as `fill_columns` decides them"""
+    direction = direction if isinstance(direction, str) else ''
+    is_open = 'Open' in direction
+    is_long = is_open and 'Long' in direction
+    return is_long, is_open and not is_long and 'Short' in direction
+
+
+class SlidingWindows:
+    """Per-coin totals for time windows ending now, kept current as fills stream in
+
+    `window_lengths` maps each window to its length in milliseconds, in the
+    order the summary shows them. Fills are added as they arrive and every
+    window evicts them again once they are older than its length at
+    `advance(now)`, so each fill is added and evicted at most once per
+    window: O(1) amortized work per fill and window, whatever the history.
+    The totals, distinct traders (a count of fills per trader, so exact)
+    and last trades are those the batch engines compute over the same
+    fills (see `vectorized_aggregation.WindowAccumulator`).
+
+    All windows share one log of fills in arrival order and each keeps its
+    place in it. Eviction follows arrival order: a fill that arrives late
+    leaves a window no earlier than the fills that arrived before it.
+    Fills already in the log (same trader and trade id) are skipped, so
+    overlapping backfills and stream snapshots are only counted once.
+    Fills with an unparseable price or size are skipped.
+    """
+
+    def __init__(self, window_lengths, primary_window):
+        self.windows = list(window_lengths)
+        self.lengths = [int(window_lengths[window]) for window in self.windows]
+        self.primary_window = primary_window
+        self.now = 0
+        self.fill_count = 0        # Fills added to at least one window
+        self._log = []             # (time, coin, trader, tid, size, value, is_long, is_short, window bits)
+        self._dropped = 0          # Entries compacted away from the front of the log
+        self._heads = [0] * len(self.windows)  # Log position of the oldest entry each window may hold
+        self._totals = [{} for _ in self.windows]          # Coin -> list of TOTAL_NAMES totals
+        self._trader_fills = [{} for _ in self.windows]    # (coin, trader) -> fills in the window
+        self._trader_counts = [{} for _ in self.windows]   # Coin -> distinct traders in the window
+        self._seen = set()         # (trader, tid) of every fill in the log
+        self._last_trades = {}     # Coin -> (time, price)
+        self._flags = []           # Direction id -> (opens long, opens short)
+
+    def _direction(self, direction_id):
+        while len(self._flags) < len(DIRECTIONS.values):
+            self._flags.append(_direction_flags(DIRECTIONS.values[len(self._flags)]))
+        return self._flags[direction_id] if direction_id >= 0 else (False, False)
+
+    def _cutoffs(self):
+        return [self.now - length for length in self.lengths]
+
+    def add(self, records):
+        """Add a `fill_records.FILL_DTYPE` array of new fills"""
+        if len(records) == 0:
+            return
+        sizes = np.abs(records['sz'])
+        values = sizes * records['px']
+        valid = np.isfinite(values)
+        cutoffs = self._cutoffs()
+
+        for timestamp, coin, trader, direction, tid, size, value, price in zip(
+            records['time'][valid].tolist(),
+            records['coin'][valid].tolist(),
+            records['trader'][valid].tolist(),
+            records['dir'][valid].tolist(),
+            records['tid'][valid].tolist(),
+            sizes[valid].tolist(),
+            values[valid].tolist(),
+            records['px'][valid].tolist()
+        ):
+            key = (trader, tid)
+            if key in self._seen:
+                continue
+            bits = 0
+            for index, cutoff in enumerate(cutoffs):
+                if timestamp >= cutoff:
+                    bits |= 1 << index
+            if not bits:
+                continue
+
+            is_long, is_short = self._direction(direction)
+            entry = (timestamp, coin, trader, tid, size, value, is_long, is_short, bits)
+            self._log.append(entry)
+            self._seen.add(key)
+            self.fill_count += 1
+            for index in range(len(self.windows)):
+                if bits >> index & 1:
+                    self._count(index, entry, 1)
+
+            last = self._last_trades.get(coin)
+            if last is None or timestamp >= last[0]:
+                self._last_trades[coin] = (timestamp, price)
+
+    def _count(self, index, entry, sign):
+        """Add (`sign` 1) or remove (-1) one fill from window `index`"""
+        timestamp, coin, trader, tid, size, value, is_long, is_short, bits = entry
+        totals = self._totals[index].get(coin)
+        if totals is None:
+            totals = self._totals[index][coin] = [0, 0.0, 0.0, 0.0, 0.0, 0.0]
+        totals[0] += sign
+        if totals[0] == 0:
+            # Nothing left: start again from exact zeros rather than
+            # carrying rounding errors from the subtractions
+            del self._totals[index][coin]
+        else:
+            totals[1] += sign * size
+            if is_long:
+                totals[2] += sign * size
+                totals[4] += sign * value
+            elif is_short:
+                totals[3] += sign * size
+                totals[5] += sign * value
+
+        if trader >= 0:
+            trader_fills = self._trader_fills[index]
+            trader_counts = self._trader_counts[index]
+            fills = trader_fills.get((coin, trader), 0) + sign
+            if fills:
+                trader_fills[(coin, trader)] = fills
+            else:
+                del trader_fills[(coin, trader)]
+            if fills == 0 or (sign > 0 and fills == 1):
+                trader_counts[coin] = trader_counts.get(coin, 0) + sign
+                if not trader_counts[coin]:
+                    del trader_counts[coin]
+
+    def advance(self, now):
+        """Move the windows to end at `now` (milliseconds), evicting fills that aged out"""
+        if now <= self.now:
+            return
+        self.now = now
+        log = self._log
+        end = self._dropped + len(log)
+        for index, cutoff in enumerate(self._cutoffs()):
+            head = self._heads[index]
+            bit = 1 << index
+            while head < end:
+                entry = log[head - self._dropped]
+                if entry[0] >= cutoff:
+                    break
+                if entry[8] & bit:
+                    self._count(index, entry, -1)
+                head += 1
+            self._heads[index] = head
+
+        # Entries every window has passed can go
+        oldest = min(self._heads) - self._dropped
+        if oldest >= COMPACT_AFTER and oldest * 2 >= len(log):
+            for entry in log[:oldest]:
+                self._seen.discard((entry[2], entry[3]))
+            del log[:oldest]
+            self._dropped += oldest
+
+    def last_trade_prices(self):
+        """Latest traded price per coin still in a window"""
+        return {
+            COINS.values[coin]: price for coin, (timestamp, price) in self._last_trades.items()
+            if coin in self._totals[self.windows.index(self.primary_window)]
+        }
+
+    def summary(self, current_prices, price_changes, fallback_prices=None):
+        """Build the summary table (see `vectorized_aggregation.summary_frame`) for the windows as they are now"""
+        if fallback_prices is None:
+            fallback_prices = self.last_trade_prices()
+        coin_ids = sorted(set().union(*self._totals))
+        rows = {coin: row for row, coin in enumerate(coin_ids)}
+
+        totals = {name: np.zeros((len(coin_ids), len(self.windows))) for name in TOTAL_NAMES}
+        trader_counts = np.zeros((len(coin_ids), len(self.windows)), dtype=int)
+        for index in range(len(self.windows)):
+            for coin, values in self._totals[index].items():
+                for name, value in zip(TOTAL_NAMES, values):
+                    totals[name][rows[coin], index] = value
+            for coin, count in self._trader_counts[index].items():
+                trader_counts[rows[coin], index] = count
+
+        return summary_frame(
+            [COINS.values[coin] for coin in coin_ids],
+            self.windows,
+            self.primary_window,
+            totals,
+            trader_counts,
+            current_prices,
+            price_changes,
+            fallback_prices
+        )
@@ -0,0 +1,302 @@
+"""Local stand-in for the Hyperliquid /info endpoint
+
+Serves metaAndAssetCtxs, userFills and userFillsByTime from synthetic or
+recorded fixtures, with injectable latency and rate limiting, so the app
+and benchmarks can run without touching the real exchange:
+
+    python standin_server.py --port 8099 --latency-ms 80 --error-rate 0.05
+    HYPERLIQUID_INFO_URL=http://127.0.0.1:8099/info HYPERLIQUID_WEIGHT_PER_MINUTE=off streamlit run app.py
+
+Record fixtures from the real API once, then replay them:
+
+    python standin_server.py record --address-file addresses.txt --output fixtures.json
+    python standin_server.py --fixtures fixtures.json
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from hyperliquid_client import get_client
+from rate_limiter import request_weight, response_weight
+from synthetic_fills import generate_dataset, generate_fills, generate_meta_and_asset_ctxs
+
+
+class StandInState:
+    """Fixtures and fault settings shared by every request handler"""
+
+    def __init__(self, meta, fills_by_address, latency_ms=0.0, jitter_ms=0.0, error_rate=0.0,
+                 error_status=429, retry_after=None, page_limit=2000, synthesize_unknown=True,
+                 fills_per_trader=50, seed=0, weight_per_minute=None):
+        self.meta = meta
+        self.fills_by_address = fills_by_address
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.retry_after = retry_after
+        self.page_limit = page_limit
+        self.synthesize_unknown = synthesize_unknown
+        self.fills_per_trader = fills_per_trader
+        self.seed = seed
+        self.weight_per_minute = weight_per_minute
+        self.started_ms = int(time.time() * 1000)
+        self.requests = 0
+        self.errors = 0
+        self.rate_limited = 0
+        self._budget = weight_per_minute or 0.0
+        self._budget_updated = time.monotonic()
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def delay(self):
+        """Seconds to wait before answering"""
+        with self._lock:
+            jitter = self._rng.uniform(-self.jitter_ms, self.jitter_ms) if self.jitter_ms else 0.0
+        return max(0.0, self.latency_ms + jitter) / 1000
+
+    def should_fail(self):
+        with self._lock:
+            self.requests += 1
+            failed = self._rng.random() < self.error_rate
+            if failed:
+                self.errors += 1
+            return failed
+
+    def _refill_budget(self):
+        now = time.monotonic()
+        self._budget = min(
+            self.weight_per_minute,
+            self._budget + (now - self._budget_updated) * self.weight_per_minute / 60
+        )
+        self._budget_updated = now
+
+    def spend(self, weight):
+        """Spend request weight from a bucket refilled at `weight_per_minute`;
+        False once it is empty (answered with 429, like the real API)"""
+        if self.weight_per_minute is None:
+            return True
+        with self._lock:
+            self._refill_budget()
+            if self._budget < weight:
+                self.rate_limited += 1
+                return False
+            self._budget -= weight
+            return True
+
+    def charge(self, weight):
+        """Spend the extra weight of a large response, even into debt"""
+        if self.weight_per_minute is None:
+            return
+        with self._lock:
+            self._refill_budget()
+            self._budget -= weight
+
+    def fills_for(self, address):
+        """Fills for an address, newest first, synthesizing unknown addresses on demand"""
+        address = address.lower()
+        with self._lock:
+            fills = self.fills_by_address.get(address)
+            if fills is None and self.synthesize_unknown:
+                # Seed from the address so every run serves the same fills
+                digest = hashlib.sha256(f"{self.seed}:{address}".encode()).digest()
+                rng = random.Random(int.from_bytes(digest[:8], "big"))
+                count = int(rng.expovariate(1.0 / self.fills_per_trader)) if self.fills_per_trader else 0
+                fills = generate_fills(address, count, self.started_ms, rng)
+                self.fills_by_address[address] = fills
+            return fills or []
+
+    def respond(self, payload):
+        """Return the response body for a request payload, or raise ValueError"""
+        request_type = payload.get("type")
+        if request_type == "metaAndAssetCtxs":
+            return self.meta
+        if request_type == "userFills":
+            return self.fills_for(payload["user"])[:self.page_limit]
+        if request_type == "userFillsByTime":
+            start_time = int(payload["startTime"])
+            end_time = payload.get("endTime")
+            fills = [
+                fill for fill in reversed(self.fills_for(payload["user"]))
+                if fill["time"] >= start_time and (end_time is None or fill["time"] <= int(end_time))
+            ]
+            return fills[:self.page_limit]
+        raise ValueError(f"Unsupported request type: {request_type}")
+
+
+class InfoHandler(BaseHTTPRequestHandler):
+    """Handles POST /info like the real endpoint"""
+
+    protocol_version = "HTTP/1.1"
+
+    def _send(self, status, body=b"", headers=None):
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        state = self.server.state
+        length = int(self.headers.get("Content-Length", 0))
+        try:
+            payload = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            self._send(400, b"invalid json")
+            return
+
+        time.sleep(state.delay())
+
+        if state.should_fail():
+            headers = {"Retry-After": str(state.retry_after)} if state.retry_after is not None else {}
+            self._send(state.error_status, b"", headers)
+            return
+
+        if not state.spend(request_weight(payload)):
+            self._send(429, b"")
+            return
+
+        try:
+            response = state.respond(payload)
+        except (KeyError, ValueError) as e:
+            self._send(422, str(e).encode())
+            return
+        state.charge(response_weight(payload, response))
+        body = json.dumps(response).encode()
+
+        headers = {"Content-Type": "application/json"}
+        if "gzip" in self.headers.get("Accept-Encoding", ""):
+            body = gzip.compress(body, compresslevel=5)
+            headers["Content-Encoding"] = "gzip"
+        self._send(200, body, headers)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+def make_server(state, host="127.0.0.1", port=8099, verbose=False):
+    """Create (but don't start) a stand-in server; port 0 picks a free port"""
+    server = ThreadingHTTPServer((host, port), InfoHandler)
+    server.daemon_threads = True
+    server.state = state
+    server.verbose = verbose
+    return server
+
+
+def start_in_background(state, host="127.0.0.1", port=0):
+    """Start a stand-in server on a thread; returns (server, info URL)"""
+    server = make_server(state, host, port)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}/info"
+
+
+def load_fixtures(path):
+    """Load recorded fixtures: {"metaAndAssetCtxs": ..., "userFills": {address: [...]}}"""
+    with open(path, "r") as f:
+        fixtures = json.load(f)
+    fills = {address.lower(): sorted(items, key=lambda fill: fill["time"], reverse=True)
+             for address, items in fixtures.get("userFills", {}).items()}
+    return fixtures.get("metaAndAssetCtxs") or generate_meta_and_asset_ctxs(), fills
+
+
+def record_fixtures(addresses, path, client=None):
+    """Save the real API's answers for some addresses as a fixtures file"""
+    client = client or get_client()
+    fixtures = {
+        "metaAndAssetCtxs": client.meta_and_asset_ctxs(),
+        "userFills": {address: client.user_fills(address) for address in addresses},
+    }
+    with open(path, "w") as f:
+        json.dump(fixtures, f)
+    return fixtures
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Local stand-in for the Hyperliquid /info endpoint")
+    parser.add_argument("command", nargs="?", default="serve", choices=["serve", "record"])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--fixtures", help="recorded fixtures to serve instead of synthetic fills")
+    parser.add_argument("--addresses", type=int, default=0,
+                        help="synthetic addresses to pre-generate (others are generated on demand)")
+    parser.add_argument("--write-addresses",
+                        help="write the pre-generated addresses to this CSV for the app")
+    parser.add_argument("--fills-per-trader", type=int, default=50,
+                        help="mean fills per synthetic trader; scales payload sizes")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="delay before every response")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="random +/- added to the delay")
+    parser.add_argument("--error-rate", type=float, default=0.0,
+                        help="share of requests answered with --error-status")
+    parser.add_argument("--error-status", type=int, default=429)
+    parser.add_argument("--retry-after", type=float, help="Retry-After seconds sent with errors")
+    parser.add_argument("--weight-per-minute", type=float,
+                        help="answer 429 beyond this request weight budget (unlimited by default)")
+    parser.add_argument("--page-limit", type=int, default=2000, help="maximum fills per response")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--verbose", action="store_true", help="log every request")
+    parser.add_argument("--output", default="fixtures.json", help="record: where to write fixtures")
+    parser.add_argument("--address-file", help="record: file with one address per line")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    if args.command == "record":
+        with open(args.address_file, "r") as f:
+            addresses = [line.strip() for line in f if line.strip().startswith("0x")]
+        record_fixtures(addresses, args.output)
+        print(f"Recorded {len(addresses)} addresses to {args.output}")
+        return 0
+
+    if args.fixtures:
+        meta, fills_by_address = load_fixtures(args.fixtures)
+    else:
+        meta = generate_meta_and_asset_ctxs(args.seed)
+        fills_by_address = generate_dataset(
+            addresses=args.addresses,
+            fills_per_trader=args.fills_per_trader,
+            seed=args.seed
+        )
+
+    if args.write_addresses:
+        with open(args.write_addresses, "w") as f:
+            f.write("address\n")
+            for address in fills_by_address:
+                f.write(address + "\n")
+
+    state = StandInState(
+        meta,
+        fills_by_address,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        retry_after=args.retry_after,
+        page_limit=args.page_limit,
+        synthesize_unknown=not args.fixtures,
+        fills_per_trader=args.fills_per_trader,
+        seed=args.seed,
+        weight_per_minute=args.weight_per_minute
+    )
+    server = make_server(state, args.host, args.port, args.verbose)
+    print(f"Serving Hyperliquid stand-in on http://{args.host}:{server.server_address[1]}/info")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(f"Served {state.requests} requests ({state.errors} injected errors, {state.rate_limited} rate limited)")
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
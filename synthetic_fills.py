@@ -0,0 +1,155 @@
+import random
+import time
+
+# Coins and rough prices for synthetic fills, most traded first
+SYNTHETIC_COINS = {
+    "BTC": 95000.0,
+    "ETH": 3400.0,
+    "SOL": 180.0,
+    "HYPE": 25.0,
+    "XRP": 2.2,
+    "DOGE": 0.35,
+    "AVAX": 38.0,
+    "LINK": 22.0,
+    "SUI": 4.1,
+    "ARB": 0.8,
+    "FARTCOIN": 1.2,
+    "kPEPE": 0.02,
+}
+
+# Spot pair that is not listed by metaAndAssetCtxs
+SPOT_COIN = "@107"
+
+
+def generate_addresses(count, seed=0):
+    """Deterministic fake wallet addresses"""
+    rng = random.Random(seed)
+    return [f"0x{rng.getrandbits(160):040x}" for _ in range(count)]
+
+
+def generate_fills(address, count, now_ms, rng, span_ms=24 * 3600 * 1000, coin_skew=1.2,
+                   open_ratio=0.6, long_ratio=0.5, spot_ratio=0.0, first_tid=0):
+    """Generate `count` userFills-shaped dicts for one address, newest first
+
+    Coins are drawn with Zipf-like weights (`coin_skew` 0 means uniform).
+    `open_ratio` of fills open a position and `long_ratio` of those are
+    longs; `spot_ratio` of fills trade the unlisted spot coin.
+    """
+    coins = list(SYNTHETIC_COINS)
+    weights = [1.0 / (rank + 1) ** coin_skew for rank in range(len(coins))]
+    fills = []
+
+    for i in range(count):
+        if rng.random() < spot_ratio:
+            coin, base_price = SPOT_COIN, 0.09
+        else:
+            coin = rng.choices(coins, weights)[0]
+            base_price = SYNTHETIC_COINS[coin]
+
+        side_long = rng.random() < long_ratio
+        if rng.random() < open_ratio:
+            direction = "Open Long" if side_long else "Open Short"
+        else:
+            direction = "Close Long" if side_long else "Close Short"
+        if coin == SPOT_COIN:
+            direction = "Buy" if side_long else "Sell"
+
+        tid = first_tid + i
+        px = base_price * rng.uniform(0.97, 1.03)
+        sz = rng.expovariate(1.0) * 1000.0 / base_price
+        fills.append({
+            "coin": coin,
+            "px": f"{px:.6g}",
+            "sz": f"{sz:.6g}",
+            "side": "B" if direction in ("Open Long", "Close Short", "Buy") else "A",
+            "time": now_ms - rng.randrange(span_ms),
+            "startPosition": "0.0",
+            "dir": direction,
+            "closedPnl": "0.0",
+            "hash": f"0x{rng.getrandbits(256):064x}",
+            "oid": tid,
+            "crossed": rng.random() < 0.7,
+            "fee": f"{px * sz * 0.00035:.6f}",
+            "tid": tid,
+            "feeToken": "USDC",
+        })
+
+    fills.sort(key=lambda fill: fill["time"], reverse=True)
+    return fills
+
+
+def generate_dataset(addresses=100, fills_per_trader=50, coin_skew=1.2, open_ratio=0.6,
+                     long_ratio=0.5, spot_ratio=0.02, span_hours=24, seed=0, now_ms=None):
+    """Generate fills for a set of synthetic traders
+
+    Trader activity is exponentially distributed around
+    `fills_per_trader`, so a few traders are much busier than the rest.
+    Returns a dict of address -> fills, newest first.
+    """
+    rng = random.Random(seed)
+    now_ms = now_ms if now_ms is not None else int(time.time() * 1000)
+    dataset = {}
+    tid = 0
+
+    for address in generate_addresses(addresses, seed):
+        count = int(rng.expovariate(1.0 / fills_per_trader)) if fills_per_trader else 0
+        dataset[address] = generate_fills(
+            address, count, now_ms, rng,
+            span_ms=span_hours * 3600 * 1000,
+            coin_skew=coin_skew,
+            open_ratio=open_ratio,
+            long_ratio=long_ratio,
+            spot_ratio=spot_ratio,
+            first_tid=tid
+        )
+        tid += count
+
+    return dataset
+
+
+def generate_meta_and_asset_ctxs(seed=0):
+    """A metaAndAssetCtxs-shaped response for the synthetic perp coins"""
+    rng = random.Random(seed)
+    universe = []
+    asset_ctxs = []
+    for coin, price in SYNTHETIC_COINS.items():
+        universe.append({"name": coin, "szDecimals": 2, "maxLeverage": 20})
+        asset_ctxs.append({
+            "midPx": f"{price:.6g}",
+            "markPx": f"{price:.6g}",
+            "oraclePx": f"{price:.6g}",
+            "prevDayPx": f"{price * rng.uniform(0.9, 1.1):.6g}",
+        })
+    return [{"universe": universe}, asset_ctxs]
+
+
+class SyntheticInfoClient:
+    """In-process stand-in for HyperliquidInfoClient serving a synthetic dataset
+
+    `latency_ms` is slept before every response to mimic a network round
+    trip. Install it with `hyperliquid_client.set_client`.
+    """
+
+    def __init__(self, dataset, meta=None, latency_ms=0.0):
+        self.dataset = dataset
+        self.meta = meta or generate_meta_and_asset_ctxs()
+        self.latency_ms = latency_ms
+
+    def _wait(self):
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+
+    def meta_and_asset_ctxs(self):
+        self._wait()
+        return self.meta
+
+    def user_fills(self, address, aggregate_by_time=True, priority=0):
+        self._wait()
+        return [dict(fill) for fill in self.dataset.get(address, [])[:2000]]
+
+    def user_fills_by_time(self, address, start_time, end_time=None, aggregate_by_time=True, priority=0):
+        self._wait()
+        return [
+            dict(fill) for fill in reversed(self.dataset.get(address, []))
+            if fill["time"] >= start_time and (end_time is None or fill["time"] <= end_time)
+        ]
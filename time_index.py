@@ -0,0 +1,174 @@
+import numpy as np
+
+from vectorized_aggregation import fill_columns, latest_per_trader, summary_frame, update_last_trades
+
+# Quantities kept as cumulative sums; fill counts come from the positions
+INDEXED_SUMS = ('volume', 'long_size', 'short_size', 'long_value', 'short_value')
+
+
+class TimeIndex:
+    """Per-coin fills sorted by time, with cumulative sums
+
+    For each coin the fill times are sorted and every INDEXED_SUMS quantity
+    is stored as a running total (starting at 0), so the totals for any
+    window are two binary searches and a subtraction instead of a pass over
+    the fills. Distinct traders use each trader's latest fill time per
+    coin, so trader counts are exact for windows that end now.
+    """
+
+    def __init__(self, coin_count, coin_rows, times, sums, trader_rows=None, trader_times=None):
+        order = np.lexsort((times, coin_rows))
+        bounds = np.searchsorted(coin_rows[order], np.arange(coin_count + 1))
+        times = times[order]
+
+        self.coin_count = coin_count
+        self.times = [times[bounds[row]:bounds[row + 1]] for row in range(coin_count)]
+        self.prefix = {}
+        for name in INDEXED_SUMS:
+            values = sums[name][order]
+            self.prefix[name] = [
+                np.concatenate(([0.0], np.cumsum(values[bounds[row]:bounds[row + 1]])))
+                for row in range(coin_count)
+            ]
+
+        self.trader_times = [np.empty(0, dtype=np.int64) for _ in range(coin_count)]
+        if trader_rows is not None and len(trader_rows):
+            order = np.lexsort((trader_times, trader_rows))
+            bounds = np.searchsorted(trader_rows[order], np.arange(coin_count + 1))
+            trader_times = trader_times[order]
+            self.trader_times = [trader_times[bounds[row]:bounds[row + 1]] for row in range(coin_count)]
+
+    def window(self, start, end=None):
+        """Totals per coin for fills with `start` <= time (<= `end`)
+
+        Returns a dict of arrays indexed by coin row: `fills` and every
+        INDEXED_SUMS quantity.
+        """
+        totals = {name: np.zeros(self.coin_count) for name in ('fills',) + INDEXED_SUMS}
+        for row, times in enumerate(self.times):
+            low = np.searchsorted(times, start, side='left')
+            high = len(times) if end is None else np.searchsorted(times, end, side='right')
+            totals['fills'][row] = high - low
+            for name in INDEXED_SUMS:
+                prefix = self.prefix[name][row]
+                totals[name][row] = prefix[high] - prefix[low]
+        return totals
+
+    def traders(self, start):
+        """Distinct traders per coin with a fill at or after `start`"""
+        return np.array([
+            len(times) - np.searchsorted(times, start, side='left')
+            for times in self.trader_times
+        ], dtype=int)
+
+
+class TimeIndexAccumulator:
+    """Collects fills into a TimeIndex and builds the summary for any windows
+
+    Fills older than the oldest cutoff are dropped as they are added; the
+    rest are kept as a few compact columns (no strings), and the index is
+    built once, the first time a summary is asked for. A summary can then
+    be built for any window set without going over the fills again.
+    """
+
+    def __init__(self, cutoff_timestamps, primary_window='24h'):
+        self.cutoff_timestamps = cutoff_timestamps
+        self.primary_window = primary_window
+        self.oldest_cutoff = min(cutoff_timestamps.values())
+        self.fill_count = 0
+        self._coin_rows = {}
+        self._chunks = []
+        self._latest = {}       # (coin row, trader) -> time of their latest fill
+        self._last_trades = {}  # Coin -> (time, price)
+        self._index = None
+
+    def add(self, fills):
+        """Add a fills DataFrame (see `vectorized_aggregation.WindowAccumulator.add`)"""
+        fills = fills[fills['coin'].notna() & (fills['time'] >= self.oldest_cutoff)]
+        if fills.empty:
+            return
+        self.fill_count += len(fills)
+        self._index = None
+
+        coin_codes, coins, times, size, value, is_long, is_short = fill_columns(fills)
+        rows = np.array(
+            [self._coin_rows.setdefault(coin, len(self._coin_rows)) for coin in coins],
+            dtype=np.int64
+        )
+        self._chunks.append((rows[coin_codes], times, {
+            'volume': size,
+            'long_size': size * is_long,
+            'short_size': size * is_short,
+            'long_value': value * is_long,
+            'short_value': value * is_short,
+        }))
+
+        for (coin_code, trader), latest in latest_per_trader(coin_codes, fills['trader_address'], times).items():
+            key = (rows[coin_code], trader)
+            if latest > self._latest.get(key, self.oldest_cutoff - 1):
+                self._latest[key] = latest
+
+        update_last_trades(self._last_trades, fills)
+
+    def index(self):
+        """The TimeIndex over everything added so far"""
+        if self._index is None:
+            if len(self._chunks) != 1:
+                # Merge the chunks added so far into one
+                self._chunks = [(
+                    np.concatenate([rows for rows, _, _ in self._chunks] + [np.empty(0, dtype=np.int64)]),
+                    np.concatenate([times for _, times, _ in self._chunks] + [np.empty(0, dtype=np.int64)]),
+                    {
+                        name: np.concatenate([sums[name] for _, _, sums in self._chunks] + [np.empty(0)])
+                        for name in INDEXED_SUMS
+                    },
+                )]
+            rows, times, sums = self._chunks[0]
+            self._index = TimeIndex(
+                len(self._coin_rows),
+                rows,
+                times,
+                sums,
+                np.fromiter((row for row, _ in self._latest), dtype=np.int64, count=len(self._latest)),
+                np.fromiter(self._latest.values(), dtype=np.int64, count=len(self._latest))
+            )
+        return self._index
+
+    def last_trade_prices(self):
+        """Latest traded price per coin across everything added"""
+        return {coin: px for coin, (timestamp, px) in self._last_trades.items()}
+
+    def summary(self, current_prices, price_changes, fallback_prices=None,
+                cutoff_timestamps=None, primary_window=None):
+        """Build the summary table (see `vectorized_aggregation.summary_frame`)
+
+        By default for the windows the accumulator was created with; pass
+        other `cutoff_timestamps` (no older than the original oldest
+        cutoff) to summarise a different window set from the same index.
+        """
+        if fallback_prices is None:
+            fallback_prices = self.last_trade_prices()
+        cutoff_timestamps = cutoff_timestamps or self.cutoff_timestamps
+        primary_window = primary_window or self.primary_window
+        windows = list(cutoff_timestamps)
+
+        index = self.index()
+        per_window = [index.window(cutoff_timestamps[window]) for window in windows]
+        totals = {
+            name: np.column_stack([sums[name] for sums in per_window]).reshape(index.coin_count, len(windows))
+            for name in per_window[0]
+        }
+        trader_counts = np.column_stack(
+            [index.traders(cutoff_timestamps[window]) for window in windows]
+        ).reshape(index.coin_count, len(windows))
+
+        return summary_frame(
+            list(self._coin_rows),
+            windows,
+            primary_window,
+            totals,
+            trader_counts,
+            current_prices,
+            price_changes,
+            fallback_prices
+        )
@@ -0,0 +1,116 @@
+import hashlib
+import math
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+# Register counts are 2 ** precision; more registers, smaller error
+MIN_PRECISION = 4
+MAX_PRECISION = 16
+
+
+def precision_for_error(error):
+    """Smallest precision whose standard error (1.04 / sqrt(registers)) is at most `error`"""
+    precision = math.ceil(math.log2((1.04 / error) ** 2))
+    return min(max(precision, MIN_PRECISION), MAX_PRECISION)
+
+
+def _hash(trader):
+    return int.from_bytes(hashlib.blake2b(trader.encode(), digest_size=8).digest(), "little")
+
+
+def hash_traders(traders):
+    """Stable 64-bit hashes of trader addresses
+
+    The same address hashes the same in every process, so sketches built
+    in different processes or runs could be merged; for now only
+    single-process accumulators build them. Each distinct address is
+    hashed once.
+    """
+    codes, uniques = pd.factorize(np.asarray(traders, dtype=object))
+    hashes = np.fromiter((_hash(trader) for trader in uniques), dtype=np.uint64, count=len(uniques))
+    return hashes[codes]
+
+
+def _bit_length(values):
+    """Bit length of each uint64 value (0 for 0)"""
+    high = (values >> np.uint64(32)).astype(np.float64)
+    low = (values & np.uint64(0xFFFFFFFF)).astype(np.float64)
+    # frexp's exponent is the bit length, exact for 32-bit halves
+    return np.where(high > 0, 32 + np.frexp(high)[1], np.frexp(low)[1])
+
+
+def register_updates(hashes, precision):
+    """The register and rank each hash sets in a sketch of `precision`
+
+    The top `precision` bits pick the register; the rank is the position
+    of the first set bit in the rest.
+    """
+    hashes = np.asarray(hashes, dtype=np.uint64)
+    rest_bits = 64 - precision
+    registers = (hashes >> np.uint64(rest_bits)).astype(np.int64)
+    rest = hashes & np.uint64((1 << rest_bits) - 1)
+    ranks = (rest_bits - _bit_length(rest) + 1).astype(np.uint8)
+    return registers, ranks
+
+
+@lru_cache(maxsize=65536)
+def _trader_update(trader, precision):
+    """(register, rank) of one address, cached for adding addresses one at a time"""
+    value = _hash(trader)
+    rest_bits = 64 - precision
+    return value >> rest_bits, rest_bits - (value & ((1 << rest_bits) - 1)).bit_length() + 1
+
+
+def estimate(registers):
+    """HyperLogLog estimate for every sketch along the last axis of `registers`
+
+    Small counts use linear counting over the empty registers, which is
+    close to exact for a handful of traders.
+    """
+    registers = np.asarray(registers)
+    m = registers.shape[-1]
+    alpha = {16: 0.673, 32: 0.697, 64: 0.709}.get(m, 0.7213 / (1 + 1.079 / m))
+    raw = alpha * m * m / np.sum(np.exp2(-registers.astype(np.float64)), axis=-1)
+    empty = np.count_nonzero(registers == 0, axis=-1)
+    linear = m * np.log(m / np.maximum(empty, 1))
+    return np.where((raw <= 2.5 * m) & (empty > 0), linear, raw)
+
+
+class TraderSketch:
+    """Approximate set of trader addresses (HyperLogLog)
+
+    Stands in for a `set` of addresses where only its size is needed:
+    `add` and `len` work the same, memory is fixed at 2 ** precision bytes
+    however many traders are added, and sketches with the same precision
+    merge with `update` (for combining windows, time buckets or workers).
+    """
+
+    def __init__(self, precision=12, registers=None):
+        self.precision = precision
+        self.registers = registers if registers is not None else np.zeros(1 << precision, dtype=np.uint8)
+
+    @classmethod
+    def for_error(cls, error):
+        """An empty sketch with a standard error of at most `error` (e.g. 0.02 for 2%)"""
+        return cls(precision_for_error(error))
+
+    def add(self, trader):
+        register, rank = _trader_update(trader, self.precision)
+        if rank > self.registers[register]:
+            self.registers[register] = rank
+
+    def add_many(self, traders):
+        """Add an array of addresses at once"""
+        registers, ranks = register_updates(hash_traders(traders), self.precision)
+        np.maximum.at(self.registers, registers, ranks)
+
+    def update(self, other):
+        """Merge another sketch of the same precision into this one"""
+        if other.precision != self.precision:
+            raise ValueError("Only sketches with the same precision can be merged")
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+    def __len__(self):
+        return int(round(float(estimate(self.registers))))
@@ -0,0 +1,306 @@
+import numpy as np
+import pandas as pd
+
+from trader_sketch import estimate, hash_traders, precision_for_error, register_updates
+
+
+def _flags(values, predicate):
+    """Evaluate `predicate` once per distinct string and spread it over `values`
+
+    Missing values are treated as empty strings.
+    """
+    codes, uniques = pd.factorize(values)
+    lookup = np.array(
+        [predicate(value if isinstance(value, str) else '') for value in uniques] + [predicate('')],
+        dtype=bool
+    )
+    # Missing values have code -1, which picks the trailing predicate('')
+    return lookup[codes]
+
+
+def _window_sums(coin_codes, member_count, coin_count, window_count, weights=None):
+    """Sum `weights` per coin for every window
+
+    `member_count` is how many windows (sorted by cutoff, oldest first)
+    each fill falls in. Summing per coin and member_count gives disjoint time
+    bands; a reverse cumulative sum over the bands turns them into window
+    totals. Returns an array of shape (coin_count, window_count).
+    """
+    bands = np.bincount(
+        coin_codes * (window_count + 1) + member_count,
+        weights=weights,
+        minlength=coin_count * (window_count + 1)
+    ).reshape(coin_count, window_count + 1)
+    totals = bands[:, ::-1].cumsum(axis=1)[:, ::-1]
+    return totals[:, 1:]
+
+
+def _divide(numerator, denominator, empty):
+    """numerator / denominator, or `empty` where the denominator is not positive"""
+    result = np.full(numerator.shape, empty, dtype=float)
+    np.divide(numerator, denominator, out=result, where=denominator > 0)
+    return result
+
+
+def last_trade_prices(fills):
+    """Latest traded price per coin in a fills DataFrame"""
+    if fills.empty:
+        return {}
+    latest = fills.sort_values('time', kind='stable').groupby('coin', observed=True)['px'].last()
+    return {coin: float(px) for coin, px in latest.items()}
+
+
+def update_last_trades(last_trades, fills):
+    """Merge the latest trade per coin in a fills DataFrame into `last_trades`
+
+    `last_trades` maps coin -> (time, price) and is updated in place, so
+    fills can be passed in any number of chunks.
+    """
+    if fills.empty:
+        return
+    latest = fills.sort_values('time', kind='stable').groupby('coin', observed=True)[['time', 'px']].last()
+    for coin, timestamp, px in zip(latest.index, latest['time'], latest['px']):
+        if coin not in last_trades or timestamp >= last_trades[coin][0]:
+            last_trades[coin] = (int(timestamp), float(px))
+
+
+def fill_columns(fills):
+    """Typed columns and direction flags of a fills DataFrame, each computed once per fill
+
+    Returns (coin codes, coins, times, size, value, is_long, is_short),
+    where the codes index into `coins`.
+    """
+    coin_codes, coins = pd.factorize(fills['coin'])
+    size = np.abs(fills['sz'].to_numpy(dtype=float))
+    value = size * fills['px'].to_numpy(dtype=float)
+    direction = fills['dir']
+    is_open = _flags(direction, lambda d: 'Open' in d)
+    is_long = is_open & _flags(direction, lambda d: 'Long' in d)
+    is_short = is_open & ~is_long & _flags(direction, lambda d: 'Short' in d)
+    return coin_codes, coins, fills['time'].to_numpy(dtype=np.int64), size, value, is_long, is_short
+
+
+def latest_per_trader(coin_codes, traders, values):
+    """Largest of `values` for each (coin code, trader) pair, skipping missing traders
+
+    Returns a Series indexed by (coin code, trader).
+    """
+    trader_codes, trader_names = pd.factorize(traders)
+    has_trader = _flags(traders, bool)
+    latest = (
+        pd.Series(values[has_trader])
+        .groupby([coin_codes[has_trader], trader_codes[has_trader]])
+        .max()
+    )
+    latest.index = latest.index.set_levels(trader_names[latest.index.levels[1]], level=1)
+    return latest
+
+
+def summary_frame(coins, windows, primary_window, totals, trader_counts,
+                  current_prices, price_changes, fallback_prices):
+    """Build the summary table from per-coin totals for each window
+
+    `totals` maps fills, volume, long_size, short_size, long_value and
+    short_value to arrays of shape (coins, windows) with columns in
+    `windows` order; `trader_counts` has the same shape. Produces the
+    same columns as the pure-Python aggregation in `hyperliquid_analysis`:
+    per-window volume, open long/short percentages and trader counts, plus
+    size-weighted entry prices for `primary_window`. Coins without a
+    current price are valued at `fallback_prices`.
+    """
+    primary = windows.index(primary_window)
+    long_size = totals['long_size']
+    short_size = totals['short_size']
+    long_value = totals['long_value']
+    short_value = totals['short_value']
+
+    prices = np.array([
+        current_prices[coin] if coin in current_prices else fallback_prices.get(coin, np.nan)
+        for coin in coins
+    ], dtype=float)
+    open_size = long_size + short_size
+    long_pct = _divide(long_size * 100, open_size, 0.0)
+    short_pct = _divide(short_size * 100, open_size, 0.0)
+    volume_usd = totals['volume'] * prices[:, None]
+
+    summary = {
+        'Asset': list(coins),
+        'Current Price': prices,
+        'Price Change': [price_changes.get(coin, 0) for coin in coins],
+        'Total Notional Value': volume_usd[:, primary],
+
+        # Open position percentages
+        'Open Pct Long': long_pct[:, primary],
+        'Open Pct Short': short_pct[:, primary],
+
+        # Entry prices
+        'Open Total Avg Entry': _divide(
+            long_value[:, primary] + short_value[:, primary], open_size[:, primary], np.nan
+        ),
+        'Open Long Avg Entry': _divide(long_value[:, primary], long_size[:, primary], np.nan),
+        'Open Short Avg Entry': _divide(short_value[:, primary], short_size[:, primary], np.nan),
+    }
+
+    # Time window data
+    for i, window in enumerate(windows):
+        summary[f'{window} Volume'] = volume_usd[:, i]
+        summary[f'{window} Pct Long'] = long_pct[:, i]
+        summary[f'{window} Pct Short'] = short_pct[:, i]
+        summary[f'{window} Traders'] = trader_counts[:, i]
+
+    df = pd.DataFrame(summary)
+
+    # Only coins traded in the primary window
+    return df[totals['fills'][:, primary] > 0].reset_index(drop=True)
+
+
+class WindowAccumulator:
+    """Per-coin totals for every time window, built up one chunk of fills at a time
+
+    Each chunk is reduced to coins x windows arrays and added to the running
+    totals, so fills can be released as soon as they are added. Distinct
+    trader counts keep the latest window of each (coin, trader) pair or,
+    with `trader_error`, one HyperLogLog sketch per coin and time band;
+    nothing grows with the number of fills.
+    """
+
+    def __init__(self, cutoff_timestamps, primary_window='24h', trader_error=None):
+        self.cutoff_timestamps = cutoff_timestamps
+        self.primary_window = primary_window
+        self.windows_by_cutoff = sorted(cutoff_timestamps, key=cutoff_timestamps.get)
+        self.cutoffs = np.array(
+            [cutoff_timestamps[window] for window in self.windows_by_cutoff],
+            dtype=np.int64
+        )
+        self.fill_count = 0
+        self._coin_rows = {}
+        self._totals = {
+            name: np.zeros((0, len(self.cutoffs)))
+            for name in ('fills', 'volume', 'long_size', 'short_size', 'long_value', 'short_value')
+        }
+        self._latest_member = {}  # (coin row, trader) -> windows holding their latest fill
+        self._sketches = None     # Coin row x band x sketch registers
+        if trader_error is not None:
+            self.trader_precision = precision_for_error(trader_error)
+            self._sketches = np.zeros((0, len(self.cutoffs) + 1, 1 << self.trader_precision), dtype=np.uint8)
+        self._last_trades = {}    # Coin -> (time, price)
+
+    def _rows(self, coins):
+        """Row of each coin in the totals, adding rows for coins not seen before"""
+        rows = np.array(
+            [self._coin_rows.setdefault(coin, len(self._coin_rows)) for coin in coins],
+            dtype=np.int64
+        )
+        missing = len(self._coin_rows) - len(self._totals['fills'])
+        if missing:
+            for name, totals in self._totals.items():
+                self._totals[name] = np.vstack([totals, np.zeros((missing, totals.shape[1]))])
+            if self._sketches is not None:
+                self._sketches = np.concatenate([
+                    self._sketches,
+                    np.zeros((missing,) + self._sketches.shape[1:], dtype=np.uint8)
+                ])
+        return rows
+
+    def add(self, fills):
+        """Add a fills DataFrame with coin, time, px, sz, dir and trader_address
+        columns (see `fill_store.FillStore.read`)"""
+        # Drop fills without a coin or older than every window
+        fills = fills[fills['coin'].notna()]
+        member_count = np.searchsorted(self.cutoffs, fills['time'].to_numpy(dtype=np.int64), side='right')
+        in_window = member_count > 0
+        fills = fills[in_window]
+        member_count = member_count[in_window]
+        if fills.empty:
+            return
+        self.fill_count += len(fills)
+
+        coin_codes, coins, times, size, value, is_long, is_short = fill_columns(fills)
+        rows = self._rows(coins)
+        coin_count = len(coins)
+        window_count = len(self.cutoffs)
+
+        weights = {
+            'fills': None,
+            'volume': size,
+            'long_size': size * is_long,
+            'short_size': size * is_short,
+            'long_value': value * is_long,
+            'short_value': value * is_short,
+        }
+        for name, weight in weights.items():
+            self._totals[name][rows] += _window_sums(coin_codes, member_count, coin_count, window_count, weight)
+
+        if self._sketches is not None:
+            # Distinct traders: sketched per coin and time band
+            has_trader = _flags(fills['trader_address'], bool)
+            registers, ranks = register_updates(
+                hash_traders(fills['trader_address'][has_trader]),
+                self.trader_precision
+            )
+            np.maximum.at(
+                self._sketches,
+                (rows[coin_codes[has_trader]], member_count[has_trader], registers),
+                ranks
+            )
+        else:
+            # Distinct traders: a trader counts for every window containing
+            # their latest fill in that coin
+            for (coin_code, trader), member in latest_per_trader(coin_codes, fills['trader_address'], member_count).items():
+                key = (rows[coin_code], trader)
+                if member > self._latest_member.get(key, 0):
+                    self._latest_member[key] = member
+
+        update_last_trades(self._last_trades, fills)
+
+    def last_trade_prices(self):
+        """Latest traded price per coin across everything added"""
+        return {coin: px for coin, (timestamp, px) in self._last_trades.items()}
+
+    def summary(self, current_prices, price_changes, fallback_prices=None):
+        """Build the summary table (see `summary_frame`) from the totals
+
+        Coins without a current price are valued at `fallback_prices`, by
+        default their last traded price.
+        """
+        if fallback_prices is None:
+            fallback_prices = self.last_trade_prices()
+        windows = list(self.cutoff_timestamps)
+
+        if self._sketches is not None:
+            # A window holds its own band and every newer one: merge the
+            # sketches from the newest band back, like the reverse cumsum
+            # in `_window_sums`
+            merged = np.maximum.accumulate(self._sketches[:, ::-1], axis=1)[:, ::-1]
+            trader_counts = np.rint(estimate(merged[:, 1:])).astype(int)
+        else:
+            trader_counts = _window_sums(
+                np.fromiter((row for row, _ in self._latest_member), dtype=np.int64, count=len(self._latest_member)),
+                np.fromiter(self._latest_member.values(), dtype=np.int64, count=len(self._latest_member)),
+                len(self._coin_rows),
+                len(windows)
+            ).astype(int)
+
+        # Back to the caller's window order
+        order = [self.windows_by_cutoff.index(window) for window in windows]
+        return summary_frame(
+            list(self._coin_rows),
+            windows,
+            self.primary_window,
+            {name: totals[:, order] for name, totals in self._totals.items()},
+            trader_counts[:, order],
+            current_prices,
+            price_changes,
+            fallback_prices
+        )
+
+
+def summarize_fills(fills, cutoff_timestamps, current_prices, price_changes, fallback_prices,
+                    primary_window='24h', trader_error=None):
+    """Build the summary table from a fills DataFrame with grouped array reductions
+
+    Shorthand for adding every fill to a `WindowAccumulator` at once.
+    """
+    accumulator = WindowAccumulator(cutoff_timestamps, primary_window, trader_error)
+    accumulator.add(fills)
+    return accumulator.summary(current_prices, price_changes, fallback_prices)